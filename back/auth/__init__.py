@@ -11,7 +11,7 @@ from .security import (
     get_password_hash,
 )
 from .validators import validate_full_name, normalize_and_validated_email
-from .token_service import create_access_token, verify_token, EmailAlreadyExistsError, UserCreationError, UserServiceError
+from .token_service import create_access_token, verify_token, revoke_token, EmailAlreadyExistsError, UserCreationError, UserServiceError
 
 __all__ = [
     "get_current_user",
@@ -28,6 +28,7 @@ __all__ = [
     "normalize_and_validated_email",
     "create_access_token",
     "verify_token",
+    "revoke_token",
     "EmailAlreadyExistsError",
     "UserCreationError",
     "UserServiceError",
@@ -1,9 +1,14 @@
+import hashlib
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from sqlalchemy.exc import IntegrityError
 from ..config import settings
+from ..core import redis_client
 from ..database.models import User
 from .security import get_password_hash
 from ..core.logger import logger
@@ -43,12 +48,122 @@ def create_access_token(user_id: int, session_id: Optional[str] = None) -> str:
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def verify_token(token: str) -> Optional[dict]:
+CLAIMS_CACHE_SIZE = 10000
+REVOCATION_CHECK_INTERVAL = 15
+
+_cache_lock = threading.Lock()
+_claims_cache: "OrderedDict[str, dict]" = OrderedDict()
+_not_revoked_until: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+_revoked_locally: "OrderedDict[str, float]" = OrderedDict()
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _revocation_keys(payload: dict) -> Tuple[str, str]:
+    return f"revoked:jti:{payload.get('jti')}", f"revoked:session:{payload.get('session_id')}"
+
+
+def _remember_revoked(key: str, exp: float) -> None:
+    """Локальная отметка об отзыве до exp; вытесненные записи по-прежнему проверяются через Redis."""
+    _revoked_locally[key] = exp
+    _revoked_locally.move_to_end(key)
+    while len(_revoked_locally) > CLAIMS_CACHE_SIZE:
+        _revoked_locally.popitem(last=False)
+
+
+def _revoked_locally_at(key: str, now: float) -> bool:
+    exp = _revoked_locally.get(key)
+    if exp is None:
+        return False
+    if exp <= now:
+        del _revoked_locally[key]
+        return False
+    return True
+
+
+def _is_revoked(payload: dict) -> bool:
+    """
+    Проверка отзыва по jti и session_id.
+    Отрицательный ответ Redis запоминается на REVOCATION_CHECK_INTERVAL секунд,
+    поэтому повторные запросы с тем же токеном обходятся без обращения к Redis.
+    """
+    keys = _revocation_keys(payload)
+    now = time.time()
+    with _cache_lock:
+        if any([_revoked_locally_at(key, now) for key in keys]):
+            return True
+        if _not_revoked_until.get(keys, 0) > now:
+            return False
+
+    try:
+        revoked = redis_client.exists(*keys) > 0
+    except Exception as e:
+        logger.error(f"Redis error checking token revocation: {e}")
+        revoked = False
+
+    with _cache_lock:
+        if revoked:
+            for key in keys:
+                _remember_revoked(key, payload["exp"])
+        else:
+            _not_revoked_until[keys] = min(now + REVOCATION_CHECK_INTERVAL, payload["exp"])
+            _not_revoked_until.move_to_end(keys)
+            while len(_not_revoked_until) > CLAIMS_CACHE_SIZE:
+                _not_revoked_until.popitem(last=False)
+    return revoked
+
+
+def _decode_token(token: str) -> Optional[dict]:
+    token_hash = _token_hash(token)
+    now = time.time()
+    with _cache_lock:
+        payload = _claims_cache.get(token_hash)
+        if payload is not None:
+            if payload["exp"] > now:
+                _claims_cache.move_to_end(token_hash)
+                return payload
+            del _claims_cache[token_hash]
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM], issuer="martfi-auth", audience="martfi-app"
         )
-        return payload
     except JWTError as e:
         logger.warning(f"JWT decoding error: {e}")
         return None
+
+    with _cache_lock:
+        _claims_cache[token_hash] = payload
+        while len(_claims_cache) > CLAIMS_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+    return payload
+
+
+def verify_token(token: str) -> Optional[dict]:
+    """
+    Проверяет токен и возвращает его claims.
+    Проверенные claims кэшируются в процессе по хэшу токена до момента exp.
+    """
+    payload = _decode_token(token)
+    if payload is None or _is_revoked(payload):
+        return None
+    return payload
+
+
+def revoke_token(payload: dict) -> None:
+    """Отзывает токен и его сессию до истечения срока действия токена."""
+    ttl = int(payload["exp"] - time.time())
+    if ttl <= 0:
+        return
+    keys = _revocation_keys(payload)
+    with _cache_lock:
+        for key in keys:
+            _remember_revoked(key, payload["exp"])
+        _not_revoked_until.pop(keys, None)
+
+    pipe = redis_client.pipeline()
+    for key in keys:
+        pipe.setex(key, ttl, "1")
+    pipe.execute()
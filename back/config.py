@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
@@ -16,6 +17,9 @@ class Settings:
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+    MOEX_ISS_URL = os.getenv("MOEX_ISS_URL", "https://iss.moex.com/iss")
+    ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "martfi-snapshots"))
     ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
     CSRF_TOKEN_EXPIRE_MINUTES = int(os.getenv("CSRF_TOKEN_EXPIRE_MINUTES", "30"))
@@ -25,6 +29,21 @@ class Settings:
     except (TypeError, ValueError):
         ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+    try:
+        MOEX_FETCH_TIMEOUT = float(os.getenv("MOEX_FETCH_TIMEOUT", "20"))
+    except (TypeError, ValueError):
+        MOEX_FETCH_TIMEOUT = 20.0
+
+    try:
+        MOEX_FETCH_RETRIES = int(os.getenv("MOEX_FETCH_RETRIES", "2"))
+    except (TypeError, ValueError):
+        MOEX_FETCH_RETRIES = 2
+
+    try:
+        PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    except (TypeError, ValueError):
+        PROFILE_SAMPLE_RATE = 0.0
+
     try:
         REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
     except (TypeError, ValueError):
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from .config import settings
+from .core import redis_client
+from .core.logger import logger
+from .database.database import engine
+from .services.market.providers import create_market_data_providers
+from .services.market.refresh_coordinator import RefreshCoordinator
+from .services.market.schedule import SessionSchedule, TradingCalendar
+from .services.market.snapshot_store import SnapshotStore
+from .services.market_service import MarketService
+from .services.health_service import HealthService
+from .services.alert_service import AlertService
+from .services.quote_history_service import QuoteHistoryService
+from .services.security_service import SecurityService
+
+ISS_CONNECTION_LIMIT = 20
+
+
+class AppContainer:
+    """
+    Долгоживущие объекты приложения: создаются один раз в lifespan и хранятся в app.state.container.
+    Зависимости FastAPI отдают эти экземпляры, поэтому сервисы могут держать пулы соединений
+    и кэши между запросами.
+    """
+
+    def __init__(self, iss_base_url: Optional[str] = None, snapshot_dir: Optional[str] = None):
+        self.redis = redis_client
+        self.engine = engine
+        self.iss_session: Optional[aiohttp.ClientSession] = None
+        self.security_service = SecurityService()
+        self.quote_history_service = QuoteHistoryService()
+        self.alert_service = AlertService(redis=self.redis)
+        self.snapshot_store = SnapshotStore(snapshot_dir) if snapshot_dir else None
+        self.schedule = SessionSchedule(TradingCalendar(self.redis))
+        self.data_providers = create_market_data_providers(iss_base_url or settings.MOEX_ISS_URL)
+        self.market_service = MarketService(
+            security_service=self.security_service,
+            data_providers=self.data_providers,
+            snapshot_listeners=[self.quote_history_service, self.alert_service],
+            snapshot_store=self.snapshot_store,
+            schedule=self.schedule,
+        )
+        self.refresh_coordinator = RefreshCoordinator(self.market_service)
+        self.market_service.refresh_coordinator = self.refresh_coordinator
+        self.alert_service.market_service = self.market_service
+        self.health_service = HealthService(self.redis, self.engine, self.market_service, self.is_warm)
+        self._warm_up: Optional[asyncio.Task] = None
+
+    def is_warm(self) -> bool:
+        """Стартовый прогрев кэша завершён: до этого готовность не подтверждается."""
+        return self._warm_up is not None and self._warm_up.done()
+
+    async def start(self) -> None:
+        self.iss_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=ISS_CONNECTION_LIMIT))
+        for provider in self.data_providers:
+            provider.session = self.iss_session
+        await self.refresh_coordinator.start()
+        self._warm_up = asyncio.create_task(self.market_service.warm_up())
+
+    async def close(self) -> None:
+        if self._warm_up is not None:
+            self._warm_up.cancel()
+        await self.refresh_coordinator.stop()
+        await self.market_service.close()
+        if self.iss_session is not None:
+            await self.iss_session.close()
+        logger.info("Application container closed")
@@ -3,4 +3,7 @@ from typing import Protocol, List, Dict, Any
 class IMarketDataProvider(Protocol):
     async def fetch_data(self) -> List[Dict[str, Any]]: ...
     def get_cache_key(self) -> str: ...
-    def get_asset_type(self) -> str: ...
\ No newline at end of file
+    def get_asset_type(self) -> str: ...
+
+class ISnapshotListener(Protocol):
+    async def on_snapshot(self, asset_type: str, data: List[Dict[str, Any]]) -> None: ...
\ No newline at end of file
@@ -1,19 +1,31 @@
 from .redis_client import redis_client
 from .rate_limiter import (
+    RateLimitPolicy,
+    RateLimitResult,
+    LOGIN_POLICY,
+    REGISTRATION_POLICY,
+    hit as hit_rate_limit,
     is_rate_limited,
     increment_rate_limit,
     clear_rate_limit,
     is_registration_rate_limited,
     increment_registration_attempts,
     get_login_rate_key,
+    get_registration_rate_key,
 )
 
 __all__ = [
     "redis_client",
+    "RateLimitPolicy",
+    "RateLimitResult",
+    "LOGIN_POLICY",
+    "REGISTRATION_POLICY",
+    "hit_rate_limit",
     "is_rate_limited",
     "increment_rate_limit",
     "clear_rate_limit",
     "is_registration_rate_limited",
     "increment_registration_attempts",
     "get_login_rate_key",
+    "get_registration_rate_key",
 ]
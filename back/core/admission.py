@@ -0,0 +1,167 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .logger import logger
+from .metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    name: str
+    limit: int
+    queue_size: int
+    queue_timeout: float
+
+
+PORTFOLIO_ADMISSION = AdmissionPolicy("portfolio", limit=16, queue_size=32, queue_timeout=2.0)
+AUTH_ADMISSION = AdmissionPolicy("auth", limit=8, queue_size=16, queue_timeout=3.0)
+MARKET_REFRESH_ADMISSION = AdmissionPolicy("market_refresh", limit=2, queue_size=4, queue_timeout=1.0)
+
+# Первое совпадение по (методу, префиксу пути) определяет класс маршрута; остальные запросы,
+# включая чтение котировок из кэша, идут без ограничений.
+ADMISSION_RULES: List[Tuple[Optional[FrozenSet[str]], str, AdmissionPolicy]] = [
+    (frozenset({"POST"}), "/api/market/refresh/", MARKET_REFRESH_ADMISSION),
+    (frozenset({"POST"}), "/login", AUTH_ADMISSION),
+    (frozenset({"POST"}), "/register", AUTH_ADMISSION),
+    (None, "/api/portfolio", PORTFOLIO_ADMISSION),
+    (None, "/portfolio", PORTFOLIO_ADMISSION),
+]
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """
+    Не более limit одновременных запросов класса; следующие ждут в очереди FIFO длиной queue_size
+    не дольше queue_timeout. Освободившийся слот передаётся первому ждущему напрямую,
+    поэтому новые запросы не обгоняют очередь.
+    """
+
+    def __init__(self, policy: AdmissionPolicy):
+        self.policy = policy
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.active < self.policy.limit and not self._waiters:
+            self.active += 1
+            self._report()
+            return
+        if len(self._waiters) >= self.policy.queue_size:
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._report()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait({waiter}, timeout=self.policy.queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._drop(waiter)
+            raise
+        finally:
+            ADMISSION_WAIT.labels(self.policy.name).observe(time.perf_counter() - started)
+        if not waiter.done():
+            self._drop(waiter)
+            raise AdmissionRejected("timeout", self.retry_after())
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._report()
+                return
+        self.active -= 1
+        self._report()
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.policy.queue_timeout))
+
+    def _drop(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._report()
+
+    def _report(self) -> None:
+        ADMISSION_IN_FLIGHT.labels(self.policy.name).set(self.active)
+        ADMISSION_QUEUED.labels(self.policy.name).set(len(self._waiters))
+
+
+class AdmissionMiddleware:
+    """
+    Ограничение конкурентности дорогих маршрутов (портфель, вход и регистрация, обновление котировок).
+    При переполнении очереди или истечении ожидания сразу отвечает 503 с Retry-After,
+    не занимая воркер; дешёвые чтения из кэша проходят мимо.
+    """
+
+    def __init__(self, app: ASGIApp, rules=None):
+        self.app = app
+        self.rules = ADMISSION_RULES if rules is None else rules
+        self.gates: Dict[str, AdmissionGate] = {}
+
+    def classify(self, method: str, path: str) -> Optional[AdmissionGate]:
+        for methods, prefix, policy in self.rules:
+            if (methods is None or method in methods) and path.startswith(prefix):
+                gate = self.gates.get(policy.name)
+                if gate is None:
+                    gate = self.gates[policy.name] = AdmissionGate(policy)
+                return gate
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        gate = self.classify(scope.get("method", "GET"), scope["path"]) if scope["type"] == "http" else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await gate.acquire()
+        except AdmissionRejected as e:
+            ADMISSION_REJECTED.labels(gate.policy.name, e.reason).inc()
+            logger.warning(f"Shedding {scope['method']} {scope['path']}: {gate.policy.name} {e.reason} "
+                           f"({gate.active} active, {gate.queued} queued)")
+            await self._reject(send, e.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+    @staticmethod
+    async def _reject(send: Send, retry_after: int) -> None:
+        body = json.dumps(
+            {"success": False, "message": "Сервер перегружен, попробуйте позже"}, ensure_ascii=False
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
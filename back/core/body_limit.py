@@ -0,0 +1,97 @@
+import json
+from typing import FrozenSet, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .logger import logger
+
+PORTFOLIO_IMPORT_MAX_BYTES = 2 * 1024 * 1024
+
+# Первое совпадение по (методу, префиксу пути) задаёт предельный размер тела запроса.
+BODY_LIMIT_RULES: List[Tuple[Optional[FrozenSet[str]], str, int]] = [
+    (frozenset({"POST"}), "/api/portfolio/import", PORTFOLIO_IMPORT_MAX_BYTES),
+]
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+class BodySizeLimitMiddleware:
+    """
+    Ограничение размера тела загрузок. FastAPI разбирает multipart-форму целиком до вызова
+    обработчика, поэтому лимит проверяется здесь: сначала по Content-Length, затем по числу
+    фактически прочитанных байт — и запрос обрывается с 413, не дочитывая тело.
+    """
+
+    def __init__(self, app: ASGIApp, rules=None):
+        self.app = app
+        self.rules = BODY_LIMIT_RULES if rules is None else rules
+
+    def limit_for(self, method: str, path: str) -> Optional[int]:
+        for methods, prefix, limit in self.rules:
+            if (methods is None or method in methods) and path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limit_for(scope.get("method", "GET"), scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope.get("headers") or []).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            logger.warning(f"Rejecting {scope['method']} {scope['path']}: body of {int(declared)} bytes over {limit}")
+            await self._reject(send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            # FastAPI превращает ошибку чтения формы в 400; вместо такого ответа отдаём 413.
+            nonlocal started
+            if exceeded:
+                if message["type"] == "http.response.start":
+                    started = True
+                    await self._reject(send)
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except BodyTooLarge:
+            if not started:
+                await self._reject(send)
+        if exceeded:
+            logger.warning(f"Rejected {scope['method']} {scope['path']}: body over {limit} bytes")
+
+    @staticmethod
+    async def _reject(send: Send) -> None:
+        body = json.dumps(
+            {"success": False, "message": "Слишком большой запрос"}, ensure_ascii=False
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
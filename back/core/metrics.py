@@ -0,0 +1,222 @@
+import asyncio
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+
+from .logger import logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "martfi_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS = Counter(
+    "martfi_http_requests_total",
+    "HTTP responses by route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "martfi_http_requests_in_progress",
+    "HTTP requests currently being handled",
+)
+
+PROVIDER_FETCH_DURATION = Histogram(
+    "martfi_provider_fetch_duration_seconds",
+    "MOEX ISS fetch duration per provider",
+    ["asset_type"],
+    buckets=LATENCY_BUCKETS + (30.0, 60.0),
+)
+PROVIDER_FETCHES = Counter(
+    "martfi_provider_fetches_total",
+    "MOEX ISS fetches per provider by outcome (ok, unavailable, error)",
+    ["asset_type", "result"],
+)
+PROVIDER_RETRIES = Counter(
+    "martfi_provider_retries_total",
+    "Repeated MOEX ISS fetch attempts per provider",
+    ["asset_type"],
+)
+PROVIDER_CIRCUIT_STATE = Gauge(
+    "martfi_provider_circuit_state",
+    "Circuit breaker state per provider (0 closed, 1 half-open, 2 open)",
+    ["asset_type"],
+)
+PROVIDER_ROWS = Gauge(
+    "martfi_provider_rows",
+    "Rows returned by the last MOEX ISS fetch per provider",
+    ["asset_type"],
+)
+REFRESH_LEADER = Gauge(
+    "martfi_refresh_leader",
+    "1 if this process holds the refresh lease for the asset type",
+    ["asset_type"],
+)
+
+CACHE_REQUESTS = Counter(
+    "martfi_cache_requests_total",
+    "Cache lookups by cache, asset type and result (local, hit, miss, stale, error)",
+    ["cache", "asset_type", "result"],
+)
+CACHE_DECODE_DURATION = Histogram(
+    "martfi_cache_decode_duration_seconds",
+    "Time spent decoding cached payloads",
+    ["cache", "asset_type"],
+    buckets=FAST_BUCKETS,
+)
+
+ALERTS_FIRED = Counter(
+    "martfi_alerts_fired_total",
+    "Price alerts fired and delivered per asset type",
+    ["asset_type"],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "martfi_admission_in_flight",
+    "Requests admitted and running per route class",
+    ["route_class"],
+)
+ADMISSION_QUEUED = Gauge(
+    "martfi_admission_queued",
+    "Requests waiting for admission per route class",
+    ["route_class"],
+)
+ADMISSION_WAIT = Histogram(
+    "martfi_admission_wait_seconds",
+    "Time queued requests waited for admission",
+    ["route_class"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    "martfi_admission_rejected_total",
+    "Requests shed with 503 per route class by reason (queue_full, timeout)",
+    ["route_class", "reason"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "martfi_event_loop_lag_seconds",
+    "Delay between the scheduled and actual wake-up of the event loop probe",
+    buckets=FAST_BUCKETS + (0.5, 1.0),
+)
+
+EVENT_LOOP_PROBE_INTERVAL = 0.5
+
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware, записывающий латентность и статусы по шаблону маршрута.
+    Метка route берётся из совпавшего маршрута (/market/{asset_type}), а не из пути,
+    поэтому кардинальность ограничена числом маршрутов приложения.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            route_name = getattr(route, "path", None)
+            if route_name is None:
+                route_name = f"{scope['root_path']}/*" if scope.get("root_path") else "unmatched"
+            method = scope.get("method", "GET")
+            if method not in HTTP_METHODS:
+                method = "OTHER"
+            HTTP_REQUEST_DURATION.labels(method, route_name).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route_name, str(status_code)).inc()
+
+
+class DatabasePoolCollector:
+    """Состояние пула соединений SQLAlchemy, снимаемое в момент запроса /metrics."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.pool
+        for name, attribute, description in (
+            ("martfi_db_pool_size", "size", "Configured pool size"),
+            ("martfi_db_pool_checked_out", "checkedout", "Connections currently checked out"),
+            ("martfi_db_pool_checked_in", "checkedin", "Idle connections in the pool"),
+            ("martfi_db_pool_overflow", "overflow", "Connections opened beyond the pool size"),
+        ):
+            method = getattr(pool, attribute, None)
+            if method is None:
+                continue
+            try:
+                yield GaugeMetricFamily(name, description, value=method())
+            except Exception as e:
+                logger.error(f"Error collecting {name}: {e}")
+
+
+_registered_engines = set()
+
+
+def register_database_pool(engine) -> None:
+    if id(engine) in _registered_engines:
+        return
+    REGISTRY.register(DatabasePoolCollector(engine))
+    _registered_engines.add(id(engine))
+
+
+async def monitor_event_loop_lag(interval: float = EVENT_LOOP_PROBE_INTERVAL) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - scheduled))
+
+
+def record_cache_lookup(cache: str, asset_type: str, result: str, decode_seconds: Optional[float] = None) -> None:
+    CACHE_REQUESTS.labels(cache, asset_type, result).inc()
+    if decode_seconds is not None:
+        CACHE_DECODE_DURATION.labels(cache, asset_type).observe(decode_seconds)
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "MetricsMiddleware",
+    "PROVIDER_FETCH_DURATION",
+    "PROVIDER_FETCHES",
+    "PROVIDER_RETRIES",
+    "PROVIDER_CIRCUIT_STATE",
+    "REFRESH_LEADER",
+    "ADMISSION_IN_FLIGHT",
+    "ADMISSION_QUEUED",
+    "ADMISSION_WAIT",
+    "ADMISSION_REJECTED",
+    "ALERTS_FIRED",
+    "PROVIDER_ROWS",
+    "record_cache_lookup",
+    "register_database_pool",
+    "monitor_event_loop_lag",
+    "render_metrics",
+]
@@ -1,39 +1,194 @@
 import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
 from .redis_client import redis_client
 
 logger = logging.getLogger(__name__)
 
+KEY_PREFIX = "ratelimit"
+
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
+
+# KEYS[1] — ZSET с отметками времени попыток.
+# ARGV: now_ms, window_ms, limit, cost, member_prefix.
+# cost = 0 только проверяет окно, ничего не записывая.
+_SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count + math.max(cost, 1) <= limit then
+    allowed = 1
+end
+if cost > 0 and allowed == 1 then
+    for i = 1, cost do
+        redis.call('ZADD', key, now, ARGV[5] .. ':' .. i)
+    end
+    count = count + cost
+    redis.call('PEXPIRE', key, window)
+end
+
+local retry_after = 0
+if allowed == 0 then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        retry_after = tonumber(oldest[2]) + window - now
+    else
+        retry_after = window
+    end
+end
+return {allowed, limit - count, retry_after}
+"""
+
+# KEYS[1] — HASH {tokens, ts}.
+# ARGV: now_ms, capacity, refill_per_ms, cost, ttl_ms.
+# Отрицательный cost возвращает токены в корзину (не больше capacity).
+_TOKEN_BUCKET_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local ttl = tonumber(ARGV[5])
+
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if cost < 0 then
+    allowed = 1
+    tokens = math.min(capacity, tokens - cost)
+elseif tokens >= math.max(cost, 1) then
+    allowed = 1
+    tokens = tokens - cost
+end
+if cost ~= 0 then
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, ttl)
+end
+
+local retry_after = 0
+if allowed == 0 then
+    retry_after = math.ceil((math.max(cost, 1) - tokens) / rate)
+end
+return {allowed, math.floor(tokens), retry_after}
+"""
+
+_sliding_window_script = redis_client.register_script(_SLIDING_WINDOW_LUA)
+_token_bucket_script = redis_client.register_script(_TOKEN_BUCKET_LUA)
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    limit: int
+    window_seconds: int
+    algorithm: str = SLIDING_WINDOW
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after: float
 
-def is_rate_limited(key: str) -> bool:
+
+def hit(key: str, policy: RateLimitPolicy, cost: int = 1) -> RateLimitResult:
+    """
+    Проверяет лимит и списывает попытку за один вызов Lua-скрипта.
+    При cost=0 лимит только проверяется. Ошибки Redis не блокируют запрос.
+    """
+    redis_key = f"{KEY_PREFIX}:{policy.name}:{key}"
+    now_ms = int(time.time() * 1000)
+    window_ms = policy.window_seconds * 1000
     try:
-        attempts = redis_client.get(key)
-        return attempts and int(attempts) >= 5
+        if policy.algorithm == TOKEN_BUCKET:
+            allowed, remaining, retry_after = _token_bucket_script(
+                keys=[redis_key],
+                args=[now_ms, policy.limit, policy.limit / window_ms, cost, window_ms],
+            )
+        else:
+            allowed, remaining, retry_after = _sliding_window_script(
+                keys=[redis_key],
+                args=[now_ms, window_ms, policy.limit, cost, f"{now_ms}:{uuid.uuid4().hex}"],
+            )
+        return RateLimitResult(bool(allowed), max(int(remaining), 0), max(int(retry_after), 0) / 1000)
     except Exception as e:
-        logger.error(f"Redis error in is_rate_limited: {e}")
-        return False
+        logger.error(f"Redis error in rate limiter {policy.name}: {e}")
+        return RateLimitResult(True, policy.limit, 0)
 
 
-def increment_rate_limit(key: str):
+def refund(key: str, policy: RateLimitPolicy, cost: int = 1) -> None:
+    """Возвращает списанные попытки, если запрос всё же отклонён другим лимитом."""
+    redis_key = f"{KEY_PREFIX}:{policy.name}:{key}"
     try:
-        redis_client.incr(key)
-        redis_client.expire(key, 3600)
+        if policy.algorithm == TOKEN_BUCKET:
+            window_ms = policy.window_seconds * 1000
+            _token_bucket_script(
+                keys=[redis_key],
+                args=[int(time.time() * 1000), policy.limit, policy.limit / window_ms, -cost, window_ms],
+            )
+        else:
+            redis_client.zpopmax(redis_key, cost)
     except Exception as e:
-        logger.error(f"Redis error in increment_rate_limit: {e}")
+        logger.error(f"Redis error in rate limiter refund {policy.name}: {e}")
 
 
-def clear_rate_limit(key: str):
+def reset(key: str, policy: RateLimitPolicy) -> None:
     try:
-        redis_client.delete(key)
+        redis_client.delete(f"{KEY_PREFIX}:{policy.name}:{key}")
     except Exception as e:
-        logger.error(f"Redis error in clear_rate_limit: {e}")
+        logger.error(f"Redis error in rate limiter reset {policy.name}: {e}")
+
+
+LOGIN_POLICY = RateLimitPolicy("login", limit=5, window_seconds=3600)
+REGISTRATION_POLICY = RateLimitPolicy("registration", limit=5, window_seconds=3600)
+MARKET_REFRESH_USER_POLICY = RateLimitPolicy("market_refresh_user", limit=3, window_seconds=300, algorithm=TOKEN_BUCKET)
+MARKET_REFRESH_GLOBAL_POLICY = RateLimitPolicy("market_refresh", limit=6, window_seconds=60)
+PORTFOLIO_IMPORT_POLICY = RateLimitPolicy("portfolio_import", limit=10, window_seconds=3600)
+
+
+def _policy_for(key: str) -> RateLimitPolicy:
+    return REGISTRATION_POLICY if key.startswith("reg_attempts:") else LOGIN_POLICY
+
+
+def is_rate_limited(key: str, policy: Optional[RateLimitPolicy] = None) -> bool:
+    return not hit(key, policy or _policy_for(key), cost=0).allowed
+
+
+def increment_rate_limit(key: str, policy: Optional[RateLimitPolicy] = None):
+    hit(key, policy or _policy_for(key))
+
+
+def clear_rate_limit(key: str, policy: Optional[RateLimitPolicy] = None):
+    reset(key, policy or _policy_for(key))
+
+
+def get_registration_rate_key(ip: str) -> str:
+    return f"reg_attempts:{ip}"
 
 
 def is_registration_rate_limited(ip: str) -> bool:
-    return is_rate_limited(f"reg_attempts:{ip}")
+    return is_rate_limited(get_registration_rate_key(ip))
 
 
 def increment_registration_attempts(ip: str):
-    increment_rate_limit(f"reg_attempts:{ip}")
+    increment_rate_limit(get_registration_rate_key(ip))
 
 
 def get_login_rate_key(email: str) -> str:
@@ -1,4 +1,15 @@
 import redis
 from ..config import settings
 
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+if settings.REDIS_URL.startswith("fakeredis://"):
+    # Встроенный Redis в памяти процесса для бенчмарков и локального запуска без сервера.
+    try:
+        import fakeredis
+    except ImportError as e:
+        raise RuntimeError(
+            "REDIS_URL=fakeredis:// requires fakeredis: pip install -r requirements-bench.txt "
+            "(or point REDIS_URL at a real Redis server)"
+        ) from e
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+else:
+    redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
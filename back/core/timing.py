@@ -0,0 +1,198 @@
+import functools
+import inspect
+import json
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Callable, List
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+
+from .logger import logger
+from .redis_client import redis_client
+from ..config import settings
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+PROFILE_TTL = 3600
+PROFILE_INDEX_KEY = "profiles:recent"
+PROFILE_INDEX_SIZE = 50
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, name: str, duration: float) -> None:
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [duration, 1]
+        else:
+            span[0] += duration
+            span[1] += 1
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        parts = [f"{name};dur={duration * 1000:.2f}" for name, (duration, _) in self.spans.items()]
+        parts.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {"ms": round(duration * 1000, 3), "count": int(count)}
+            for name, (duration, count) in self.spans.items()
+        }
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_span(name: str, duration: float) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(name, duration)
+
+
+@contextmanager
+def span(name: str):
+    """Замер участка кода; вне HTTP-запроса ничего не делает."""
+    if _current_timings.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started)
+
+
+def timed(name: str) -> Callable:
+    """Декоратор для синхронных и асинхронных функций, записывающий их время в span name."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_engine(engine) -> None:
+    """Время выполнения SQL попадает в span db."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_stack = conn.info.get("query_started")
+        if not started_stack:
+            return
+        started = started_stack.pop()
+        record_span("db", time.perf_counter() - started)
+
+
+def _store_profile(profile_id: str, profiler, method: str, path: str) -> Optional[str]:
+    try:
+        pipe = redis_client.pipeline()
+        pipe.setex(f"profile:{profile_id}", PROFILE_TTL, profiler.output_html())
+        pipe.lpush(PROFILE_INDEX_KEY, json.dumps({
+            "id": profile_id,
+            "method": method,
+            "path": path,
+            "duration_ms": round(profiler.last_session.duration * 1000, 2),
+            "recorded_at": time.time(),
+        }))
+        pipe.ltrim(PROFILE_INDEX_KEY, 0, PROFILE_INDEX_SIZE - 1)
+        pipe.expire(PROFILE_INDEX_KEY, PROFILE_TTL)
+        pipe.execute()
+        return profile_id
+    except Exception as e:
+        logger.error(f"Error storing request profile: {e}")
+        return None
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    return redis_client.get(f"profile:{profile_id}")
+
+
+def list_profiles() -> List[Dict]:
+    return [json.loads(item) for item in redis_client.lrange(PROFILE_INDEX_KEY, 0, -1)]
+
+
+class TimingMiddleware:
+    """
+    Собирает именованные интервалы запроса (auth, db, redis, json, template, ...),
+    отдаёт их в заголовке Server-Timing и пишет одной структурированной строкой лога.
+    С вероятностью PROFILE_SAMPLE_RATE запрос дополнительно профилируется pyinstrument;
+    профиль доступен по идентификатору из заголовка X-Profile-Id.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        if self.sample_rate > 0 and Profiler is None:
+            logger.warning("PROFILE_SAMPLE_RATE is set but pyinstrument is not installed; profiling disabled")
+            self.sample_rate = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(("/static", "/metrics")):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        profiler = None
+        if self.sample_rate and not scope["path"].startswith("/debug") and random.random() < self.sample_rate:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+        profile_id = secrets.token_urlsafe(12) if profiler else None
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing())
+                if profile_id:
+                    headers.append("X-Profile-Id", profile_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_timings.reset(token)
+            stored_profile = None
+            if profiler:
+                profiler.stop()
+                stored_profile = _store_profile(profile_id, profiler, scope.get("method", ""), scope["path"])
+            route = scope.get("route")
+            logger.info(json.dumps({
+                "event": "request_timing",
+                "method": scope.get("method"),
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status_code,
+                "total_ms": round(timings.total_ms(), 3),
+                "spans": timings.as_dict(),
+                "profile_id": stored_profile,
+            }, ensure_ascii=False))
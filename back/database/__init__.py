@@ -1,4 +1,7 @@
 from .database import get_db, create_tables, SessionLocal
-from .models import User, Stock, PortfolioItem
+from .models import User, Stock, PortfolioItem, QuoteHistory, WatchlistItem, PriceAlert
 
-__all__ = ["get_db", "create_tables", "SessionLocal", "User", "Stock", "PortfolioItem"]
\ No newline at end of file
+__all__ = [
+    "get_db", "create_tables", "SessionLocal",
+    "User", "Stock", "PortfolioItem", "QuoteHistory", "WatchlistItem", "PriceAlert",
+]
\ No newline at end of file
@@ -29,5 +29,8 @@ def get_db():
 
 
 def create_tables():
+    from .migrations import upgrade_schema
+
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     logger.info("Database tables created successfully")
@@ -1,3 +1,8 @@
+from collections import defaultdict
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
 from .database import engine, Base
 from .models import User, Stock
 import logging
@@ -10,5 +15,99 @@ def create_all_tables():
     logger.info("All tables created successfully")
 
 
+def _has_unique(connection: Connection, table: str, columns) -> bool:
+    inspector = inspect(connection)
+    wanted = set(columns)
+    constraints = inspector.get_unique_constraints(table)
+    indexes = [index for index in inspector.get_indexes(table) if index.get('unique')]
+    return any(set(item['column_names']) == wanted for item in constraints + indexes)
+
+
+def _upgrade_stocks(connection: Connection) -> None:
+    """
+    stocks хранит последнюю котировку по (ticker, asset_type): добавляет колонку asset_type
+    и заменяет уникальность по одному тикеру на уникальность по паре.
+    """
+    inspector = inspect(connection)
+    if 'asset_type' not in {column['name'] for column in inspector.get_columns('stocks')}:
+        connection.execute(text(
+            "ALTER TABLE stocks ADD COLUMN asset_type VARCHAR(20) NOT NULL DEFAULT 'stock'"
+        ))
+        logger.info("Added stocks.asset_type")
+
+    for index in inspector.get_indexes('stocks'):
+        if index.get('unique') and index['column_names'] == ['ticker']:
+            connection.execute(text(f"DROP INDEX {index['name']}"))
+            connection.execute(text(f"CREATE INDEX {index['name']} ON stocks (ticker)"))
+            logger.info(f"Replaced unique index {index['name']} with a plain one")
+    for constraint in inspector.get_unique_constraints('stocks'):
+        if constraint['column_names'] == ['ticker']:
+            if connection.dialect.name != 'postgresql':
+                raise RuntimeError(f"Cannot drop unique constraint {constraint['name']} on stocks.ticker")
+            connection.execute(text(f"ALTER TABLE stocks DROP CONSTRAINT {constraint['name']}"))
+            logger.info(f"Dropped unique constraint {constraint['name']}")
+
+    if not _has_unique(connection, 'stocks', ('ticker', 'asset_type')):
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_stocks_ticker_asset_type ON stocks (ticker, asset_type)"
+        ))
+        logger.info("Created uq_stocks_ticker_asset_type")
+
+
+def _upgrade_portfolio_items(connection: Connection) -> None:
+    """
+    Импорт портфеля пишет через ON CONFLICT (user_id, ticker, asset_type). Повторяющиеся позиции
+    сливаются в одну (количество суммируется, средняя цена — средневзвешенная), затем создаётся индекс.
+    """
+    if _has_unique(connection, 'portfolio_items', ('user_id', 'ticker', 'asset_type')):
+        return
+
+    rows = connection.execute(text(
+        "SELECT id, user_id, ticker, asset_type, quantity, average_price, notes FROM portfolio_items "
+        "WHERE (user_id, ticker, asset_type) IN ("
+        "  SELECT user_id, ticker, asset_type FROM portfolio_items"
+        "  GROUP BY user_id, ticker, asset_type HAVING COUNT(*) > 1"
+        ") ORDER BY id"
+    )).all()
+    groups = defaultdict(list)
+    for row in rows:
+        groups[(row.user_id, row.ticker, row.asset_type)].append(row)
+    for items in groups.values():
+        keep, duplicates = items[0], items[1:]
+        quantity = sum(item.quantity or 0 for item in items)
+        invested = sum((item.quantity or 0) * (item.average_price or 0) for item in items)
+        connection.execute(
+            text("UPDATE portfolio_items SET quantity = :quantity, average_price = :average_price, "
+                 "notes = :notes WHERE id = :id"),
+            {
+                'id': keep.id,
+                'quantity': quantity,
+                'average_price': invested / quantity if quantity > 0 else keep.average_price,
+                'notes': next((item.notes for item in reversed(items) if item.notes), None),
+            },
+        )
+        connection.execute(
+            text("DELETE FROM portfolio_items WHERE id = :id"), [{'id': item.id} for item in duplicates]
+        )
+    if groups:
+        logger.info(f"Merged {len(rows) - len(groups)} duplicate portfolio positions")
+
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_portfolio_user_ticker ON portfolio_items (user_id, ticker, asset_type)"
+    ))
+    logger.info("Created uq_portfolio_user_ticker")
+
+
+def upgrade_schema(bind: Engine = engine) -> None:
+    """
+    Доводит существующие таблицы до текущих моделей: create_all не меняет уже созданные таблицы.
+    Шаги идемпотентны и выполняются одной транзакцией; ошибка прерывает запуск приложения.
+    """
+    with bind.begin() as connection:
+        _upgrade_stocks(connection)
+        _upgrade_portfolio_items(connection)
+
+
 if __name__ == "__main__":
     create_all_tables()
+    upgrade_schema()
@@ -1,5 +1,8 @@
 from .user import User
 from .stock import Stock
 from .portfolio import PortfolioItem
+from .quote_history import QuoteHistory
+from .watchlist import WatchlistItem
+from .alert import PriceAlert
 
-__all__ = ["User", "Stock", "PortfolioItem"]
\ No newline at end of file
+__all__ = ["User", "Stock", "PortfolioItem", "QuoteHistory", "WatchlistItem", "PriceAlert"]
\ No newline at end of file
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..base import Base
+
+class PriceAlert(Base):
+    __tablename__ = "price_alerts"
+    __table_args__ = (
+        Index("ix_price_alerts_active", "active"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    ticker = Column(String(36), nullable=False)
+    asset_type = Column(String(20), nullable=False)
+    field = Column(String(20), nullable=False, default="price")
+    direction = Column(String(10), nullable=False)
+    threshold = Column(Float, nullable=False)
+    note = Column(String(200), nullable=True)
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    triggered_at = Column(DateTime(timezone=True), nullable=True)
+    triggered_value = Column(Float, nullable=True)
+
+    user = relationship("User", back_populates="price_alerts")
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..base import Base
 
 class PortfolioItem(Base):
     __tablename__ = "portfolio_items"
+    __table_args__ = (
+        UniqueConstraint("user_id", "ticker", "asset_type", name="uq_portfolio_user_ticker"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Float, Date, DateTime, Index
+from ..base import Base
+
+
+class QuoteHistory(Base):
+    __tablename__ = "quote_history"
+    __table_args__ = (
+        Index("ix_quote_history_ticker_recorded_at", "ticker", "recorded_at"),
+        {"postgresql_partition_by": "RANGE (trade_date)"},
+    )
+
+    ticker = Column(String(36), primary_key=True)
+    asset_type = Column(String(20), primary_key=True)
+    recorded_at = Column(DateTime(timezone=True), primary_key=True)
+    trade_date = Column(Date, primary_key=True)
+    price = Column(Float, default=0.0)
+    change = Column(Float, default=0.0)
+    change_percent = Column(Float, default=0.0)
+    volume = Column(Float, default=0.0)
@@ -1,13 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from ..base import Base
 
 
 class Stock(Base):
     __tablename__ = "stocks"
+    __table_args__ = (
+        UniqueConstraint("ticker", "asset_type", name="uq_stocks_ticker_asset_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    ticker = Column(String(20), unique=True, index=True, nullable=False)
+    ticker = Column(String(20), index=True, nullable=False)
+    asset_type = Column(String(20), nullable=False, default="stock", server_default="stock")
     name = Column(String(255), nullable=False)
     full_name = Column(String(500), nullable=True)
     price = Column(Float, default=0.0)
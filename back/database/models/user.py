@@ -8,4 +8,6 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(100), nullable=False)
-    portfolio_items = relationship("PortfolioItem", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    portfolio_items = relationship("PortfolioItem", back_populates="user", cascade="all, delete-orphan")
+    watchlist_items = relationship("WatchlistItem", back_populates="user", cascade="all, delete-orphan")
+    price_alerts = relationship("PriceAlert", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
@@ -1,4 +1,7 @@
 from .user_repository import UserRepository
 from .portfolio_repository import PortfolioRepository
+from .quote_history_repository import QuoteHistoryRepository
+from .watchlist_repository import WatchlistRepository
+from .alert_repository import AlertRepository
 
-__all__ = ["UserRepository", "PortfolioRepository"]
\ No newline at end of file
+__all__ = ["UserRepository", "PortfolioRepository", "QuoteHistoryRepository", "WatchlistRepository", "AlertRepository"]
\ No newline at end of file
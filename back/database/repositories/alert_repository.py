@@ -0,0 +1,118 @@
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from ..models.alert import PriceAlert as ORMPriceAlert
+from ...core.logger import logger
+
+class AlertRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _to_dict(alert: ORMPriceAlert) -> Dict[str, Any]:
+        return {
+            'id': alert.id,
+            'user_id': alert.user_id,
+            'ticker': alert.ticker,
+            'asset_type': alert.asset_type,
+            'field': alert.field,
+            'direction': alert.direction,
+            'threshold': alert.threshold,
+            'note': alert.note,
+            'active': alert.active,
+            'created_at': alert.created_at.isoformat() if alert.created_at else None,
+            'triggered_at': alert.triggered_at.isoformat() if alert.triggered_at else None,
+            'triggered_value': alert.triggered_value,
+        }
+
+    def get_active_alerts(self) -> List[Dict[str, Any]]:
+        alerts = self.db.query(ORMPriceAlert).filter(ORMPriceAlert.active.is_(True)).all()
+        return [self._to_dict(alert) for alert in alerts]
+
+    def get_user_alerts(self, user_id: int) -> List[Dict[str, Any]]:
+        alerts = self.db.query(ORMPriceAlert).filter(
+            ORMPriceAlert.user_id == user_id
+        ).order_by(ORMPriceAlert.active.desc(), ORMPriceAlert.id.desc()).all()
+        return [self._to_dict(alert) for alert in alerts]
+
+    def count_active(self, user_id: int) -> int:
+        return self.db.query(ORMPriceAlert).filter(
+            ORMPriceAlert.user_id == user_id,
+            ORMPriceAlert.active.is_(True)
+        ).count()
+
+    def create(self, user_id: int, ticker: str, asset_type: str, field: str, direction: str,
+               threshold: float, note: str = "", triggered_value: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            alert = ORMPriceAlert(
+                user_id=user_id,
+                ticker=ticker,
+                asset_type=asset_type,
+                field=field,
+                direction=direction,
+                threshold=threshold,
+                note=note or None,
+                active=triggered_value is None,
+                triggered_at=datetime.now().astimezone() if triggered_value is not None else None,
+                triggered_value=triggered_value,
+            )
+            self.db.add(alert)
+            self.db.commit()
+            self.db.refresh(alert)
+            return self._to_dict(alert)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error creating price alert: {e}")
+            return None
+
+    def delete(self, user_id: int, alert_id: int) -> bool:
+        try:
+            deleted = self.db.query(ORMPriceAlert).filter(
+                ORMPriceAlert.id == alert_id,
+                ORMPriceAlert.user_id == user_id
+            ).delete()
+            self.db.commit()
+            return bool(deleted)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error deleting price alert: {e}")
+            return False
+
+    def mark_triggered(self, fired: List[Tuple[int, float]], triggered_at: datetime) -> List[int]:
+        """Снимает сработавшие оповещения; возвращает id тех, что ещё были активны (без повторной доставки)."""
+        try:
+            marked = []
+            for alert_id, value in fired:
+                result = self.db.execute(
+                    update(ORMPriceAlert)
+                    .where(ORMPriceAlert.id == alert_id, ORMPriceAlert.active.is_(True))
+                    .values(active=False, triggered_at=triggered_at, triggered_value=value)
+                )
+                if result.rowcount:
+                    marked.append(alert_id)
+            self.db.commit()
+            return marked
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error marking price alerts as triggered: {e}")
+            return []
+
+    def rearm(self, alert_ids: List[int]) -> bool:
+        """Возвращает в активные оповещения, которые не удалось доставить."""
+        try:
+            self.db.execute(
+                update(ORMPriceAlert)
+                .where(ORMPriceAlert.id.in_(alert_ids))
+                .values(active=True, triggered_at=None, triggered_value=None)
+            )
+            self.db.commit()
+            return True
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error re-arming price alerts: {e}")
+            return False
@@ -1,8 +1,12 @@
 from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, case, delete, func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from ..models.portfolio import PortfolioItem as ORMPortfolioItem
 from ...core.logger import logger
 
+UPSERT_BATCH_SIZE = 1000
+
 class PortfolioRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -123,4 +127,107 @@ class PortfolioRepository:
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error updating portfolio item: {e}")
+            return None
+    
+    def bulk_upsert(self, user_id: int, positions: List[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+        """
+        Добавляет позиции одной транзакцией через INSERT ... ON CONFLICT по (user_id, ticker, asset_type):
+        количество складывается, средняя цена пересчитывается как средневзвешенная.
+        """
+        try:
+            keys = [(p['ticker'], p['asset_type']) for p in positions]
+            existing = {
+                (row.ticker, row.asset_type)
+                for row in self.db.execute(
+                    select(ORMPortfolioItem.ticker, ORMPortfolioItem.asset_type).where(
+                        ORMPortfolioItem.user_id == user_id,
+                        tuple_(ORMPortfolioItem.ticker, ORMPortfolioItem.asset_type).in_(keys),
+                    )
+                )
+            }
+            
+            dialect_insert = postgresql.insert if self.db.get_bind().dialect.name == 'postgresql' else sqlite.insert
+            table = ORMPortfolioItem.__table__
+            for start in range(0, len(positions), UPSERT_BATCH_SIZE):
+                rows = [
+                    {
+                        'user_id': user_id,
+                        'ticker': position['ticker'],
+                        'asset_type': position['asset_type'],
+                        'quantity': position['quantity'],
+                        'average_price': position['average_price'],
+                        'notes': position.get('notes') or None,
+                    }
+                    for position in positions[start:start + UPSERT_BATCH_SIZE]
+                ]
+                stmt = dialect_insert(ORMPortfolioItem).values(rows)
+                excluded = stmt.excluded
+                total_quantity = table.c.quantity + excluded.quantity
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.user_id, table.c.ticker, table.c.asset_type],
+                    set_={
+                        'quantity': total_quantity,
+                        'average_price': case(
+                            (
+                                and_(excluded.average_price > 0, total_quantity > 0),
+                                (table.c.quantity * table.c.average_price
+                                 + excluded.quantity * excluded.average_price) / total_quantity,
+                            ),
+                            else_=table.c.average_price,
+                        ),
+                        'notes': func.coalesce(excluded.notes, table.c.notes),
+                        'updated_at': func.now(),
+                    },
+                )
+                self.db.execute(stmt)
+            self.db.commit()
+            
+            updated = sum(1 for key in set(keys) if key in existing)
+            return {'inserted': len(positions) - updated, 'updated': updated}
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error importing portfolio: {e}")
+            return None
+    
+    def batch_mutate(self, user_id: int, remove_ids: List[int], 
+                     updates: List[Dict[str, Any]]) -> Optional[Dict[str, List[int]]]:
+        try:
+            update_ids = [u['id'] for u in updates]
+            items = {
+                item.id: item
+                for item in self.db.query(ORMPortfolioItem).filter(
+                    ORMPortfolioItem.user_id == user_id,
+                    ORMPortfolioItem.id.in_(update_ids)
+                ).all()
+            } if update_ids else {}
+            
+            updated = []
+            for update in updates:
+                item = items.get(update['id'])
+                if not item:
+                    continue
+                if update.get('quantity') is not None:
+                    item.quantity = update['quantity']
+                if update.get('average_price') is not None:
+                    item.average_price = update['average_price']
+                if update.get('notes') is not None:
+                    item.notes = update['notes']
+                updated.append(item.id)
+            
+            removed = []
+            if remove_ids:
+                result = self.db.execute(
+                    delete(ORMPortfolioItem)
+                    .where(ORMPortfolioItem.user_id == user_id, ORMPortfolioItem.id.in_(remove_ids))
+                    .returning(ORMPortfolioItem.id)
+                )
+                removed = [row[0] for row in result]
+            
+            self.db.commit()
+            return {'removed': removed, 'updated': updated}
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error applying portfolio batch: {e}")
             return None
\ No newline at end of file
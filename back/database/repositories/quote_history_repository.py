@@ -0,0 +1,253 @@
+import csv
+import io
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import insert, select, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..models.quote_history import QuoteHistory
+from ..models.stock import Stock
+from ...core.logger import logger
+
+HISTORY_COLUMNS = ('ticker', 'asset_type', 'trade_date', 'recorded_at', 'price', 'change', 'change_percent', 'volume')
+
+_ensured_partitions = set()
+
+
+class QuoteHistoryRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @property
+    def _dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+
+    def _ensure_partition(self, day: date) -> Optional[str]:
+        """Создаёт партицию дня в текущей транзакции; имя запоминается только после коммита."""
+        name = f"quote_history_{day:%Y%m%d}"
+        if name in _ensured_partitions:
+            return None
+        self.db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF quote_history "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        ))
+        return name
+
+    def _latest_quotes(self, asset_type: str, tickers: List[str]) -> Dict[str, tuple]:
+        rows = self.db.execute(
+            select(Stock.ticker, Stock.price, Stock.change)
+            .where(Stock.asset_type == asset_type, Stock.ticker.in_(tickers))
+        ).all()
+        return {row.ticker: (row.price, row.change) for row in rows}
+
+    def _upsert_latest(self, asset_type: str, quotes: List[Dict[str, Any]], recorded_at: datetime) -> None:
+        rows = [
+            {
+                'ticker': q['ticker'],
+                'asset_type': asset_type,
+                'name': (q.get('name') or q['ticker'])[:255],
+                'full_name': (q.get('full_name') or '')[:500] or None,
+                'price': q['price'],
+                'change': q['change'],
+                'updated_at': recorded_at,
+            }
+            for q in quotes
+        ]
+        dialect_insert = postgresql.insert if self._dialect == 'postgresql' else sqlite.insert
+        stmt = dialect_insert(Stock).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Stock.ticker, Stock.asset_type],
+            set_={
+                'name': stmt.excluded.name,
+                'full_name': stmt.excluded.full_name,
+                'price': stmt.excluded.price,
+                'change': stmt.excluded.change,
+                'updated_at': stmt.excluded.updated_at,
+            },
+        )
+        self.db.execute(stmt)
+
+    def _copy_history(self, rows: List[tuple]) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY quote_history ({', '.join(HISTORY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+    def record_quotes(self, asset_type: str, quotes: List[Dict[str, Any]], recorded_at: datetime) -> int:
+        """Записывает изменившиеся котировки. Неизменные с прошлого снимка пропускаются."""
+        quotes = {q['ticker']: q for q in quotes if q.get('ticker')}
+        if not quotes:
+            return 0
+        try:
+            latest = self._latest_quotes(asset_type, list(quotes))
+            changed = []
+            for ticker, quote in quotes.items():
+                price = float(quote.get('price') or 0)
+                change = float(quote.get('change') or 0)
+                if latest.get(ticker) == (price, change):
+                    continue
+                changed.append({**quote, 'price': price, 'change': change})
+
+            if not changed:
+                return 0
+
+            trade_date = recorded_at.date()
+            rows = [
+                (
+                    q['ticker'],
+                    asset_type,
+                    trade_date,
+                    recorded_at,
+                    q['price'],
+                    q['change'],
+                    float(q.get('change_percent') or 0),
+                    float(q.get('volume') or 0),
+                )
+                for q in changed
+            ]
+
+            partition = None
+            if self._dialect == 'postgresql':
+                partition = self._ensure_partition(trade_date)
+                self._copy_history(rows)
+            else:
+                self.db.execute(insert(QuoteHistory), [dict(zip(HISTORY_COLUMNS, row)) for row in rows])
+
+            self._upsert_latest(asset_type, changed, recorded_at)
+            self.db.commit()
+            if partition is not None:
+                _ensured_partitions.add(partition)
+            return len(rows)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error recording {asset_type} quote history: {e}")
+            return 0
+
+    def get_history(self, ticker: str, start: datetime, end: datetime,
+                    bucket_seconds: Optional[int] = None, asset_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        if bucket_seconds and self._dialect == 'postgresql':
+            return self._get_downsampled(ticker, start, end, bucket_seconds, asset_type)
+
+        query = self.db.query(QuoteHistory).filter(
+            QuoteHistory.ticker == ticker,
+            QuoteHistory.trade_date >= start.date(),
+            QuoteHistory.trade_date <= end.date(),
+            QuoteHistory.recorded_at >= start,
+            QuoteHistory.recorded_at < end,
+        )
+        if asset_type:
+            query = query.filter(QuoteHistory.asset_type == asset_type)
+        rows = [
+            {
+                'time': item.recorded_at,
+                'price': item.price,
+                'change': item.change,
+                'change_percent': item.change_percent,
+                'volume': item.volume,
+            }
+            for item in query.order_by(QuoteHistory.recorded_at).all()
+        ]
+        if bucket_seconds:
+            return self._downsample(rows, bucket_seconds)
+        return [{**row, 'time': row['time'].isoformat()} for row in rows]
+
+    def get_daily_closes(self, keys: List[Tuple[str, str]], start_day: date,
+                         end_day: date) -> Dict[Tuple[str, str], Dict[date, float]]:
+        """Последняя цена каждого дня по парам (asset_type, ticker)."""
+        if not keys:
+            return {}
+        query = select(
+            QuoteHistory.asset_type, QuoteHistory.ticker, QuoteHistory.trade_date, QuoteHistory.price
+        ).where(
+            tuple_(QuoteHistory.asset_type, QuoteHistory.ticker).in_(keys),
+            QuoteHistory.trade_date >= start_day,
+            QuoteHistory.trade_date <= end_day,
+            QuoteHistory.price > 0,
+        )
+        if self._dialect == 'postgresql':
+            query = query.distinct(
+                QuoteHistory.asset_type, QuoteHistory.ticker, QuoteHistory.trade_date
+            ).order_by(
+                QuoteHistory.asset_type, QuoteHistory.ticker, QuoteHistory.trade_date, QuoteHistory.recorded_at.desc()
+            )
+        else:
+            query = query.order_by(QuoteHistory.recorded_at)
+
+        closes: Dict[Tuple[str, str], Dict[date, float]] = {key: {} for key in keys}
+        for row in self.db.execute(query):
+            series = closes.setdefault((row.asset_type, row.ticker), {})
+            if self._dialect != 'postgresql' or row.trade_date not in series:
+                series[row.trade_date] = row.price
+        return closes
+
+    def _get_downsampled(self, ticker: str, start: datetime, end: datetime,
+                         bucket_seconds: int, asset_type: Optional[str]) -> List[Dict[str, Any]]:
+        asset_filter = "AND asset_type = :asset_type" if asset_type else ""
+        result = self.db.execute(text(f"""
+            SELECT date_bin(make_interval(secs => :bucket), recorded_at, TIMESTAMPTZ '2000-01-01') AS bucket,
+                   (array_agg(price ORDER BY recorded_at))[1] AS open,
+                   max(price) AS high,
+                   min(price) AS low,
+                   (array_agg(price ORDER BY recorded_at DESC))[1] AS close,
+                   max(volume) AS volume,
+                   count(*) AS samples
+            FROM quote_history
+            WHERE ticker = :ticker
+              AND trade_date BETWEEN :start_day AND :end_day
+              AND recorded_at >= :start AND recorded_at < :end
+              {asset_filter}
+            GROUP BY bucket
+            ORDER BY bucket
+        """), {
+            'bucket': bucket_seconds,
+            'ticker': ticker,
+            'asset_type': asset_type,
+            'start_day': start.date(),
+            'end_day': end.date(),
+            'start': start,
+            'end': end,
+        })
+        return [
+            {
+                'time': row.bucket.isoformat(),
+                'open': row.open,
+                'high': row.high,
+                'low': row.low,
+                'close': row.close,
+                'volume': row.volume,
+                'samples': row.samples,
+            }
+            for row in result
+        ]
+
+    @staticmethod
+    def _downsample(rows: List[Dict[str, Any]], bucket_seconds: int) -> List[Dict[str, Any]]:
+        buckets: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            key = int(row['time'].timestamp()) // bucket_seconds * bucket_seconds
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {
+                    'time': datetime.fromtimestamp(key, tz=row['time'].tzinfo).isoformat(),
+                    'open': row['price'],
+                    'high': row['price'],
+                    'low': row['price'],
+                    'close': row['price'],
+                    'volume': row['volume'],
+                    'samples': 1,
+                }
+            else:
+                bucket['high'] = max(bucket['high'], row['price'])
+                bucket['low'] = min(bucket['low'], row['price'])
+                bucket['close'] = row['price']
+                bucket['volume'] = max(bucket['volume'], row['volume'])
+                bucket['samples'] += 1
+        return list(buckets.values())
@@ -0,0 +1,63 @@
+from typing import List, Optional, Dict, Any
+from sqlalchemy.orm import Session
+from ..models.watchlist import WatchlistItem as ORMWatchlistItem
+from ...core.logger import logger
+
+MAX_WATCHLIST_ITEMS = 200
+
+class WatchlistRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _to_dict(item: ORMWatchlistItem) -> Dict[str, Any]:
+        return {
+            'id': item.id,
+            'ticker': item.ticker,
+            'asset_type': item.asset_type,
+            'created_at': item.created_at.isoformat() if item.created_at else None,
+        }
+
+    def get_user_watchlist(self, user_id: int) -> List[Dict[str, Any]]:
+        items = self.db.query(ORMWatchlistItem).filter(
+            ORMWatchlistItem.user_id == user_id
+        ).order_by(ORMWatchlistItem.id).all()
+        return [self._to_dict(item) for item in items]
+
+    def count(self, user_id: int) -> int:
+        return self.db.query(ORMWatchlistItem).filter(ORMWatchlistItem.user_id == user_id).count()
+
+    def add(self, user_id: int, ticker: str, asset_type: str) -> Optional[Dict[str, Any]]:
+        try:
+            existing = self.db.query(ORMWatchlistItem).filter(
+                ORMWatchlistItem.user_id == user_id,
+                ORMWatchlistItem.ticker == ticker,
+                ORMWatchlistItem.asset_type == asset_type
+            ).first()
+            if existing:
+                return self._to_dict(existing)
+
+            item = ORMWatchlistItem(user_id=user_id, ticker=ticker, asset_type=asset_type)
+            self.db.add(item)
+            self.db.commit()
+            self.db.refresh(item)
+            return self._to_dict(item)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error adding to watchlist: {e}")
+            return None
+
+    def remove(self, user_id: int, item_id: int) -> bool:
+        try:
+            deleted = self.db.query(ORMWatchlistItem).filter(
+                ORMWatchlistItem.id == item_id,
+                ORMWatchlistItem.user_id == user_id
+            ).delete()
+            self.db.commit()
+            return bool(deleted)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error removing from watchlist: {e}")
+            return False
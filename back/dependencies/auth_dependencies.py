@@ -1,5 +1,5 @@
 from typing import Callable, Optional, Tuple
-from fastapi import Depends, Request
+from fastapi import Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from ..contracts.security import ISecurityService
@@ -9,6 +9,7 @@ from ..auth.entities.user import User as DomainUser
 from ..database import get_db
 from .common import get_security_service
 from ..database.repositories.user_repository import UserRepository
+from ..config import settings
 
 
 def get_user_repository(db: Session = Depends(get_db)) -> IUserRepository:
@@ -30,6 +31,16 @@ async def get_current_user(
     return await auth_service.get_current_user(token)
 
 
+async def get_admin_user(
+    current_user: Optional[DomainUser] = Depends(get_current_user),
+) -> DomainUser:
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if current_user.email.lower() not in settings.ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
 async def get_auth_context_service(
     auth_service: AuthService = Depends(get_auth_service),
     current_user: Optional[DomainUser] = Depends(get_current_user),
@@ -1,6 +1,17 @@
-from ..services.security_service import SecurityService
+from fastapi import Depends, Request
+
+from ..container import AppContainer
 from ..contracts.security import ISecurityService
+from ..services.health_service import HealthService
+
+
+def get_container(request: Request) -> AppContainer:
+    return request.app.state.container
+
+
+async def get_security_service(container: AppContainer = Depends(get_container)) -> ISecurityService:
+    return container.security_service
 
 
-async def get_security_service() -> ISecurityService:
-    return SecurityService()
+def get_health_service(container: AppContainer = Depends(get_container)) -> HealthService:
+    return container.health_service
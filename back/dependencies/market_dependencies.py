@@ -1,21 +1,19 @@
 from fastapi import Depends
-from ..contracts.security import ISecurityService
+from ..container import AppContainer
 from ..services.market_service import MarketService
-from .common import get_security_service
-from ..services.market.providers import StocksDataProvider, BondsDataProvider, FundsDataProvider, IndicesDataProvider, CurrencyDataProvider
+from ..services.market.schedule import SessionSchedule
+from ..services.quote_history_service import QuoteHistoryService
+from ..services.alert_service import AlertService
+from .common import get_container
 
-def get_market_data_providers():
-    base_url = "https://iss.moex.com/iss"
-    return [
-        StocksDataProvider(base_url),
-        BondsDataProvider(base_url),
-        FundsDataProvider(base_url),
-        IndicesDataProvider(base_url),
-        CurrencyDataProvider(base_url),
-    ]
+def get_session_schedule(container: AppContainer = Depends(get_container)) -> SessionSchedule:
+    return container.schedule
 
-def get_market_service(
-    security_service: ISecurityService = Depends(get_security_service),
-) -> MarketService:
-    providers = get_market_data_providers()
-    return MarketService(security_service=security_service, data_providers=providers)
\ No newline at end of file
+def get_quote_history_service(container: AppContainer = Depends(get_container)) -> QuoteHistoryService:
+    return container.quote_history_service
+
+def get_alert_service(container: AppContainer = Depends(get_container)) -> AlertService:
+    return container.alert_service
+
+def get_market_service(container: AppContainer = Depends(get_container)) -> MarketService:
+    return container.market_service
@@ -3,7 +3,10 @@ from sqlalchemy.orm import Session
 from ..contracts.security import ISecurityService
 from ..services.portfolio_service import PortfolioService
 from ..services.market_service import MarketService
+from ..services.risk_service import RiskAnalyticsService
+from ..services.watchlist_service import WatchlistService
 from ..database.repositories.portfolio_repository import PortfolioRepository
+from ..database.repositories.watchlist_repository import WatchlistRepository
 from .common import get_security_service
 from .market_dependencies import get_market_service
 from ..database import get_db
@@ -20,4 +23,18 @@ def get_portfolio_service(
         security_service=security_service,
         portfolio_repo=portfolio_repo,
         market_service=market_service
-    )
\ No newline at end of file
+    )
+
+def get_risk_service(
+    portfolio_repo: PortfolioRepository = Depends(get_portfolio_repository),
+) -> RiskAnalyticsService:
+    return RiskAnalyticsService(portfolio_repo=portfolio_repo)
+
+def get_watchlist_repository(db: Session = Depends(get_db)) -> WatchlistRepository:
+    return WatchlistRepository(db)
+
+def get_watchlist_service(
+    watchlist_repo: WatchlistRepository = Depends(get_watchlist_repository),
+    market_service: MarketService = Depends(get_market_service),
+) -> WatchlistService:
+    return WatchlistService(watchlist_repo=watchlist_repo, market_service=market_service)
@@ -0,0 +1,95 @@
+import math
+from typing import List, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, Response
+
+from ..auth.entities.user import User as DomainUser
+from ..core.rate_limiter import RateLimitPolicy, hit, refund
+from ..core.logger import logger
+from .auth_dependencies import get_current_user
+
+
+class RateLimit:
+    """
+    Зависимость FastAPI с политикой ограничения частоты запросов.
+    scope: "user" — по пользователю (анонимные запросы считаются по IP), "ip" — по адресу клиента,
+    "global" — общий лимит маршрута. Параметры пути входят в ключ, так что лимит считается, например,
+    отдельно для каждого asset_type. skip_anonymous не расходует лимит на запросы без пользователя,
+    которые маршрут всё равно отклонит.
+    """
+
+    def __init__(self, policy: RateLimitPolicy, scope: str = "user", skip_anonymous: bool = False):
+        self.policy = policy
+        self.scope = scope
+        self.skip_anonymous = skip_anonymous
+
+    def _identity(self, request: Request, current_user: Optional[DomainUser]) -> str:
+        if self.scope == "global":
+            return "global"
+        if self.scope == "user" and current_user:
+            return f"user:{current_user.id}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    def _key(self, request: Request, current_user: Optional[DomainUser]) -> Optional[str]:
+        if self.skip_anonymous and not current_user:
+            return None
+        path_key = ":".join(str(value) for value in request.path_params.values())
+        identity = self._identity(request, current_user)
+        return f"{identity}:{path_key}" if path_key else identity
+
+    def _check(self, key: str, response: Response) -> None:
+        result = hit(key, self.policy)
+
+        response.headers["X-RateLimit-Limit"] = str(self.policy.limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+        if not result.allowed:
+            retry_after = str(max(1, math.ceil(result.retry_after)))
+            logger.warning(f"Rate limit {self.policy.name} exceeded for {key}")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={
+                    "Retry-After": retry_after,
+                    "X-RateLimit-Limit": str(self.policy.limit),
+                    "X-RateLimit-Remaining": "0",
+                },
+            )
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        current_user: Optional[DomainUser] = Depends(get_current_user),
+    ) -> None:
+        key = self._key(request, current_user)
+        if key is not None:
+            self._check(key, response)
+
+
+class RateLimits:
+    """
+    Несколько лимитов одного маршрута, проверяемых по порядку. Если запрос отклоняет
+    следующий лимит, попытки, уже списанные предыдущими, возвращаются — например,
+    токен пользователя не сгорает, когда исчерпан общий лимит маршрута.
+    """
+
+    def __init__(self, *limits: RateLimit):
+        self.limits = limits
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        current_user: Optional[DomainUser] = Depends(get_current_user),
+    ) -> None:
+        charged: List[Tuple[RateLimit, str]] = []
+        for limit in self.limits:
+            key = limit._key(request, current_user)
+            if key is None:
+                continue
+            try:
+                limit._check(key, response)
+            except HTTPException:
+                for previous, previous_key in charged:
+                    refund(previous_key, previous.policy)
+                raise
+            charged.append((limit, key))
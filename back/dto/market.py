@@ -11,6 +11,11 @@ class MainPageData:
 class MarketPageData:
     user: DomainUser
     csrf_token: str
+    asset_type: str
+
+@dataclass
+class MarketTableData:
+    asset_type: str
     stocks: List[Dict[str, Any]]
     search_query: str
     sort_by: str
@@ -23,4 +28,9 @@ class MarketPageData:
 class MarketStocksData:
     stocks: List[Dict[str, Any]]
     pagination: Dict[str, Any]
-    filters: Dict[str, Any]
\ No newline at end of file
+    filters: Dict[str, Any]
+
+@dataclass
+class QuoteLookupData:
+    quotes: List[Dict[str, Any]]
+    missing: List[str]
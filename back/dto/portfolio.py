@@ -22,4 +22,22 @@ class PortfolioStats:
     total_value: float
     total_change: float
     total_change_percent: float
-    asset_distribution: Dict[str, float]
\ No newline at end of file
+    asset_distribution: Dict[str, float]
+
+@dataclass
+class ImportRowResult:
+    row: int
+    ticker: str
+    status: str
+    asset_type: Optional[str] = None
+    quantity: Optional[float] = None
+    average_price: Optional[float] = None
+    message: str = ""
+
+@dataclass
+class ImportResult:
+    rows: List[ImportRowResult]
+    committed: bool
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
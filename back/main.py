@@ -1,3 +1,4 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
@@ -7,22 +8,40 @@ from starlette.middleware.sessions import SessionMiddleware
 
 from .config import settings
 from .database import create_tables
+from .database.database import engine
 from .database.models import Stock
 from .core.logger import logger
+from .core.metrics import MetricsMiddleware, monitor_event_loop_lag, register_database_pool
+from .core.timing import TimingMiddleware, instrument_engine
+from .core.admission import AdmissionMiddleware
+from .core.body_limit import BodySizeLimitMiddleware
+from .container import AppContainer
 from .routes.auth import router as auth_router
 from .routes.main import router as main_router
 from .routes.market import router as market_router
 from .routes.portfolio import router as portfolio_router
+from .routes.watchlist import router as watchlist_router
+from .routes.alerts import router as alerts_router
+from .routes.metrics import router as metrics_router
+from .routes.health import router as health_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_tables()
+    register_database_pool(engine)
+    loop_monitor = asyncio.create_task(monitor_event_loop_lag())
+    container = AppContainer(snapshot_dir=settings.SNAPSHOT_DIR)
+    app.state.container = container
+    await container.start()
     logger.info("Application started successfully")
     yield
+    await container.close()
+    loop_monitor.cancel()
     logger.info("Application shutting down")
 
 
 app = FastAPI(lifespan=lifespan)
+instrument_engine(engine)
 
 app.add_middleware(
     SessionMiddleware,
@@ -32,6 +51,10 @@ app.add_middleware(
     same_site="lax",
     https_only=not settings.DEBUG,
 )
+app.add_middleware(TimingMiddleware)
+app.add_middleware(BodySizeLimitMiddleware)
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 frontend_path = os.path.join(os.path.dirname(__file__), "..", "front")
 static_path = os.path.join(frontend_path, "static")
@@ -40,4 +63,8 @@ app.mount("/static", StaticFiles(directory=static_path), name="static")
 app.include_router(auth_router)
 app.include_router(main_router)
 app.include_router(market_router)
-app.include_router(portfolio_router)
\ No newline at end of file
+app.include_router(portfolio_router)
+app.include_router(watchlist_router)
+app.include_router(alerts_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
\ No newline at end of file
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, Request, Form, HTTPException
+from fastapi.responses import JSONResponse
+from ..auth.security import csrf_protect
+from ..services.alert_service import AlertService
+from ..dependencies.market_dependencies import get_alert_service
+from ..dependencies.auth_dependencies import get_current_user
+from ..auth.entities.user import User as DomainUser
+from ..core.logger import logger
+
+router = APIRouter()
+
+@router.get("/api/alerts")
+async def get_alerts(
+    alert_service: AlertService = Depends(get_alert_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return JSONResponse({"success": True, "data": await alert_service.get_alerts(current_user.id)})
+
+@router.post("/api/alerts/add")
+async def add_alert(
+    request: Request,
+    alert_service: AlertService = Depends(get_alert_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+    identifier: str = Form(...),
+    direction: str = Form(...),
+    threshold: float = Form(...),
+    field: str = Form("price"),
+    asset_type: str = Form(""),
+    note: str = Form(""),
+    csrf_verified: bool = Depends(csrf_protect),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    try:
+        alert = await alert_service.create_alert(
+            user_id=current_user.id,
+            identifier=identifier,
+            field=field,
+            direction=direction,
+            threshold=threshold,
+            asset_type=asset_type or None,
+            note=note,
+        )
+    except ValueError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Error creating price alert: {e}")
+        return JSONResponse({
+            "success": False,
+            "message": "Внутренняя ошибка сервера"
+        }, status_code=500)
+
+    if alert is None:
+        return JSONResponse({
+            "success": False,
+            "message": "Ошибка при создании оповещения"
+        }, status_code=400)
+    return JSONResponse({
+        "success": True,
+        "message": "Оповещение создано" if alert['active'] else "Условие уже выполнено, оповещение сработало",
+        "data": alert
+    })
+
+@router.post("/api/alerts/remove/{alert_id}")
+async def remove_alert(
+    request: Request,
+    alert_id: int,
+    alert_service: AlertService = Depends(get_alert_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+    csrf_verified: bool = Depends(csrf_protect),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    if not await alert_service.delete_alert(current_user.id, alert_id):
+        return JSONResponse({
+            "success": False,
+            "message": "Оповещение не найдено"
+        }, status_code=404)
+    return JSONResponse({"success": True, "message": "Оповещение удалено"})
+
+@router.get("/api/alerts/notifications")
+async def pop_notifications(
+    alert_service: AlertService = Depends(get_alert_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        notifications = alert_service.pop_notifications(current_user.id)
+    except Exception as e:
+        logger.error(f"Error reading alert notifications: {e}")
+        return JSONResponse({
+            "success": False,
+            "message": "Ошибка при получении уведомлений"
+        }, status_code=500)
+    return JSONResponse({"success": True, "data": notifications})
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from ..services.health_service import HealthService
+from ..dependencies.common import get_health_service
+
+router = APIRouter()
+
+@router.get("/health/live", include_in_schema=False)
+async def live(health_service: HealthService = Depends(get_health_service)):
+    return health_service.liveness()
+
+@router.get("/health/ready", include_in_schema=False)
+async def ready(health_service: HealthService = Depends(get_health_service)):
+    report = await health_service.readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
@@ -1,14 +1,28 @@
-from fastapi import APIRouter, Depends, Request, Query, HTTPException
-from fastapi.responses import RedirectResponse
+import hashlib
+import time
+from fastapi import APIRouter, Depends, Request, Query, HTTPException, Response, Form
+from fastapi.responses import RedirectResponse, HTMLResponse, JSONResponse
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import List, Optional
 from urllib.parse import urlencode
 from ..services.market_service import MarketService
-from ..templates import templates
+from ..services.quote_history_service import QuoteHistoryService
+from ..templates import templates, render_fragment, market_table_cache
 from ..dependencies import get_market_service
-from ..dependencies.auth_dependencies import get_current_user
+from ..services.market.schedule import SessionSchedule, CalendarOverride
+from ..dependencies.market_dependencies import get_quote_history_service, get_session_schedule
+from ..dependencies.auth_dependencies import get_current_user, get_admin_user
+from ..auth.security import csrf_protect
+from ..dependencies.rate_limit_dependencies import RateLimit, RateLimits
+from ..core.rate_limiter import MARKET_REFRESH_USER_POLICY, MARKET_REFRESH_GLOBAL_POLICY
 from ..auth.entities.user import User as DomainUser
+from ..core.logger import logger
 
 router = APIRouter()
 
+VALID_ASSET_TYPES = ["stock", "bonds", "funds", "currency", "indices"]
+
 @router.get("/market")
 async def market_default(
     request: Request,
@@ -55,39 +69,107 @@ async def assets_page(
     if not current_user:
         return RedirectResponse("/login")
     
-    valid_asset_types = ["stock", "bonds", "funds", "currency", "indices"]
-    if asset_type not in valid_asset_types:
+    if asset_type not in VALID_ASSET_TYPES:
         return RedirectResponse("/market/stock")
     
     data = await market_service.get_market_page_data(
         request=request,
         current_user=current_user,
         asset_type=asset_type,
-        search=search,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        page=page,
-        page_size=page_size,
     )
     if not data:
         return RedirectResponse("/login")
+    market_table, _, _ = await _render_market_table(
+        market_service, asset_type, search, sort_by, sort_order, page, page_size
+    )
     return templates.TemplateResponse(
         "market.html",
         {
             "request": request,
             "user": data.user,
             "csrf_token": data.csrf_token,
-            "stocks": data.stocks,
-            "search_query": data.search_query,
-            "sort_by": data.sort_by,
-            "sort_order": data.sort_order,
-            "page": data.page,
-            "total_pages": data.total_pages,
-            "total_count": data.total_count,
+            "market_table": market_table,
+            "search_query": search,
+            "sort_by": sort_by,
+            "sort_order": sort_order,
             "asset_type": asset_type,
         }
     )
 
+async def _render_market_table(
+    market_service: MarketService,
+    asset_type: str,
+    search: str,
+    sort_by: str,
+    sort_order: str,
+    page: int,
+    page_size: int,
+):
+    params = {
+        "asset_type": asset_type,
+        "search": search,
+        "sort_by": sort_by,
+        "sort_order": sort_order,
+        "page": page,
+        "page_size": page_size,
+    }
+    version, cached = market_table_cache.get(MarketService.get_version_key(asset_type), params)
+    if cached is not None:
+        return cached, version, True
+    table = await market_service.get_market_table(
+        asset_type=asset_type,
+        search=search,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        page=page,
+        page_size=page_size,
+    )
+    html = render_fragment("partials/market_table.html", asdict(table))
+    market_table_cache.set(version, params, html)
+    return html, version, False
+
+@router.get("/market/{asset_type}/table")
+async def market_table_fragment(
+    request: Request,
+    asset_type: str,
+    market_service: MarketService = Depends(get_market_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+    search: str = Query(""),
+    sort_by: str = Query("name"),
+    sort_order: str = Query("asc"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+):
+    """Только таблица инструментов и пагинация — для обновления страницы рынка без перезагрузки."""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if asset_type not in VALID_ASSET_TYPES:
+        raise HTTPException(status_code=404, detail="Unknown asset type")
+
+    started = time.perf_counter()
+    html, version, cache_hit = await _render_market_table(
+        market_service, asset_type, search, sort_by, sort_order, page, page_size
+    )
+    etag = None
+    if version is not None:
+        query = f"{asset_type}:{version}:{search}:{sort_by}:{sort_order}:{page}:{page_size}"
+        etag = f'W/"{hashlib.sha1(query.encode()).hexdigest()}"'
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        f"Market table fragment {asset_type} page={page} cache={'hit' if cache_hit else 'miss'} {elapsed_ms:.1f}ms"
+    )
+    headers = {
+        "Cache-Control": "private, no-cache",
+        "X-Fragment-Cache": "hit" if cache_hit else "miss",
+        "X-Render-Time": f"{elapsed_ms:.1f}ms",
+    }
+    if etag:
+        headers["ETag"] = etag
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+    return HTMLResponse(html, headers=headers)
+
 @router.get("/api/market/test/{asset_type}")
 async def moex_test(
     asset_type: str,
@@ -95,7 +177,15 @@ async def moex_test(
 ):
     return await market_service.get_moex_test_data(asset_type)
 
-@router.post("/api/market/refresh/{asset_type}")
+@router.post(
+    "/api/market/refresh/{asset_type}",
+    dependencies=[
+        Depends(RateLimits(
+            RateLimit(MARKET_REFRESH_USER_POLICY, scope="user", skip_anonymous=True),
+            RateLimit(MARKET_REFRESH_GLOBAL_POLICY, scope="global", skip_anonymous=True),
+        )),
+    ],
+)
 async def refresh_market_data(
     asset_type: str,
     market_service: MarketService = Depends(get_market_service),
@@ -131,4 +221,132 @@ async def get_stocks_api(
         "data": data.stocks,
         "pagination": data.pagination,
         "filters": data.filters,
-    }
\ No newline at end of file
+    }
+
+async def _quotes_response(market_service: MarketService, ids: List[str], asset_types: List[str]):
+    try:
+        data = await market_service.get_quotes(ids, asset_types or None)
+    except ValueError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+    return {"success": True, "data": asdict(data)}
+
+@router.get("/api/market/quotes")
+async def get_quotes_api(
+    ids: List[str] = Query([]),
+    asset_types: List[str] = Query([]),
+    market_service: MarketService = Depends(get_market_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await _quotes_response(market_service, ids, [t for value in asset_types for t in value.split(",") if t])
+
+@router.post("/api/market/quotes")
+async def post_quotes_api(
+    request: Request,
+    market_service: MarketService = Depends(get_market_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        payload = await request.json()
+        ids = payload.get("ids") or []
+        asset_types = payload.get("asset_types") or []
+        if not isinstance(ids, list) or not isinstance(asset_types, list):
+            raise ValueError("ids and asset_types must be lists")
+    except (ValueError, AttributeError) as e:
+        return JSONResponse({"success": False, "message": f"Некорректный запрос: {e}"}, status_code=400)
+    return await _quotes_response(market_service, [str(value) for value in ids], [str(value) for value in asset_types])
+
+@router.get("/api/market/history/{asset_type}/{ticker}")
+async def get_history_api(
+    asset_type: str,
+    ticker: str,
+    history_service: QuoteHistoryService = Depends(get_quote_history_service),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    interval: str = Query("raw"),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        data = await history_service.get_history(
+            ticker=ticker.upper(),
+            asset_type=asset_type,
+            start=start,
+            end=end,
+            interval=interval,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "data": data}
+
+@router.get("/api/market/calendar")
+async def get_trading_calendar(
+    market_service: MarketService = Depends(get_market_service),
+    schedule: SessionSchedule = Depends(get_session_schedule),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return {
+        "success": True,
+        "data": {
+            "now": schedule.now().isoformat(),
+            "markets": {
+                provider.get_asset_type(): {
+                    **schedule.describe(provider.get_asset_type()),
+                    "snapshot_ttl": market_service.snapshot_ttl(provider.get_asset_type()),
+                }
+                for provider in market_service.data_providers
+            },
+            "overrides": [override.to_dict() for override in schedule.calendar.list()],
+        },
+    }
+
+@router.post("/api/market/calendar/override")
+async def set_calendar_override(
+    request: Request,
+    market_service: MarketService = Depends(get_market_service),
+    schedule: SessionSchedule = Depends(get_session_schedule),
+    admin: DomainUser = Depends(get_admin_user),
+    day: date = Form(...),
+    status: str = Form(...),
+    engines: str = Form(""),
+    note: str = Form(""),
+    csrf_verified: bool = Depends(csrf_protect),
+):
+    override = CalendarOverride(
+        day=day,
+        status=status,
+        engines=tuple(engine.strip() for engine in engines.split(",") if engine.strip()),
+        note=note,
+    )
+    try:
+        schedule.calendar.set(override)
+    except ValueError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+    market_service.apply_schedule()
+    logger.info(f"Calendar override for {day} set by {admin.email}: {status}")
+    return JSONResponse({
+        "success": True,
+        "message": "Календарь торгов обновлён",
+        "data": override.to_dict(),
+    })
+
+@router.post("/api/market/calendar/remove/{day}")
+async def remove_calendar_override(
+    request: Request,
+    day: date,
+    market_service: MarketService = Depends(get_market_service),
+    schedule: SessionSchedule = Depends(get_session_schedule),
+    admin: DomainUser = Depends(get_admin_user),
+    csrf_verified: bool = Depends(csrf_protect),
+):
+    if not schedule.calendar.remove(day):
+        return JSONResponse({"success": False, "message": "Переопределение не найдено"}, status_code=404)
+    market_service.apply_schedule()
+    logger.info(f"Calendar override for {day} removed by {admin.email}")
+    return JSONResponse({"success": True, "message": "Переопределение удалено"})
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, HTMLResponse
+from ..core.metrics import CONTENT_TYPE_LATEST, render_metrics
+from ..core.timing import get_profile, list_profiles
+from ..dependencies.auth_dependencies import get_admin_user
+from ..auth.entities.user import User as DomainUser
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+@router.get("/debug/profiles", include_in_schema=False)
+async def recent_profiles(admin: DomainUser = Depends(get_admin_user)):
+    return {"success": True, "data": list_profiles()}
+
+@router.get("/debug/profiles/{profile_id}", include_in_schema=False)
+async def download_profile(profile_id: str, admin: DomainUser = Depends(get_admin_user)):
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return HTMLResponse(profile, headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.html"'})
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, Request, Form, HTTPException
-from fastapi.responses import RedirectResponse, JSONResponse
+import json
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, Request, Form, HTTPException, File, UploadFile, Query
+from fastapi.responses import RedirectResponse, JSONResponse, HTMLResponse
 from ..auth.security import csrf_protect
-from ..services.portfolio_service import PortfolioService
-from ..templates import templates
-from ..dependencies.portfolio_dependencies import get_portfolio_service
+from ..services.portfolio_import import parse_import_payload, ImportFormatError
+from ..services.portfolio_service import PortfolioService, CURRENCY_SYMBOLS
+from ..services.risk_service import RiskAnalyticsService
+from ..templates import templates, render_fragment
+from ..dependencies.portfolio_dependencies import get_portfolio_service, get_risk_service
 from ..dependencies.auth_dependencies import get_current_user
+from ..dependencies.rate_limit_dependencies import RateLimit
+from ..core.rate_limiter import PORTFOLIO_IMPORT_POLICY
 from ..auth.entities.user import User as DomainUser
 from ..core.logger import logger
 
@@ -13,13 +19,17 @@ router = APIRouter()
 @router.get("/portfolio")
 async def portfolio_page(
     request: Request,
+    currency: str = "RUB",
     portfolio_service: PortfolioService = Depends(get_portfolio_service),
     current_user: DomainUser | None = Depends(get_current_user),
 ):
     if not current_user:
         return RedirectResponse("/login")
     
-    data = await portfolio_service.get_portfolio_page_data(request, current_user)
+    try:
+        data = await portfolio_service.get_portfolio_page_data(request, current_user, currency)
+    except ValueError:
+        return RedirectResponse("/portfolio")
     if not data:
         return RedirectResponse("/login")
     
@@ -31,9 +41,29 @@ async def portfolio_page(
             "csrf_token": data.csrf_token,
             "portfolio_items": data.portfolio_items,
             "portfolio_summary": data.portfolio_summary,
+            "base_currencies": list(CURRENCY_SYMBOLS),
         }
     )
 
+@router.get("/portfolio/stats")
+async def portfolio_stats_fragment(
+    currency: str = "RUB",
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    """Сводка и таблица активов в выбранной валюте — для смены валюты без перезагрузки страницы."""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        portfolio_items, portfolio_summary = await portfolio_service.get_portfolio_valuation(current_user.id, currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    html = render_fragment("partials/portfolio_stats.html", {
+        "portfolio_items": portfolio_items,
+        "portfolio_summary": portfolio_summary,
+    })
+    return HTMLResponse(html, headers={"Cache-Control": "private, no-cache"})
+
 @router.post("/api/portfolio/add")
 async def add_to_portfolio(
     request: Request,
@@ -117,8 +147,92 @@ async def remove_from_portfolio(
             "message": "Внутренняя ошибка сервера"
         }, status_code=500)
 
+@router.post(
+    "/api/portfolio/import",
+    dependencies=[Depends(RateLimit(PORTFOLIO_IMPORT_POLICY, skip_anonymous=True))],
+)
+async def import_portfolio(
+    request: Request,
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+    file: UploadFile = File(...),
+    csrf_verified: bool = Depends(csrf_protect),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    try:
+        content = await file.read()
+        rows = parse_import_payload(content, file.filename or "", file.content_type or "")
+    except ImportFormatError as e:
+        return JSONResponse({
+            "success": False,
+            "message": str(e)
+        }, status_code=400)
+    
+    try:
+        result = await portfolio_service.import_portfolio(current_user.id, rows)
+    except Exception as e:
+        logger.error(f"Error importing portfolio: {e}")
+        return JSONResponse({
+            "success": False,
+            "message": "Внутренняя ошибка сервера"
+        }, status_code=500)
+    
+    return JSONResponse({
+        "success": result.committed,
+        "message": (
+            f"Импортировано позиций: {result.inserted + result.updated}, ошибок: {result.failed}"
+            if result.committed else "Не удалось импортировать ни одной позиции"
+        ),
+        "data": {
+            "inserted": result.inserted,
+            "updated": result.updated,
+            "failed": result.failed,
+            "rows": [asdict(row) for row in result.rows],
+        },
+    })
+
+@router.post("/api/portfolio/batch")
+async def batch_portfolio(
+    request: Request,
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+    operations: str = Form(...),
+    csrf_verified: bool = Depends(csrf_protect),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    try:
+        result = portfolio_service.batch_mutate(current_user.id, json.loads(operations))
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JSONResponse({
+            "success": False,
+            "message": f"Некорректный запрос: {e}"
+        }, status_code=400)
+    except Exception as e:
+        logger.error(f"Error applying portfolio batch: {e}")
+        return JSONResponse({
+            "success": False,
+            "message": "Внутренняя ошибка сервера"
+        }, status_code=500)
+    
+    if result is None:
+        return JSONResponse({
+            "success": False,
+            "message": "Ошибка при изменении портфеля"
+        }, status_code=400)
+    
+    return JSONResponse({
+        "success": True,
+        "message": "Изменения применены",
+        "data": result
+    })
+
 @router.get("/api/portfolio/stats")
 async def get_portfolio_stats(
+    currency: str = "RUB",
     portfolio_service: PortfolioService = Depends(get_portfolio_service),
     current_user: DomainUser | None = Depends(get_current_user),
 ):
@@ -126,14 +240,42 @@ async def get_portfolio_stats(
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     try:
-        data = await portfolio_service.get_portfolio_page_data(None, current_user)
+        summary = await portfolio_service.get_portfolio_summary(current_user, currency)
         return JSONResponse({
             "success": True,
-            "data": data.portfolio_summary if data else {}
+            "data": summary or {}
         })
+    except ValueError as e:
+        return JSONResponse({
+            "success": False,
+            "message": str(e)
+        }, status_code=400)
     except Exception as e:
         logger.error(f"Error getting portfolio stats: {e}")
         return JSONResponse({
             "success": False,
             "message": "Ошибка при получении статистики"
-        }, status_code=500)
\ No newline at end of file
+        }, status_code=500)
+
+@router.get("/api/portfolio/risk")
+async def get_portfolio_risk(
+    days: int = Query(90, ge=10, le=366),
+    confidence: float = Query(0.95, gt=0.5, lt=1.0),
+    risk_service: RiskAnalyticsService = Depends(get_risk_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    try:
+        risk = await risk_service.get_portfolio_risk(current_user.id, days, confidence)
+        return JSONResponse({
+            "success": True,
+            "data": risk
+        })
+    except Exception as e:
+        logger.error(f"Error calculating portfolio risk: {e}")
+        return JSONResponse({
+            "success": False,
+            "message": "Ошибка при расчёте рисков"
+        }, status_code=500)
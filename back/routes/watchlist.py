@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, Request, Form, HTTPException
+from fastapi.responses import JSONResponse
+from ..auth.security import csrf_protect
+from ..services.watchlist_service import WatchlistService
+from ..dependencies.portfolio_dependencies import get_watchlist_service
+from ..dependencies.auth_dependencies import get_current_user
+from ..auth.entities.user import User as DomainUser
+from ..core.logger import logger
+
+router = APIRouter()
+
+@router.get("/api/watchlist")
+async def get_watchlist(
+    watchlist_service: WatchlistService = Depends(get_watchlist_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    try:
+        data = await watchlist_service.get_watchlist(current_user.id)
+    except Exception as e:
+        logger.error(f"Error getting watchlist: {e}")
+        return JSONResponse({
+            "success": False,
+            "message": "Ошибка при получении списка наблюдения"
+        }, status_code=500)
+    return JSONResponse({"success": True, "data": data})
+
+@router.post("/api/watchlist/add")
+async def add_to_watchlist(
+    request: Request,
+    watchlist_service: WatchlistService = Depends(get_watchlist_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+    identifier: str = Form(...),
+    asset_type: str = Form(""),
+    csrf_verified: bool = Depends(csrf_protect),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    try:
+        item = await watchlist_service.add(current_user.id, identifier, asset_type or None)
+    except ValueError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Error adding to watchlist: {e}")
+        return JSONResponse({
+            "success": False,
+            "message": "Внутренняя ошибка сервера"
+        }, status_code=500)
+
+    if item is None:
+        return JSONResponse({
+            "success": False,
+            "message": "Ошибка при добавлении в список наблюдения"
+        }, status_code=400)
+    return JSONResponse({
+        "success": True,
+        "message": "Инструмент добавлен в список наблюдения",
+        "data": item
+    })
+
+@router.post("/api/watchlist/remove/{item_id}")
+async def remove_from_watchlist(
+    request: Request,
+    item_id: int,
+    watchlist_service: WatchlistService = Depends(get_watchlist_service),
+    current_user: DomainUser | None = Depends(get_current_user),
+    csrf_verified: bool = Depends(csrf_protect),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    if not watchlist_service.remove(current_user.id, item_id):
+        return JSONResponse({
+            "success": False,
+            "message": "Инструмент не найден в списке наблюдения"
+        }, status_code=404)
+    return JSONResponse({"success": True, "message": "Инструмент удалён из списка наблюдения"})
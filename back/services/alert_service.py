@@ -0,0 +1,168 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Callable
+from sqlalchemy.orm import Session
+
+from ..contracts.market import ISnapshotListener
+from ..core import redis_client
+from ..core.logger import logger
+from ..core.metrics import ALERTS_FIRED
+from ..database import SessionLocal
+from ..database.repositories.alert_repository import AlertRepository
+from .market.alerts import AlertIndex, AlertRule, alert_value, validate_rule
+
+ALERTS_VERSION_KEY = "alerts:version"
+INBOX_SIZE = 100
+INBOX_TTL = 30 * 24 * 3600
+MAX_ACTIVE_ALERTS = 100
+
+
+def _rule(alert: Dict[str, Any]) -> AlertRule:
+    return AlertRule(alert['id'], alert['user_id'], alert['asset_type'], alert['ticker'],
+                     alert['field'], alert['direction'], alert['threshold'])
+
+
+class AlertService(ISnapshotListener):
+    """
+    Ценовые оповещения. Правила хранятся в базе, а в процессе — в AlertIndex, который перечитывается,
+    когда меняется счётчик alerts:version (правило создали или удалили в любом воркере).
+    Снимки проверяет тот процесс, что их обновил; сработавшие оповещения снимаются в базе
+    и кладутся во входящие пользователя в Redis, откуда их забирает интерфейс.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, redis=redis_client):
+        self.session_factory = session_factory
+        self.redis = redis
+        self.market_service = None
+        self.index = AlertIndex()
+        self._loaded = False
+        self._loaded_version: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def _with_repository(self, action: Callable[[AlertRepository], Any]) -> Any:
+        db = self.session_factory()
+        try:
+            return action(AlertRepository(db))
+        finally:
+            db.close()
+
+    @staticmethod
+    def inbox_key(user_id: int) -> str:
+        return f"alerts:inbox:{user_id}"
+
+    async def on_snapshot(self, asset_type: str, data: List[Dict[str, Any]]) -> None:
+        if not data:
+            return
+        async with self._lock:
+            await self._sync_rules()
+            fired = self.index.evaluate(asset_type, data)
+            if not fired:
+                return
+            triggered_at = datetime.now(timezone.utc)
+            marked = set(await asyncio.to_thread(
+                self._with_repository,
+                lambda repo: repo.mark_triggered([(rule.id, value) for rule, value in fired], triggered_at),
+            ))
+            if marked != {rule.id for rule, _ in fired}:
+                # Запись не удалась или часть сработала в другом процессе: перечитать активные правила из базы.
+                self._loaded = False
+        delivered = [(rule, value) for rule, value in fired if rule.id in marked]
+        failed = [rule.id for rule, value in delivered if not self._deliver(rule, value, triggered_at)]
+        if failed:
+            await self._rearm(failed)
+        logger.info(f"Fired {len(delivered) - len(failed)} {asset_type} price alerts, {len(self.index)} still active")
+
+    async def _sync_rules(self) -> None:
+        version = self.redis.get(ALERTS_VERSION_KEY)
+        if self._loaded and version == self._loaded_version:
+            return
+        alerts = await asyncio.to_thread(self._with_repository, lambda repo: repo.get_active_alerts())
+        self.index.load([_rule(alert) for alert in alerts])
+        self._loaded, self._loaded_version = True, version
+        logger.info(f"Loaded {len(alerts)} active price alerts")
+
+    def _deliver(self, rule: AlertRule, value: float, triggered_at: datetime) -> bool:
+        notification = json.dumps({
+            "alert_id": rule.id,
+            "ticker": rule.ticker,
+            "asset_type": rule.asset_type,
+            "field": rule.field,
+            "direction": rule.direction,
+            "threshold": rule.threshold,
+            "value": value,
+            "triggered_at": triggered_at.isoformat(),
+        }, ensure_ascii=False)
+        try:
+            pipe = self.redis.pipeline()
+            pipe.lpush(self.inbox_key(rule.user_id), notification)
+            pipe.ltrim(self.inbox_key(rule.user_id), 0, INBOX_SIZE - 1)
+            pipe.expire(self.inbox_key(rule.user_id), INBOX_TTL)
+            pipe.execute()
+            ALERTS_FIRED.labels(rule.asset_type).inc()
+            return True
+        except Exception as e:
+            logger.error(f"Error delivering price alert {rule.id}: {e}")
+            return False
+
+    async def _rearm(self, alert_ids: List[int]) -> None:
+        """Недоставленные оповещения снова активны и сработают на следующем снимке."""
+        await asyncio.to_thread(self._with_repository, lambda repo: repo.rearm(alert_ids))
+        self._loaded = False
+        self._bump_version()
+
+    def _bump_version(self) -> None:
+        try:
+            self.redis.incr(ALERTS_VERSION_KEY)
+        except Exception as e:
+            logger.error(f"Error bumping price alerts version: {e}")
+
+    async def create_alert(self, user_id: int, identifier: str, field: str, direction: str, threshold: float,
+                           asset_type: Optional[str] = None, note: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Создаёт оповещение по тикеру или ISIN; ValueError — некорректный запрос.
+        Если условие уже выполнено по текущей котировке, оповещение сразу срабатывает.
+        """
+        field, direction = field.strip().lower(), direction.strip().lower()
+        active = await asyncio.to_thread(self._with_repository, lambda repo: repo.count_active(user_id))
+        if active >= MAX_ACTIVE_ALERTS:
+            raise ValueError(f"Не больше {MAX_ACTIVE_ALERTS} активных оповещений")
+        lookup = await self.market_service.get_quotes([identifier], [asset_type] if asset_type else None)
+        if not lookup.quotes:
+            raise ValueError("Инструмент не найден на рынке")
+        quote = lookup.quotes[0]
+        validate_rule(quote['asset_type'], field, direction)
+
+        row = (await self.market_service.get_quote_index(quote['asset_type'])).rows.get(quote['ticker'].upper(), {})
+        value = alert_value(row, field)
+        probe = AlertRule(0, user_id, quote['asset_type'], quote['ticker'], field, direction, threshold)
+        triggered_value = value if value is not None and probe.holds(value) else None
+
+        alert = await asyncio.to_thread(self._with_repository, lambda repo: repo.create(
+            user_id, quote['ticker'], quote['asset_type'], field, direction, threshold, note[:200], triggered_value,
+        ))
+        if alert is None:
+            return None
+        if triggered_value is not None:
+            if not self._deliver(_rule(alert), triggered_value, datetime.now(timezone.utc)):
+                await self._rearm([alert['id']])
+        else:
+            self._bump_version()
+        return alert
+
+    async def get_alerts(self, user_id: int) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._with_repository, lambda repo: repo.get_user_alerts(user_id))
+
+    async def delete_alert(self, user_id: int, alert_id: int) -> bool:
+        deleted = await asyncio.to_thread(self._with_repository, lambda repo: repo.delete(user_id, alert_id))
+        if deleted:
+            self._bump_version()
+        return deleted
+
+    def pop_notifications(self, user_id: int) -> List[Dict[str, Any]]:
+        """Забирает и очищает входящие пользователя, новые сверху."""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lrange(self.inbox_key(user_id), 0, -1)
+        pipe.delete(self.inbox_key(user_id))
+        raw, _ = pipe.execute()
+        return [json.loads(item) for item in raw]
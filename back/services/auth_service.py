@@ -9,26 +9,26 @@ from ..auth.exceptions import (
 from ..auth.entities.user import User as DomainUser
 from ..contracts.repositories import IUserRepository
 from ..contracts.security import ISecurityService
-from ..auth.token_service import create_access_token, verify_token
+from ..auth.token_service import create_access_token, verify_token, revoke_token
 from ..auth.validators import validate_full_name, normalize_and_validated_email
 from ..auth.security import validate_password
 from ..core import (
-    redis_client,
-    is_rate_limited,
-    increment_rate_limit,
+    LOGIN_POLICY,
+    REGISTRATION_POLICY,
+    hit_rate_limit,
     clear_rate_limit,
-    is_registration_rate_limited,
-    increment_registration_attempts,
     get_login_rate_key,
+    get_registration_rate_key,
 )
 from ..core.logger import logger
-from ..config import settings
+from ..core.timing import timed
 
 class AuthService:
     def __init__(self, security_service: ISecurityService, user_repo: IUserRepository):
         self.security_service = security_service
         self.user_repo = user_repo
 
+    @timed("auth")
     async def get_current_user(self, token: str | None) -> Optional[DomainUser]:
         if not token:
             return None
@@ -68,23 +68,20 @@ class AuthService:
         )
 
     async def register_user(self, email: str, password: str, full_name: str, client_ip: str) -> RegistrationResult:
-        if is_registration_rate_limited(client_ip):
+        # Любая попытка регистрации с адреса списывается сразу одним атомарным вызовом.
+        if not hit_rate_limit(get_registration_rate_key(client_ip), REGISTRATION_POLICY).allowed:
             logger.warning(f"Registration rate limit exceeded for IP: {client_ip}")
             raise RateLimitException("Too many registration attempts. Try again later")
         normalized_email = normalize_and_validated_email(email)
         if not normalized_email:
-            increment_registration_attempts(client_ip)
             raise ValidationException("Invalid email format")
         is_valid_pass, pass_error = validate_password(password)
         if not is_valid_pass:
-            increment_registration_attempts(client_ip)
             raise ValidationException(pass_error)
         is_valid_name, name_error = validate_full_name(full_name)
         if not is_valid_name:
-            increment_registration_attempts(client_ip)
             raise ValidationException(name_error)
         if self.user_repo.email_exists(normalized_email):
-            increment_registration_attempts(client_ip)
             raise UserAlreadyExistsException("Email already registered")
         try:
             user = self.user_repo.create(normalized_email, password, full_name)
@@ -92,7 +89,6 @@ class AuthService:
             return RegistrationResult(success=True, user_id=user.id, redirect_path="/login?registered=true")
         except Exception as e:
             logger.error(f"User creation error for {normalized_email}: {e}")
-            increment_registration_attempts(client_ip)
             raise
 
     async def login_user(self, email: str, password: str, client_ip: str) -> LoginResult:
@@ -100,20 +96,16 @@ class AuthService:
         if not normalized_email:
             raise InvalidCredentialsException("Invalid email or password")
         login_key = get_login_rate_key(normalized_email)
-        if is_rate_limited(login_key):
+        # Попытка списывается до проверки пароля одним атомарным вызовом; удачный вход обнуляет счётчик.
+        if not hit_rate_limit(login_key, LOGIN_POLICY).allowed:
             logger.warning(f"Login rate limit exceeded for: {email}")
             raise RateLimitException("Too many login attempts")
         user = self.user_repo.verify_credentials(email, password)
         if not user:
-            increment_rate_limit(login_key)
             logger.warning(f"Failed login attempt for: {email}")
             raise InvalidCredentialsException("Invalid email or password")
         clear_rate_limit(login_key)
         access_token = create_access_token(user.id)
-        try:
-            redis_client.setex(f"session:{user.id}", settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, "active")
-        except Exception as e:
-            logger.error(f"Redis error storing session: {e}")
         logger.info(f"User logged in successfully: {email}")
         return LoginResult(success=True, user_id=user.id, access_token=access_token)
 
@@ -124,11 +116,10 @@ class AuthService:
                 payload = verify_token(access_token)
                 if payload and payload.get("sub"):
                     user_id = payload.get("sub")
-                try:
-                    redis_client.delete(f"session:{user_id}")
-                    redis_client.delete(f"token:{user_id}")
-                except Exception as e:
-                    logger.error(f"Redis error during logout: {e}")
+                    try:
+                        revoke_token(payload)
+                    except Exception as e:
+                        logger.error(f"Redis error during logout: {e}")
             except Exception as e:
                 logger.error(f"Error during token cleanup: {e}")
         return LogoutResult(success=True, session_cleared=True, user_id=user_id)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict
+
+from sqlalchemy import text
+
+from ..core.logger import logger
+
+HEALTH_CHECK_TIMEOUT = 2.0
+
+
+class HealthService:
+    """
+    Проверки для балансировщика.
+    Живость — только то, что процесс отвечает; готовность — прогрев кэша завершён,
+    Redis и база доступны. Состояние снимков и пулов соединений отдаётся для диагностики.
+    """
+
+    def __init__(self, redis, engine, market_service, is_warm: Callable[[], bool]):
+        self.redis = redis
+        self.engine = engine
+        self.market_service = market_service
+        self.is_warm = is_warm
+        self.started_at = time.time()
+
+    def liveness(self) -> Dict[str, Any]:
+        return {"status": "ok", "uptime": round(time.time() - self.started_at, 1)}
+
+    async def readiness(self) -> Dict[str, Any]:
+        redis_check, database_check = await asyncio.gather(
+            self._probe("redis", self.redis.ping),
+            self._probe("database", self._ping_database),
+        )
+        try:
+            snapshots = self.market_service.snapshot_status()
+        except Exception as e:
+            logger.error(f"Error reading snapshot status: {e}")
+            snapshots = {}
+        redis_check["pool"] = self._redis_pool_usage()
+        database_check["pool"] = self._database_pool_usage()
+
+        warmed_up = self.is_warm()
+        ready = warmed_up and redis_check["ok"] and database_check["ok"]
+        return {
+            "status": "ready" if ready else "unavailable",
+            "ready": ready,
+            "warmed_up": warmed_up,
+            "checks": {"redis": redis_check, "database": database_check},
+            "snapshots": snapshots,
+        }
+
+    async def _probe(self, name: str, ping: Callable[[], Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(ping), HEALTH_CHECK_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Health check {name} failed: {e!r}")
+            return {"ok": False, "error": str(e) or type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    def _ping_database(self) -> None:
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def _redis_pool_usage(self) -> Dict[str, Any]:
+        pool = getattr(self.redis, "connection_pool", None)
+        if pool is None:
+            return {}
+        return {
+            "in_use": len(getattr(pool, "_in_use_connections", ())),
+            "idle": len(getattr(pool, "_available_connections", ())),
+            "max": getattr(pool, "max_connections", None),
+        }
+
+    def _database_pool_usage(self) -> Dict[str, Any]:
+        usage = {}
+        for name, attribute in (("size", "size"), ("in_use", "checkedout"), ("idle", "checkedin"),
+                                ("overflow", "overflow")):
+            value = getattr(self.engine.pool, attribute, None)
+            if callable(value):
+                usage[name] = value()
+        return usage
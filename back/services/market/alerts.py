@@ -0,0 +1,136 @@
+"""
+Индекс ценовых оповещений для инкрементальной проверки на каждом обновлении снимка.
+
+Для каждой тройки (тип активов, тикер в верхнем регистре, поле) пороги хранятся в двух отсортированных списках:
+ABOVE срабатывает при значении >= порога, BELOW — при значении <= порога. Оповещения одноразовые:
+сработавшее сразу удаляется из индекса, поэтому все оставшиеся в индексе условия сейчас не выполнены,
+и при новом значении срабатывают ровно пороги из одного bisect-среза.
+Строки снимка, значение которых не изменилось с прошлой проверки, пропускаются.
+"""
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+ABOVE, BELOW = "above", "below"
+
+# Поле снимка → типы активов, где оно есть (None — все).
+ALERT_FIELDS = {
+    "price": None,
+    "change_percent": None,
+    "ytm": {"bonds"},
+    "yield": {"bonds"},
+}
+
+
+class AlertRule(NamedTuple):
+    id: int
+    user_id: int
+    asset_type: str
+    ticker: str
+    field: str
+    direction: str
+    threshold: float
+
+    def holds(self, value: float) -> bool:
+        return value >= self.threshold if self.direction == ABOVE else value <= self.threshold
+
+
+def validate_rule(asset_type: str, field: str, direction: str) -> None:
+    if field not in ALERT_FIELDS:
+        raise ValueError(f"Unknown alert field: {field}")
+    if ALERT_FIELDS[field] is not None and asset_type not in ALERT_FIELDS[field]:
+        raise ValueError(f"Field {field} is not available for {asset_type}")
+    if direction not in (ABOVE, BELOW):
+        raise ValueError(f"Unknown alert direction: {direction}")
+
+
+def alert_value(row: Dict[str, Any], field: str) -> Optional[float]:
+    """Значение поля строки снимка; цена 0 означает отсутствие сделок и не проверяется."""
+    value = row.get(field)
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    if field == "price" and value <= 0:
+        return None
+    return float(value)
+
+
+class ThresholdBook:
+    def __init__(self):
+        self.above: List[Tuple[float, int]] = []
+        self.below: List[Tuple[float, int]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.above or self.below)
+
+    def add(self, rule: AlertRule) -> None:
+        insort(self.above if rule.direction == ABOVE else self.below, (rule.threshold, rule.id))
+
+    def remove(self, rule: AlertRule) -> None:
+        entries = self.above if rule.direction == ABOVE else self.below
+        position = bisect_left(entries, (rule.threshold, rule.id))
+        if position < len(entries) and entries[position] == (rule.threshold, rule.id):
+            del entries[position]
+
+    def crossed(self, value: float) -> List[int]:
+        """id оповещений, чьё условие выполнено при value: пороги ABOVE <= value и BELOW >= value."""
+        fired = [alert_id for _, alert_id in self.above[:bisect_right(self.above, (value, float("inf")))]]
+        fired += [alert_id for _, alert_id in self.below[bisect_left(self.below, (value, float("-inf"))):]]
+        return fired
+
+
+class AlertIndex:
+    def __init__(self):
+        self.rules: Dict[int, AlertRule] = {}
+        self._books: Dict[str, Dict[str, Dict[str, ThresholdBook]]] = {}
+        self._last: Dict[Tuple[str, str, str], float] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def load(self, rules: List[AlertRule]) -> None:
+        """Полная замена набора правил; последние значения забываются, и следующий снимок проверяет все тикеры."""
+        self.rules.clear()
+        self._books.clear()
+        self._last.clear()
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: AlertRule) -> None:
+        self.rules[rule.id] = rule
+        fields = self._books.setdefault(rule.asset_type, {}).setdefault(rule.ticker.upper(), {})
+        fields.setdefault(rule.field, ThresholdBook()).add(rule)
+
+    def remove(self, alert_id: int) -> Optional[AlertRule]:
+        rule = self.rules.pop(alert_id, None)
+        if rule is None:
+            return None
+        tickers = self._books[rule.asset_type]
+        ticker = rule.ticker.upper()
+        fields = tickers[ticker]
+        book = fields[rule.field]
+        book.remove(rule)
+        if not book:
+            del fields[rule.field]
+            if not fields:
+                del tickers[ticker]
+        return rule
+
+    def evaluate(self, asset_type: str, data: List[Dict[str, Any]]) -> List[Tuple[AlertRule, float]]:
+        """Сработавшие правила со значением, на котором они сработали; сработавшие удаляются из индекса."""
+        tickers = self._books.get(asset_type)
+        if not tickers:
+            return []
+        fired: List[Tuple[AlertRule, float]] = []
+        for row in data:
+            ticker = str(row.get("ticker", "")).upper()
+            fields = tickers.get(ticker)
+            if not fields:
+                continue
+            for field, book in list(fields.items()):
+                value = alert_value(row, field)
+                key = (asset_type, ticker, field)
+                if value is None or self._last.get(key) == value:
+                    continue
+                self._last[key] = value
+                for alert_id in book.crossed(value):
+                    fired.append((self.remove(alert_id), value))
+        return fired
@@ -0,0 +1,125 @@
+from datetime import date
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+MAX_COUPON_PERIODS = 400
+NEWTON_ITERATIONS = 50
+NEWTON_TOLERANCE = 1e-9
+DAYS_IN_YEAR = 365.0
+
+ANALYTICS_FIELDS = (
+    'accrued_interest',
+    'clean_price',
+    'dirty_price',
+    'ytm',
+    'macaulay_duration',
+    'modified_duration',
+    'convexity',
+)
+
+
+def _to_datetime64(value: Optional[str]) -> np.datetime64:
+    try:
+        return np.datetime64(value[:10], 'D') if value and not value.startswith('0000') else np.datetime64('NaT')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+def _days_until(values: List[Optional[str]], today: date) -> np.ndarray:
+    try:
+        dates = np.array([v if v and not v.startswith('0000') else 'NaT' for v in values], dtype='datetime64[D]')
+    except ValueError:
+        dates = np.array([_to_datetime64(v) for v in values], dtype='datetime64[D]')
+    days = (dates - np.datetime64(today, 'D')).astype(float)
+    days[np.isnat(dates)] = np.nan
+    return days
+
+
+def _column(bonds: List[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.array([b.get(key) or 0 for b in bonds], dtype=float)
+
+
+def compute_bond_analytics(bonds: List[Dict[str, Any]], today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Доходность к погашению, дюрация и выпуклость для всех облигаций одним векторным проходом.
+    Цена MOEX задаётся в процентах от номинала; купонные потоки считаются равными,
+    последний поток приходится на дату погашения. Оферты и амортизация не учитываются.
+    Результаты записываются в словари облигаций; для некорректных данных поля равны 0.
+    """
+    if not bonds:
+        return bonds
+    today = today or date.today()
+    n = len(bonds)
+
+    face = _column(bonds, 'face_value')
+    price_pct = _column(bonds, 'price')
+    coupon = _column(bonds, 'coupon_value')
+    period = _column(bonds, 'coupon_period')
+    mat_days = _days_until([b.get('maturity_date') for b in bonds], today)
+    next_days = _days_until([b.get('next_coupon') for b in bonds], today)
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        valid = (face > 0) & (price_pct > 0) & (mat_days > 0)
+        has_coupon = valid & (coupon > 0) & (period > 0) & (next_days >= 0) & (next_days <= mat_days)
+        next_days = np.where(has_coupon, next_days, mat_days)
+        period = np.where(has_coupon, period, 0.0)
+        coupon = np.where(has_coupon, coupon, 0.0)
+
+        accrued = np.where(has_coupon, coupon * np.clip((period - next_days) / np.where(period > 0, period, 1), 0, 1), 0.0)
+        clean = price_pct / 100.0 * face
+        dirty = clean + accrued
+
+        periods_left = np.where(has_coupon, np.floor((mat_days - next_days) / np.where(period > 0, period, 1)) + 1, 1)
+        periods_left = np.clip(np.nan_to_num(periods_left, nan=1), 1, MAX_COUPON_PERIODS).astype(int)
+        max_periods = int(periods_left[valid].max()) if valid.any() else 1
+
+        k = np.arange(max_periods)
+        mask = k[None, :] < periods_left[:, None]
+        t_days = next_days[:, None] + k[None, :] * period[:, None]
+        last = periods_left - 1
+        rows = np.arange(n)
+        t_days[rows, last] = mat_days
+        t = np.where(mask & valid[:, None], t_days / DAYS_IN_YEAR, 0.0)
+
+        cash_flows = np.where(mask, coupon[:, None], 0.0)
+        cash_flows[rows, last] += face
+        cash_flows[~valid] = 0.0
+
+        annual_coupon = np.where(period > 0, coupon * DAYS_IN_YEAR / np.where(period > 0, period, 1), 0.0)
+        y = np.where(valid & (dirty > 0), annual_coupon / np.where(dirty > 0, dirty, 1), 0.0) + 0.01
+
+        active = np.flatnonzero(valid)
+        for _ in range(NEWTON_ITERATIONS):
+            if active.size == 0:
+                break
+            t_active = t[active]
+            weighted = cash_flows[active] * np.exp(-t_active * np.log1p(y[active])[:, None])
+            pv = weighted.sum(axis=1)
+            dpv = -(t_active * weighted).sum(axis=1) / (1.0 + y[active])
+            step = np.where(dpv != 0, (pv - dirty[active]) / np.where(dpv != 0, dpv, 1), 0.0)
+            y[active] = np.clip(y[active] - step, -0.99, 10.0)
+            active = active[np.abs(step) >= NEWTON_TOLERANCE]
+
+        discount = np.exp(-t * np.log1p(y)[:, None])
+        pv = (cash_flows * discount).sum(axis=1)
+        safe_pv = np.where(pv > 0, pv, 1)
+        macaulay = (t * cash_flows * discount).sum(axis=1) / safe_pv
+        modified = macaulay / (1.0 + y)
+        convexity = (cash_flows * t * (t + 1) * discount).sum(axis=1) / ((1.0 + y) ** 2 * safe_pv)
+
+    ok = valid & np.isfinite(y) & (pv > 0)
+    results = {
+        'accrued_interest': np.where(valid, accrued, 0.0),
+        'clean_price': np.where(valid, clean, 0.0),
+        'dirty_price': np.where(valid, dirty, 0.0),
+        'ytm': np.where(ok, y * 100.0, 0.0),
+        'macaulay_duration': np.where(ok, macaulay, 0.0),
+        'modified_duration': np.where(ok, modified, 0.0),
+        'convexity': np.where(ok, convexity, 0.0),
+    }
+    columns = {field: np.round(np.nan_to_num(values), 6).tolist() for field, values in results.items()}
+    for i, bond in enumerate(bonds):
+        for field in ANALYTICS_FIELDS:
+            bond[field] = columns[field][i]
+    return bonds
@@ -0,0 +1,106 @@
+import re
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+BASE_CURRENCY = 'RUB'
+
+CURRENCY_ALIASES = {
+    'SUR': 'RUB',
+    'RUR': 'RUB',
+}
+
+SETTLEMENT_PRIORITY = ('TOM', 'TOD')
+
+_PAIR_PATTERN = re.compile(r'^([A-Z]{3})_?([A-Z]{3})_+(TOM|TOD)$')
+
+
+def normalize_currency(code: Optional[str]) -> str:
+    code = (code or BASE_CURRENCY).strip().upper()
+    return CURRENCY_ALIASES.get(code, code)
+
+
+def parse_pair(quote: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+    """
+    Валютная пара SELT в виде (базовая, котируемая, расчёты).
+    MOEX кодирует пару в кратком наименовании (USDRUB_TOM, EURUSD_TOM), тикер это не гарантирует.
+    """
+    for value in (quote.get('name'), quote.get('ticker')):
+        match = _PAIR_PATTERN.match(str(value or '').upper())
+        if match:
+            base, counter, settlement = match.groups()
+            return normalize_currency(base), normalize_currency(counter), settlement
+    return None
+
+
+class FxMatrix:
+    """
+    Матрица курсов: rates[i, j] — сколько единиц валюты j стоит одна единица валюты i.
+    Строится из рублёвых курсов, поэтому кросс-курсы согласованы между собой.
+    """
+
+    def __init__(self, rub_rates: Dict[str, float]):
+        rub_rates = {BASE_CURRENCY: 1.0, **rub_rates}
+        self.currencies: List[str] = sorted(rub_rates)
+        self.index = {code: i for i, code in enumerate(self.currencies)}
+        to_rub = np.array([rub_rates[code] for code in self.currencies], dtype=float)
+        self.rates = to_rub[:, None] / to_rub[None, :]
+
+    @classmethod
+    def from_quotes(cls, quotes: List[Dict[str, Any]]) -> 'FxMatrix':
+        pairs: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        for quote in quotes:
+            parsed = parse_pair(quote)
+            price = float(quote.get('price') or 0)
+            if not parsed or price <= 0:
+                continue
+            base, counter, settlement = parsed
+            priority = SETTLEMENT_PRIORITY.index(settlement)
+            current = pairs.get((base, counter))
+            if current is None or priority < current[0]:
+                pairs[(base, counter)] = (priority, price)
+
+        rub_rates = {BASE_CURRENCY: 1.0}
+        for (base, counter), (_, price) in pairs.items():
+            if counter == BASE_CURRENCY:
+                rub_rates[base] = price
+
+        changed = True
+        while changed:
+            changed = False
+            for (base, counter), (_, price) in pairs.items():
+                if base not in rub_rates and counter in rub_rates:
+                    rub_rates[base] = price * rub_rates[counter]
+                    changed = True
+                elif counter not in rub_rates and base in rub_rates:
+                    rub_rates[counter] = rub_rates[base] / price
+                    changed = True
+        return cls(rub_rates)
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'FxMatrix':
+        return cls(payload.get('rub_rates', {}))
+
+    def to_dict(self) -> Dict[str, Any]:
+        rub_index = self.index[BASE_CURRENCY]
+        return {
+            'rub_rates': {code: float(self.rates[i, rub_index]) for i, code in enumerate(self.currencies)},
+        }
+
+    def supports(self, code: str) -> bool:
+        return normalize_currency(code) in self.index
+
+    def rate(self, source: str, target: str) -> Optional[float]:
+        i = self.index.get(normalize_currency(source))
+        j = self.index.get(normalize_currency(target))
+        if i is None or j is None:
+            return None
+        return float(self.rates[i, j])
+
+    def conversion_factors(self, sources: List[str], target: str) -> np.ndarray:
+        """Курсы пересчёта в целевую валюту для списка валют; неизвестные валюты дают NaN."""
+        j = self.index[normalize_currency(target)]
+        column = np.append(self.rates[:, j], np.nan)
+        unknown = len(self.currencies)
+        rows = np.array([self.index.get(normalize_currency(code), unknown) for code in sources], dtype=int)
+        return column[rows]
@@ -0,0 +1,458 @@
+import asyncio
+import codecs
+import json
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable, NamedTuple
+
+import aiohttp
+
+Converter = Callable[[Any, Any], Any]
+
+
+def as_float(value: Any, default: Any = 0.0) -> Any:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def as_int(value: Any, default: Any = 0) -> Any:
+    if not value:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def as_str(value: Any, default: Any = None) -> Any:
+    return value if value != "" else default
+
+
+class IssField(NamedTuple):
+    """
+    Поле результата: первая непустая из колонок columns, приведённая converter.
+    Колонки, которых нет в ответе, пропускаются; если нет ни одной — поле получает default.
+    """
+    columns: Tuple[str, ...]
+    converter: Converter = as_str
+    default: Any = None
+
+
+def field(*columns: str, converter: Converter = as_str, default: Any = None) -> IssField:
+    return IssField(columns, converter, default)
+
+
+class IssDecoder:
+    """
+    Декодер таблиц ISS вида {"columns": [...], "data": [[...], ...]}.
+    Соответствие колонка -> индекс и конвертеры собираются один раз на набор колонок ответа,
+    после чего строки превращаются в словари в одном плотном цикле без поиска по именам.
+    """
+
+    def __init__(self, fields: Dict[str, IssField]):
+        self.fields = fields
+        self._compiled: Dict[Tuple[str, ...], Callable[[list, Dict[str, Any]], Dict[str, Any]]] = {}
+
+    def compile(self, columns) -> Callable[[list, Dict[str, Any]], Dict[str, Any]]:
+        columns = tuple(columns or ())
+        row_decoder = self._compiled.get(columns)
+        if row_decoder is not None:
+            return row_decoder
+
+        index = {name: i for i, name in enumerate(columns)}
+        single: List[Tuple[str, int, Converter, Any]] = []
+        coalesced: List[Tuple[str, Tuple[int, ...], Converter, Any]] = []
+        missing: Dict[str, Any] = {}
+        for name, spec in self.fields.items():
+            present = tuple(index[column] for column in spec.columns if column in index)
+            if not present:
+                missing[name] = spec.default
+            elif len(present) == 1:
+                single.append((name, present[0], spec.converter, spec.default))
+            else:
+                coalesced.append((name, present, spec.converter, spec.default))
+
+        def decode_row(row: list, constants: Dict[str, Any]) -> Dict[str, Any]:
+            record = {**missing, **constants}
+            for name, i, converter, default in single:
+                value = row[i]
+                record[name] = default if value is None else converter(value, default)
+            for name, indexes, converter, default in coalesced:
+                result = default
+                for i in indexes:
+                    value = row[i]
+                    if value is not None:
+                        value = converter(value, None)
+                        if value is not None:
+                            result = value
+                            break
+                record[name] = result
+            return record
+
+        self._compiled[columns] = decode_row
+        return decode_row
+
+    def decode(self, block: Optional[Dict[str, Any]], limit: Optional[int] = None,
+               **constants: Any) -> List[Dict[str, Any]]:
+        """Строки блока ISS; constants добавляются в каждую строку (время снимка, тип актива)."""
+        if not block:
+            return []
+        decode_row = self.compile(block.get('columns'))
+        rows = block.get('data') or []
+        if limit is not None:
+            rows = rows[:limit]
+        result = []
+        for row in rows:
+            if not row:
+                continue
+            try:
+                result.append(decode_row(row, constants))
+            except IndexError:
+                continue
+        return result
+
+    def decode_index(self, block: Optional[Dict[str, Any]], key: str = 'ticker') -> Dict[Any, Dict[str, Any]]:
+        return index_records(self.decode(block), key)
+
+    def table(self, limit: Optional[int] = None, **constants: Any) -> 'IssTable':
+        return IssTable(self, limit, constants)
+
+
+class IssTable(NamedTuple):
+    """Что читать из блока ответа при потоковом разборе: декодер, предел строк и общие поля строк."""
+    decoder: IssDecoder
+    limit: Optional[int] = None
+    constants: Dict[str, Any] = {}
+
+
+def index_records(records: List[Dict[str, Any]], key: str = 'ticker') -> Dict[Any, Dict[str, Any]]:
+    return {record[key]: record for record in records if record.get(key) is not None}
+
+
+class _NeedMore(Exception):
+    pass
+
+
+_WHITESPACE = ' \t\n\r,'
+_STRUCTURE = re.compile(r'[{}\[\]"]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[,}\]]')
+
+
+class IssStreamParser:
+    """
+    Инкрементальный разбор ответа ISS по мере поступления данных.
+    Строки нужных блоков декодируются по одной (json raw_decode + IssDecoder) и сразу проецируются
+    в нужные поля; ненужные блоки и строки сверх предела пропускаются сканером скобок без построения объектов.
+    Разбор завершается, как только все запрошенные блоки прочитаны или упёрлись в предел.
+    """
+
+    def __init__(self, tables: Dict[str, IssTable]):
+        self.tables = tables
+        self.results: Dict[str, List[Dict[str, Any]]] = {name: [] for name in tables}
+        self.pending = set(tables)
+        self.finished = False
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._state = 'start'
+        self._block: Optional[str] = None
+        self._decode_row = None
+        self._skip_depth = 0
+        self._skip_in_string = False
+        self._skip_return = 'top'
+        self._json = json.JSONDecoder()
+
+    def feed(self, text: str, final: bool = False) -> bool:
+        """Добавляет очередной фрагмент текста; True, когда всё нужное уже прочитано."""
+        if self.finished:
+            return True
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        self._eof = final
+        try:
+            while not self.finished:
+                self._step()
+        except _NeedMore:
+            if final:
+                raise ValueError("Truncated ISS response")
+        return self.finished
+
+    def _next_token(self, pos: int) -> int:
+        buffer = self._buffer
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buffer):
+            raise _NeedMore()
+        return pos
+
+    def _value(self, pos: int) -> Tuple[Any, int]:
+        try:
+            return self._json.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise ValueError(f"Malformed or truncated ISS response at offset {pos}")
+            raise _NeedMore()
+
+    def _key(self, pos: int) -> Tuple[str, int]:
+        key, pos = self._value(pos)
+        pos = self._next_token(pos)
+        if self._buffer[pos] != ':':
+            raise ValueError(f"Malformed ISS response at offset {pos}")
+        return key, self._next_token(pos + 1)
+
+    def _start_skip(self, pos: int, depth: int, return_state: str) -> None:
+        self._pos = pos
+        self._skip_depth = depth
+        self._skip_in_string = False
+        self._skip_return = return_state
+        self._state = 'skip'
+
+    def _finish_block(self, name: Optional[str]) -> None:
+        if name in self.pending:
+            self.pending.discard(name)
+            if not self.pending:
+                self.finished = True
+
+    def _step(self) -> None:
+        state = self._state
+        buffer = self._buffer
+        if state == 'skip':
+            self._skip()
+            return
+
+        pos = self._next_token(self._pos)
+        char = buffer[pos]
+
+        if state == 'start':
+            if char != '{':
+                raise ValueError("ISS response is not a JSON object")
+            self._pos, self._state = pos + 1, 'top'
+
+        elif state == 'top':
+            if char == '}':
+                self._pos = pos + 1
+                self.finished = True
+                return
+            key, pos = self._key(pos)
+            if key in self.pending and buffer[pos] == '{':
+                self._pos, self._state, self._block, self._decode_row = pos + 1, 'block', key, None
+            else:
+                self._start_skip(pos, 0, 'top')
+
+        elif state == 'block':
+            if char == '}':
+                self._pos, self._state = pos + 1, 'top'
+                self._finish_block(self._block)
+                return
+            key, pos = self._key(pos)
+            if key == 'columns':
+                columns, pos = self._value(pos)
+                self._decode_row = self.tables[self._block].decoder.compile(columns)
+                self._pos = pos
+            elif key == 'data' and buffer[pos] == '[':
+                self._pos, self._state = pos + 1, 'rows'
+            else:
+                self._start_skip(pos, 0, 'block')
+
+        elif state == 'rows':
+            if char == ']':
+                self._pos, self._state = pos + 1, 'block'
+                return
+            table = self.tables[self._block]
+            rows = self.results[self._block]
+            if table.limit is not None and len(rows) >= table.limit:
+                self._finish_block(self._block)
+                self._start_skip(pos, 1, 'block')
+                return
+            row, pos = self._value(pos)
+            if self._decode_row is None:
+                raise ValueError(f"ISS block {self._block} has data before columns")
+            if row:
+                try:
+                    rows.append(self._decode_row(row, table.constants))
+                except IndexError:
+                    pass
+            self._pos = pos
+
+    def _skip(self) -> None:
+        """Пропускает значение (или остаток массива при depth=1), не разбирая его содержимое."""
+        buffer = self._buffer
+        pos = self._pos
+        if self._skip_depth == 0 and not self._skip_in_string:
+            pos = self._next_token(pos)
+            if buffer[pos] not in '{["':
+                match = _SCALAR_END.search(buffer, pos)
+                if match is None:
+                    if self._eof:
+                        raise ValueError("Truncated ISS response")
+                    raise _NeedMore()
+                self._pos, self._state = match.start(), self._skip_return
+                return
+        while True:
+            if self._skip_in_string:
+                match = _STRING_END.search(buffer, pos)
+                if match is None or (match.group() == '\\' and match.start() + 1 >= len(buffer)):
+                    self._pos = len(buffer) if match is None else match.start()
+                    raise _NeedMore()
+                if match.group() == '\\':
+                    pos = match.start() + 2
+                    continue
+                pos = match.end()
+                self._skip_in_string = False
+                if self._skip_depth == 0:
+                    break
+                continue
+            match = _STRUCTURE.search(buffer, pos)
+            if match is None:
+                self._pos = len(buffer)
+                raise _NeedMore()
+            pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_in_string = True
+            elif char in '{[':
+                self._skip_depth += 1
+            else:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    break
+        self._pos, self._state = pos, self._skip_return
+
+
+async def read_tables(response, tables: Dict[str, IssTable], chunk_size: int = 64 * 1024) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Потоково читает ответ aiohttp и возвращает строки запрошенных блоков.
+    Чтение прекращается сразу после последнего нужного блока или предела строк,
+    остаток ответа не загружается.
+    """
+    parser = IssStreamParser(tables)
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    async for chunk in response.content.iter_chunked(chunk_size):
+        if parser.feed(text_decoder.decode(chunk)):
+            break
+    else:
+        parser.feed(text_decoder.decode(b'', final=True), final=True)
+    return parser.results
+
+
+async def read_table(response, block: str, table: IssTable) -> List[Dict[str, Any]]:
+    return (await read_tables(response, {block: table}))[block]
+
+
+ISS_PAGE_CONCURRENCY = 4
+
+
+@asynccontextmanager
+async def iss_session(session: Optional[aiohttp.ClientSession] = None):
+    """Общая сессия приложения (пул соединений к ISS), если она передана, иначе — сессия на один запрос."""
+    if session is not None and not session.closed:
+        yield session
+        return
+    async with aiohttp.ClientSession() as own_session:
+        yield own_session
+
+CURSOR_FIELDS = {
+    'index': field('INDEX', converter=as_int, default=0),
+    'total': field('TOTAL', converter=as_int, default=0),
+    'page_size': field('PAGESIZE', converter=as_int, default=0),
+}
+
+cursor_decoder = IssDecoder(CURSOR_FIELDS)
+
+
+async def read_paged_tables(session, response, block: str, tables: Dict[str, IssTable],
+                            concurrency: int = ISS_PAGE_CONCURRENCY) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Строки блоков tables со всех страниц ответа ISS; страницы задаёт курсор блока block.
+    Первая страница читается из уже открытого response вместе с блоком <block>.cursor (INDEX, TOTAL, PAGESIZE);
+    остальные страницы запрашиваются параллельно с параметром start, не более concurrency одновременно,
+    и склеиваются в исходном порядке. Без курсора ответ считается полным.
+    Ошибка любой страницы пробрасывается: неполный список инструментов не должен выглядеть полным.
+    """
+    cursor_block = f"{block}.cursor"
+    result = await read_tables(response, {**tables, cursor_block: cursor_decoder.table()})
+    cursor = result.pop(cursor_block)
+    cursor = cursor[0] if cursor else None
+    if not cursor or cursor['page_size'] <= 0:
+        return result
+
+    starts = range(cursor['index'] + cursor['page_size'], cursor['total'], cursor['page_size'])
+    if not starts:
+        return result
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_page(start: int) -> Dict[str, List[Dict[str, Any]]]:
+        async with semaphore:
+            async with session.get(response.url.update_query(start=start)) as page:
+                page.raise_for_status()
+                return await read_tables(page, tables)
+
+    for page in await asyncio.gather(*(fetch_page(start) for start in starts)):
+        for name, rows in page.items():
+            result[name].extend(rows)
+    return result
+
+
+async def read_paged_table(session, response, block: str, table: IssTable,
+                           concurrency: int = ISS_PAGE_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Строки одного блока со всех страниц ответа ISS, см. read_paged_tables."""
+    return (await read_paged_tables(session, response, block, {block: table}, concurrency))[block]
+
+
+def snapshot_time() -> str:
+    """Одна отметка времени на весь ответ вместо datetime.now() в каждой строке."""
+    return datetime.now().isoformat()
+
+
+def join_marketdata(securities: List[Dict[str, Any]], marketdata: Dict[Any, Dict[str, Any]],
+                    defaults: Dict[str, Any], key: str = 'ticker') -> List[Dict[str, Any]]:
+    """Дополняет строки securities котировками marketdata по тикеру; без котировки — значения defaults."""
+    for security in securities:
+        quote = marketdata.get(security[key])
+        if quote is None:
+            security.update(defaults)
+        else:
+            for name, value in quote.items():
+                if name != key:
+                    security[name] = value
+    return securities
+
+
+SECURITY_FIELDS = {
+    'ticker': field('SECID'),
+    'name': field('SHORTNAME'),
+    'full_name': field('SECNAME'),
+    'isin': field('ISIN'),
+    'regnumber': field('REGNUMBER'),
+    'lotsize': field('LOTSIZE', converter=as_int, default=1),
+}
+
+QUOTE_FIELDS = {
+    'ticker': field('SECID'),
+    'price': field('LAST', converter=as_float, default=0),
+    'change': field('CHANGE', converter=as_float, default=0),
+    'open_price': field('OPEN', converter=as_float, default=0),
+    'change_percent': field('LASTTOPREVPRICE', converter=as_float, default=0),
+    'volume': field('VALUE', converter=as_float, default=0),
+    'update_time': field('UPDATETIME'),
+}
+
+EMPTY_QUOTE = {
+    'price': 0,
+    'change': 0,
+    'open_price': 0,
+    'change_percent': 0,
+    'volume': 0,
+    'update_time': None,
+}
+
+SECURITY_COLUMNS = 'SECID,SHORTNAME,SECNAME,ISIN,REGNUMBER,LOTSIZE'
+QUOTE_COLUMNS = 'SECID,LAST,LASTTOPREVPRICE,OPEN,CHANGE,VALUE,UPDATETIME'
+
+security_decoder = IssDecoder(SECURITY_FIELDS)
+quote_decoder = IssDecoder(QUOTE_FIELDS)
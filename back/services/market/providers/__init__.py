@@ -1,13 +1,29 @@
+from typing import List, Optional
+
+import aiohttp
+
 from .stocks import StocksDataProvider
 from .bonds import BondsDataProvider
 from .funds import FundsDataProvider
 from .indices import IndicesDataProvider
 from .currency import CurrencyDataProvider
 
+
+def create_market_data_providers(base_url: str, session: Optional[aiohttp.ClientSession] = None) -> List:
+    return [
+        StocksDataProvider(base_url, session),
+        BondsDataProvider(base_url, session),
+        FundsDataProvider(base_url, session),
+        IndicesDataProvider(base_url, session),
+        CurrencyDataProvider(base_url, session),
+    ]
+
+
 __all__ = [
     "StocksDataProvider", 
     "BondsDataProvider", 
     "FundsDataProvider", 
     "IndicesDataProvider",
-    "CurrencyDataProvider"
-]
\ No newline at end of file
+    "CurrencyDataProvider",
+    "create_market_data_providers",
+]
@@ -1,13 +1,36 @@
 import aiohttp
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from back.contracts.market import IMarketDataProvider
 from back.core.logger import logger
+from back.services.market.fx import FxMatrix
+from back.services.market.iss import (
+    iss_session,
+    IssDecoder, field, as_float, snapshot_time, read_table, read_paged_table, index_records,
+)
+
+CURRENCY_FIELDS = {
+    'ticker': field('SECID'),
+    'shortname': field('SHORTNAME'),
+    'secname': field('SECNAME'),
+    'prevprice': field('PREVPRICE', converter=as_float),
+    'prevwaprice': field('PREVWAPRICE', converter=as_float),
+}
+
+CURRENCY_QUOTE_FIELDS = {
+    'ticker': field('SECID'),
+    'price': field('LAST', converter=as_float),
+    'change': field('LASTCHANGE', converter=as_float),
+    'change_percent': field('LASTCHANGEPRC', converter=as_float),
+}
+
+currency_decoder = IssDecoder(CURRENCY_FIELDS)
+currency_quote_decoder = IssDecoder(CURRENCY_QUOTE_FIELDS)
 
 
 class CurrencyDataProvider(IMarketDataProvider):
-    def __init__(self, moex_base_url: str):
+    def __init__(self, moex_base_url: str, session: Optional[aiohttp.ClientSession] = None):
         self.base_url = moex_base_url.rstrip("/")
+        self.session = session
 
     def get_cache_key(self) -> str:
         return "moex:currency"
@@ -15,11 +38,14 @@ class CurrencyDataProvider(IMarketDataProvider):
     def get_asset_type(self) -> str:
         return "currency"
 
+    def get_snapshot_extras(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"fx": FxMatrix.from_quotes(data).to_dict()}
+
     async def fetch_data(self) -> List[Dict[str, Any]]:
         try:
             url = f"{self.base_url}/engines/currency/markets/selt/securities.json"
             
-            async with aiohttp.ClientSession() as session:
+            async with iss_session(self.session) as session:
                 securities_data = await self._fetch_securities(session, url)
                 market_data = await self._fetch_market_data(session, url)
                 return self._parse_currency_data(securities_data, market_data)
@@ -31,7 +57,7 @@ class CurrencyDataProvider(IMarketDataProvider):
             logger.error(f"Error fetching currencies: {e}")
             return []
 
-    async def _fetch_securities(self, session: aiohttp.ClientSession, url: str) -> Dict:
+    async def _fetch_securities(self, session: aiohttp.ClientSession, url: str) -> List[Dict[str, Any]]:
         params = {
             'iss.meta': 'off',
             'securities.columns': 'SECID,SHORTNAME,SECNAME,PREVPRICE,PREVWAPRICE',
@@ -39,9 +65,9 @@ class CurrencyDataProvider(IMarketDataProvider):
         
         async with session.get(url, params=params) as response:
             response.raise_for_status()
-            return await response.json()
+            return await read_paged_table(session, response, 'securities', currency_decoder.table())
 
-    async def _fetch_market_data(self, session: aiohttp.ClientSession, url: str) -> Dict:
+    async def _fetch_market_data(self, session: aiohttp.ClientSession, url: str) -> List[Dict[str, Any]]:
         params = {
             'iss.meta': 'off',
             'iss.only': 'marketdata',
@@ -50,85 +76,38 @@ class CurrencyDataProvider(IMarketDataProvider):
         
         async with session.get(url, params=params) as response:
             if response.status == 200:
-                return await response.json()
-            return {}
+                return await read_table(response, 'marketdata', currency_quote_decoder.table())
+            return []
 
-    def _parse_currency_data(self, securities_data: Dict, market_data: Dict) -> List[Dict[str, Any]]:
-        securities = securities_data.get('securities', {}).get('data', [])
-        securities_cols = securities_data.get('securities', {}).get('columns', [])
-        
-        marketdata = market_data.get('marketdata', {}).get('data', [])
-        marketdata_cols = market_data.get('marketdata', {}).get('columns', [])
-        
-        secid_idx = securities_cols.index('SECID')
-        shortname_idx = securities_cols.index('SHORTNAME')
-        secname_idx = securities_cols.index('SECNAME')
-        prevprice_idx = securities_cols.index('PREVPRICE')
-        prevwaprice_idx = securities_cols.index('PREVWAPRICE')
-        
-        if marketdata_cols:
-            market_secid_idx = marketdata_cols.index('SECID') if 'SECID' in marketdata_cols else -1
-            last_idx = marketdata_cols.index('LAST') if 'LAST' in marketdata_cols else -1
-            change_idx = marketdata_cols.index('LASTCHANGE') if 'LASTCHANGE' in marketdata_cols else -1
-            pct_idx = marketdata_cols.index('LASTCHANGEPRC') if 'LASTCHANGEPRC' in marketdata_cols else -1
-            open_idx = marketdata_cols.index('OPEN') if 'OPEN' in marketdata_cols else -1
-            low_idx = marketdata_cols.index('LOW') if 'LOW' in marketdata_cols else -1
-            high_idx = marketdata_cols.index('HIGH') if 'HIGH' in marketdata_cols else -1
-        else:
-            market_secid_idx = last_idx = change_idx = pct_idx = open_idx = low_idx = high_idx = -1
-        
-        market_dict = {}
-        for item in marketdata:
-            if item and market_secid_idx != -1 and len(item) > market_secid_idx:
-                ticker = item[market_secid_idx]
-                market_dict[ticker] = item
+    def _parse_currency_data(self, securities: List[Dict[str, Any]], market_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        fetched_at = snapshot_time()
+        market_dict = index_records(market_data)
         
         result = []
         for security in securities:
-            if not security:
+            ticker = security['ticker']
+            if not ticker:
                 continue
-                
-            ticker = security[secid_idx]
-            shortname = security[shortname_idx]
-            secname = security[secname_idx]
-            prevprice = security[prevprice_idx] if prevprice_idx < len(security) else None
-            prevwaprice = security[prevwaprice_idx] if prevwaprice_idx < len(security) else None
-            
-            market_item = market_dict.get(ticker, [])
-            
-            price = None
-            if last_idx != -1 and last_idx < len(market_item) and market_item[last_idx] is not None:
-                price = market_item[last_idx]
-            elif prevwaprice is not None:
-                price = prevwaprice
-            elif prevprice is not None:
-                price = prevprice
-            
-            change = None
-            if change_idx != -1 and change_idx < len(market_item) and market_item[change_idx] is not None:
-                change = market_item[change_idx]
-            
-            change_percent = None
-            if pct_idx != -1 and pct_idx < len(market_item) and market_item[pct_idx] is not None:
-                change_percent = market_item[pct_idx]
-            
-            display_name = shortname if shortname else secname if secname else ticker
+            display_name = security['shortname'] or security['secname'] or ticker
             
             if not self._is_main_currency(ticker, display_name):
                 continue
             
-            currency_data = {
+            quote = market_dict.get(ticker, {})
+            price = quote.get('price')
+            if price is None:
+                price = security['prevwaprice'] if security['prevwaprice'] is not None else security['prevprice']
+            
+            result.append({
                 'ticker': ticker,
                 'name': display_name,
-                'full_name': secname if secname else display_name,
-                'price': float(price) if price is not None else 0,
-                'change': float(change) if change is not None else 0,
-                'change_percent': float(change_percent) if change_percent is not None else 0,
-                'last_updated': datetime.now().isoformat(),
+                'full_name': security['secname'] or display_name,
+                'price': price if price is not None else 0,
+                'change': quote.get('change') or 0,
+                'change_percent': quote.get('change_percent') or 0,
+                'last_updated': fetched_at,
                 'asset_type': 'currency',
-            }
-            
-            result.append(currency_data)
+            })
         
         logger.info(f"Parsed {len(result)} currencies")
         return result
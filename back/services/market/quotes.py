@@ -0,0 +1,79 @@
+"""
+Поиск котировок по списку тикеров и ISIN сразу по нескольким типам активов.
+
+Для каждого снимка строится словарь идентификатор → строка; индекс живёт, пока процесс
+отдаёт тот же объект снимка, и перестраивается только при смене версии.
+Идентификатор можно уточнить типом активов: "bonds:RU000A0JX0J2".
+"""
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+MAX_QUOTE_IDENTIFIERS = 200
+
+QUOTE_FIELDS = ('ticker', 'isin', 'name', 'price', 'change', 'change_percent', 'volume', 'currency', 'update_time')
+EXTRA_QUOTE_FIELDS = {
+    'bonds': ('ytm', 'accrued_interest', 'maturity_date'),
+}
+
+
+class QuoteRequest(NamedTuple):
+    identifier: str
+    asset_type: Optional[str]
+    key: str
+
+
+def parse_identifiers(raw: Iterable[str], asset_types: Iterable[str]) -> List[QuoteRequest]:
+    """Нормализует идентификаторы (регистр, пробелы, запятые, повторы); ValueError — неизвестный тип или их слишком много."""
+    known = set(asset_types)
+    requests: Dict[str, QuoteRequest] = {}
+    for chunk in raw:
+        for value in str(chunk).split(','):
+            value = value.strip()
+            if not value:
+                continue
+            asset_type, _, identifier = value.rpartition(':')
+            asset_type = asset_type.strip().lower() or None
+            if asset_type is not None and asset_type not in known:
+                raise ValueError(f"Unknown asset type: {asset_type}")
+            identifier = identifier.strip().upper()
+            key = f"{asset_type}:{identifier}" if asset_type else identifier
+            requests.setdefault(key, QuoteRequest(identifier, asset_type, key))
+    if len(requests) > MAX_QUOTE_IDENTIFIERS:
+        raise ValueError(f"Too many identifiers: {len(requests)} > {MAX_QUOTE_IDENTIFIERS}")
+    return list(requests.values())
+
+
+class QuoteIndex:
+    def __init__(self, asset_type: str, data: List[Dict[str, Any]]):
+        self.asset_type = asset_type
+        self.fields = QUOTE_FIELDS + EXTRA_QUOTE_FIELDS.get(asset_type, ())
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        for row in data:
+            if row.get('ticker'):
+                self.rows[str(row['ticker']).upper()] = row
+        for row in data:
+            if row.get('isin'):
+                self.rows.setdefault(str(row['isin']).upper(), row)
+
+    def get(self, identifier: str) -> Optional[Dict[str, Any]]:
+        row = self.rows.get(identifier)
+        if row is None:
+            return None
+        quote = {name: row[name] for name in self.fields if name in row}
+        quote['asset_type'] = self.asset_type
+        return quote
+
+
+def resolve_quotes(requests: List[QuoteRequest], indexes: List[Tuple[str, QuoteIndex]],
+                   search: List[Tuple[str, QuoteIndex]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Котировки в порядке запроса; неуточнённый идентификатор ищется по индексам search по порядку."""
+    by_type = dict(indexes)
+    quotes, missing = [], []
+    for request in requests:
+        candidates = [by_type[request.asset_type]] if request.asset_type else [index for _, index in search]
+        quote = next((quote for quote in (index.get(request.identifier) for index in candidates) if quote), None)
+        if quote is None:
+            missing.append(request.key)
+        else:
+            quote['query'] = request.key
+            quotes.append(quote)
+    return quotes, missing
@@ -0,0 +1,221 @@
+"""
+Координация обновления снимков рынка между воркерами и узлами.
+
+Для каждого типа активов в Redis живёт аренда moex:lease:<asset_type> (SET NX PX).
+Все процессы крутят одинаковый цикл: захватить или продлить аренду, и только владелец
+обновляет снимок из ISS, заранее, до истечения TTL в Redis. Если владелец умирает, аренда истекает
+через lease_ttl и её забирает следующий процесс.
+
+О новом снимке владелец сообщает в канал moex:snapshots; остальные процессы будят ждущие запросы
+и обновляют локальный снимок на диске. Ручное обновление с не-владельца уходит владельцу через moex:refresh.
+"""
+import asyncio
+import json
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Dict, Optional, Set
+
+from redis.exceptions import WatchError
+
+from ...core import redis_client
+from ...core.logger import logger
+from ...core.metrics import REFRESH_LEADER
+
+LEASE_TTL = 15.0
+RENEW_INTERVAL = 5.0
+REFRESH_AHEAD = 60
+LEADER_WAIT_TIMEOUT = 10.0
+SNAPSHOT_CHANNEL = "moex:snapshots"
+REFRESH_CHANNEL = "moex:refresh"
+
+
+def make_owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class RedisLease:
+    """Аренда с владельцем: продлить или снять её может только тот, кто её взял."""
+
+    def __init__(self, redis, key: str, owner: str, ttl: float = LEASE_TTL):
+        self.redis = redis
+        self.key = key
+        self.owner = owner
+        self.ttl_ms = int(ttl * 1000)
+
+    def acquire(self) -> bool:
+        if self.redis.set(self.key, self.owner, nx=True, px=self.ttl_ms):
+            return True
+        return self.renew()
+
+    def renew(self) -> bool:
+        return self._if_owner(lambda pipe: pipe.pexpire(self.key, self.ttl_ms))
+
+    def release(self) -> bool:
+        return self._if_owner(lambda pipe: pipe.delete(self.key))
+
+    def _if_owner(self, command) -> bool:
+        with self.redis.pipeline() as pipe:
+            try:
+                pipe.watch(self.key)
+                if pipe.get(self.key) != self.owner:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                command(pipe)
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+
+class RefreshCoordinator:
+    def __init__(self, market_service, redis=redis_client, owner: Optional[str] = None,
+                 lease_ttl: float = LEASE_TTL, renew_interval: float = RENEW_INTERVAL,
+                 refresh_ahead: int = REFRESH_AHEAD):
+        self.market_service = market_service
+        self.redis = redis
+        self.owner = owner or make_owner_id()
+        self.renew_interval = renew_interval
+        self.refresh_ahead = refresh_ahead
+        self.providers = {provider.get_asset_type(): provider for provider in market_service.data_providers}
+        self.leases = {
+            asset_type: RedisLease(redis, f"moex:lease:{asset_type}", self.owner, lease_ttl)
+            for asset_type in self.providers
+        }
+        self._tasks: Set[asyncio.Task] = set()
+        self._updates: Dict[str, asyncio.Event] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {asset_type: asyncio.Event() for asset_type in self.providers}
+        self._forced: Set[str] = set()
+        self._stopping = False
+
+    async def start(self) -> None:
+        for asset_type in self.providers:
+            self._spawn(self._lead(asset_type))
+        self._spawn(self._listen())
+        logger.info(f"Refresh coordinator {self.owner} started")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for asset_type, lease in self.leases.items():
+            try:
+                if lease.release():
+                    logger.info(f"Released {asset_type} refresh lease")
+            except Exception as e:
+                logger.error(f"Error releasing {asset_type} refresh lease: {e}")
+            REFRESH_LEADER.labels(asset_type).set(0)
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def try_lead(self, asset_type: str) -> bool:
+        """Захватывает или продлевает аренду; True — этот процесс отвечает за обновление asset_type."""
+        lease = self.leases.get(asset_type)
+        if lease is None:
+            return True
+        try:
+            leader = lease.acquire()
+        except Exception as e:
+            logger.error(f"Error acquiring {asset_type} refresh lease: {e}")
+            return True
+        REFRESH_LEADER.labels(asset_type).set(1 if leader else 0)
+        return leader
+
+    def publish_snapshot(self, asset_type: str, version: Optional[int]) -> None:
+        """Сообщает всем процессам о новом снимке; version=None — записан запасной снимок."""
+        self._notify(asset_type)
+        try:
+            self.redis.publish(SNAPSHOT_CHANNEL, json.dumps(
+                {"asset_type": asset_type, "version": version, "owner": self.owner}))
+        except Exception as e:
+            logger.error(f"Error publishing {asset_type} snapshot event: {e}")
+
+    def request_refresh(self, asset_type: str) -> None:
+        self.redis.publish(REFRESH_CHANNEL, json.dumps({"asset_type": asset_type, "owner": self.owner}))
+
+    async def wait_for_snapshot(self, asset_type: str, timeout: float) -> bool:
+        event = self._updates.setdefault(asset_type, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _notify(self, asset_type: str) -> None:
+        event = self._updates.pop(asset_type, None)
+        if event is not None:
+            event.set()
+
+    def _is_due(self, asset_type: str) -> bool:
+        ttl = self.redis.ttl(self.providers[asset_type].get_cache_key())
+        return ttl == -2 or 0 <= ttl < self.refresh_ahead
+
+    async def _lead(self, asset_type: str) -> None:
+        provider = self.providers[asset_type]
+        wakeup = self._wakeups[asset_type]
+        while not self._stopping:
+            try:
+                if self.try_lead(asset_type) and (asset_type in self._forced or self._is_due(asset_type)):
+                    self._forced.discard(asset_type)
+                    await self._refresh_holding_lease(provider)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Refresh loop for {asset_type} failed: {e}")
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.renew_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refresh_holding_lease(self, provider) -> None:
+        await self.hold_lease(provider.get_asset_type(), self.market_service.refresh_snapshot(provider))
+
+    async def hold_lease(self, asset_type: str, refresh: Awaitable) -> Any:
+        """Обновление может идти дольше аренды (повторы, медленный ISS), поэтому аренда продлевается по ходу."""
+        lease = self.leases[asset_type]
+        refresh = asyncio.ensure_future(refresh)
+        try:
+            while True:
+                done, _ = await asyncio.wait({refresh}, timeout=self.renew_interval)
+                if done:
+                    return refresh.result()
+                if not lease.renew():
+                    logger.warning(f"Lost {asset_type} refresh lease while refreshing")
+        except asyncio.CancelledError:
+            refresh.cancel()
+            raise
+
+    async def _listen(self) -> None:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(SNAPSHOT_CHANNEL, REFRESH_CHANNEL)
+        try:
+            while not self._stopping:
+                try:
+                    message = await asyncio.to_thread(pubsub.get_message, timeout=1.0)
+                    if message is not None:
+                        await self._handle_message(message["channel"], json.loads(message["data"]))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Refresh coordinator listener error: {e}")
+                    await asyncio.sleep(self.renew_interval)
+        finally:
+            pubsub.close()
+
+    async def _handle_message(self, channel: str, event: Dict) -> None:
+        asset_type = event.get("asset_type")
+        if asset_type not in self.providers:
+            return
+        if channel == REFRESH_CHANNEL:
+            self._forced.add(asset_type)
+            self._wakeups[asset_type].set()
+            return
+        self._notify(asset_type)
+        if event.get("owner") != self.owner and event.get("version") is not None:
+            await self.market_service.sync_disk_snapshot(self.providers[asset_type], event["version"])
@@ -0,0 +1,129 @@
+import asyncio
+import random
+import time
+from typing import List, Dict, Any, Optional
+
+from ...contracts.market import IMarketDataProvider
+from ...core.logger import logger
+from ...core.metrics import PROVIDER_CIRCUIT_STATE, PROVIDER_RETRIES
+
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 60.0
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 5.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class ProviderUnavailable(Exception):
+    """Провайдер не отдал данные: ошибка, таймаут, пустой ответ или открытый предохранитель."""
+
+
+class CircuitBreaker:
+    """
+    Предохранитель одного провайдера в пределах процесса.
+    После failure_threshold неудачных обновлений подряд запросы к ISS не выполняются reset_timeout секунд;
+    затем пропускается одна пробная попытка, успех которой снова замыкает цепь.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probe_in_flight = False
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failure(s)")
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def release_probe(self) -> None:
+        """Пробная попытка прервана отменой запроса, а не ответом ISS: следующий вызов попробует снова."""
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        PROVIDER_CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(asset_type: str) -> CircuitBreaker:
+    breaker = _breakers.get(asset_type)
+    if breaker is None:
+        breaker = _breakers[asset_type] = CircuitBreaker(asset_type)
+    return breaker
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Экспоненциальная пауза с полным джиттером: одновременные воркеры не повторяют запросы синхронно."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def fetch_with_resilience(provider: IMarketDataProvider, timeout: float, retries: int,
+                                breaker: Optional[CircuitBreaker] = None) -> List[Dict[str, Any]]:
+    """
+    Данные провайдера с таймаутом на попытку, повторами и предохранителем.
+    Провайдеры сообщают об ошибке ISS пустым списком, поэтому пустой ответ тоже считается неудачей.
+    Бросает ProviderUnavailable, если цепь разомкнута или все попытки исчерпаны.
+    """
+    asset_type = provider.get_asset_type()
+    breaker = breaker or get_breaker(asset_type)
+    if not breaker.allow():
+        raise ProviderUnavailable(f"circuit open for {asset_type}, retry in {breaker.retry_after():.0f}s")
+
+    reason = "no attempts made"
+    try:
+        for attempt in range(retries + 1):
+            if attempt:
+                PROVIDER_RETRIES.labels(asset_type).inc()
+                await asyncio.sleep(backoff_delay(attempt - 1))
+            try:
+                data = await asyncio.wait_for(provider.fetch_data(), timeout)
+            except asyncio.TimeoutError:
+                reason = f"timed out after {timeout:.0f}s"
+            except Exception as e:
+                reason = str(e) or type(e).__name__
+            else:
+                if data:
+                    breaker.record_success()
+                    return data
+                reason = "empty response"
+            logger.warning(f"Fetching {asset_type} failed (attempt {attempt + 1}/{retries + 1}): {reason}")
+    except asyncio.CancelledError:
+        breaker.release_probe()
+        raise
+
+    breaker.record_failure()
+    raise ProviderUnavailable(f"{asset_type}: {reason}")
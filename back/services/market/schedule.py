@@ -0,0 +1,184 @@
+"""
+Расписание торгов MOEX и частота обновления снимков.
+
+Каждому типу активов соответствует рынок (engine) со своими фазами торгового дня по московскому времени.
+У фазы есть интервал обновления снимка: секунды в основную сессию, минуты в вечернюю;
+вне фаз и в неторговые дни снимок не обновляется и живёт до следующего открытия.
+Праздники и перенесённые рабочие дни задаются переопределениями календаря в Redis.
+"""
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Dict, Optional, NamedTuple, Tuple
+
+from ...core import redis_client
+
+MOSCOW = timezone(timedelta(hours=3), "MSK")
+MIN_CLOSED_TTL = 60
+MAX_CLOSED_TTL = 7 * 24 * 3600
+LOOKAHEAD_DAYS = 14
+
+OPEN, CLOSED = "open", "closed"
+
+
+class TradingPhase(NamedTuple):
+    name: str
+    start: time
+    end: time
+    refresh_interval: float
+
+
+ENGINE_SESSIONS: Dict[str, List[TradingPhase]] = {
+    "stock": [
+        TradingPhase("morning", time(6, 50), time(9, 50), 60),
+        TradingPhase("opening_auction", time(9, 50), time(10, 0), 30),
+        TradingPhase("main", time(10, 0), time(18, 40), 15),
+        TradingPhase("closing_auction", time(18, 40), time(18, 50), 15),
+        TradingPhase("evening", time(19, 5), time(23, 50), 120),
+    ],
+    "bonds": [
+        TradingPhase("opening_auction", time(9, 50), time(10, 0), 60),
+        TradingPhase("main", time(10, 0), time(18, 40), 30),
+        TradingPhase("closing_auction", time(18, 40), time(18, 50), 30),
+        TradingPhase("evening", time(19, 5), time(23, 50), 300),
+    ],
+    "currency": [
+        TradingPhase("main", time(7, 0), time(19, 0), 15),
+    ],
+    "index": [
+        TradingPhase("main", time(10, 0), time(18, 50), 15),
+        TradingPhase("evening", time(19, 5), time(23, 50), 120),
+    ],
+}
+
+ASSET_ENGINES = {
+    "stock": "stock",
+    "funds": "stock",
+    "bonds": "bonds",
+    "currency": "currency",
+    "indices": "index",
+}
+
+
+class CalendarOverride(NamedTuple):
+    day: date
+    status: str
+    engines: Tuple[str, ...] = ()
+    note: str = ""
+
+    def applies_to(self, engine: str) -> bool:
+        return not self.engines or engine in self.engines
+
+    def to_dict(self) -> Dict:
+        return {"day": self.day.isoformat(), "status": self.status, "engines": list(self.engines), "note": self.note}
+
+
+class TradingCalendar:
+    """
+    Торговые дни: по умолчанию понедельник–пятница, поверх — переопределения из хэша moex:calendar.
+    status=closed — праздник, status=open — торговый выходной (перенос рабочего дня);
+    пустой engines означает все рынки.
+    """
+
+    KEY = "moex:calendar"
+
+    def __init__(self, redis=redis_client):
+        self.redis = redis
+
+    def get(self, day: date) -> Optional[CalendarOverride]:
+        raw = self.redis.hget(self.KEY, day.isoformat())
+        return self._parse(day.isoformat(), raw) if raw else None
+
+    def list(self) -> List[CalendarOverride]:
+        overrides = [self._parse(day, raw) for day, raw in self.redis.hgetall(self.KEY).items()]
+        return sorted(overrides, key=lambda override: override.day)
+
+    def set(self, override: CalendarOverride) -> None:
+        if override.status not in (OPEN, CLOSED):
+            raise ValueError(f"Unknown status: {override.status}")
+        unknown = set(override.engines) - set(ENGINE_SESSIONS)
+        if unknown:
+            raise ValueError(f"Unknown engines: {', '.join(sorted(unknown))}")
+        self.redis.hset(self.KEY, override.day.isoformat(), json.dumps(
+            {"status": override.status, "engines": list(override.engines), "note": override.note},
+            ensure_ascii=False))
+
+    def remove(self, day: date) -> bool:
+        return bool(self.redis.hdel(self.KEY, day.isoformat()))
+
+    def is_trading_day(self, day: date, engine: str) -> bool:
+        override = self.get(day)
+        if override is not None and override.applies_to(engine):
+            return override.status == OPEN
+        return day.weekday() < 5
+
+    @staticmethod
+    def _parse(day: str, raw: str) -> CalendarOverride:
+        value = json.loads(raw)
+        return CalendarOverride(date.fromisoformat(day), value["status"], tuple(value.get("engines") or ()),
+                                value.get("note", ""))
+
+
+class SessionSchedule:
+    def __init__(self, calendar: TradingCalendar, sessions: Dict[str, List[TradingPhase]] = ENGINE_SESSIONS):
+        self.calendar = calendar
+        self.sessions = sessions
+
+    @staticmethod
+    def now() -> datetime:
+        return datetime.now(MOSCOW)
+
+    def engine(self, asset_type: str) -> str:
+        return ASSET_ENGINES.get(asset_type, asset_type)
+
+    def phase(self, asset_type: str, now: Optional[datetime] = None) -> Optional[TradingPhase]:
+        """Текущая фаза торгов рынка asset_type; None — рынок закрыт."""
+        now = (now or self.now()).astimezone(MOSCOW)
+        engine = self.engine(asset_type)
+        if not self.calendar.is_trading_day(now.date(), engine):
+            return None
+        moment = now.time()
+        for phase in self.sessions.get(engine, []):
+            if phase.start <= moment < phase.end:
+                return phase
+        return None
+
+    def next_open(self, asset_type: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Начало ближайшей фазы торгов после now, не дальше LOOKAHEAD_DAYS."""
+        now = (now or self.now()).astimezone(MOSCOW)
+        engine = self.engine(asset_type)
+        phases = self.sessions.get(engine, [])
+        for offset in range(LOOKAHEAD_DAYS + 1):
+            day = now.date() + timedelta(days=offset)
+            if not self.calendar.is_trading_day(day, engine):
+                continue
+            for phase in phases:
+                start = datetime.combine(day, phase.start, MOSCOW)
+                if start > now:
+                    return start
+        return None
+
+    def snapshot_ttl(self, asset_type: str, refresh_ahead: int, now: Optional[datetime] = None) -> int:
+        """
+        TTL снимка в Redis. Во время торгов — интервал фазы плюс запас refresh_ahead, за который лидер
+        обновляет снимок заранее; вне торгов — до ближайшего открытия, чтобы снимок не перезапрашивался впустую.
+        """
+        now = (now or self.now()).astimezone(MOSCOW)
+        phase = self.phase(asset_type, now)
+        if phase is not None:
+            return int(phase.refresh_interval + refresh_ahead)
+        opens_at = self.next_open(asset_type, now)
+        if opens_at is None:
+            return MAX_CLOSED_TTL
+        until_open = int((opens_at - now).total_seconds()) + refresh_ahead
+        return max(MIN_CLOSED_TTL, min(MAX_CLOSED_TTL, until_open))
+
+    def describe(self, asset_type: str, now: Optional[datetime] = None) -> Dict:
+        now = (now or self.now()).astimezone(MOSCOW)
+        phase = self.phase(asset_type, now)
+        opens_at = None if phase is not None else self.next_open(asset_type, now)
+        return {
+            "engine": self.engine(asset_type),
+            "phase": phase.name if phase else CLOSED,
+            "refresh_interval": phase.refresh_interval if phase else None,
+            "next_open": opens_at.isoformat() if opens_at else None,
+        }
@@ -0,0 +1,226 @@
+"""
+Снимки рынка на локальном диске для быстрого холодного старта.
+
+Каждый снимок — один файл <asset_type>.snap в колоночном формате:
+
+    MAGIC (8 байт) | длина заголовка (uint64) | заголовок JSON | выравнивание | секции колонок
+
+На колонку приходятся секции: теги строк (uint8), числа (float64), смещения строк в тексте (int64)
+и сам текст (utf-8). Секции выровнены по 8 байт; числовые колонки читаются из mmap без промежуточных копий,
+а несколько воркеров на одной машине разделяют страницы файла через кэш ОС.
+Запись атомарна: временный файл в том же каталоге, fsync и os.replace.
+"""
+import json
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional
+
+import numpy as np
+
+from ...core.logger import logger
+
+MAGIC = b"MFSNAP01"
+ALIGN = 8
+
+ABSENT, NULL, FLOAT, INT, TEXT, OTHER, TRUE, FALSE = range(8)
+_CONSTANTS = {NULL: None, TRUE: True, FALSE: False}
+_MISSING = object()
+_MAX_EXACT_INT = 2 ** 53
+
+
+class Snapshot(NamedTuple):
+    asset_type: str
+    version: int
+    written_at: float
+    data: List[Dict[str, Any]]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.written_at
+
+
+def _tag(value: Any) -> int:
+    if value is _MISSING:
+        return ABSENT
+    if value is None:
+        return NULL
+    if value is True:
+        return TRUE
+    if value is False:
+        return FALSE
+    if isinstance(value, float):
+        return FLOAT
+    if isinstance(value, int) and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+        return INT
+    if isinstance(value, str):
+        return TEXT
+    return OTHER
+
+
+class _Sections:
+    """Тело файла: секции подряд, каждая выровнена по ALIGN; в заголовок идут [смещение, длина]."""
+
+    def __init__(self):
+        self.body = bytearray()
+
+    def add(self, payload: bytes) -> List[int]:
+        start = len(self.body)
+        self.body += payload
+        self.body += b"\0" * (-len(self.body) % ALIGN)
+        return [start, len(payload)]
+
+
+def _encode_column(sections: _Sections, data: List[Dict[str, Any]], name: str) -> Dict[str, Any]:
+    values = [row.get(name, _MISSING) for row in data]
+    tags = [_tag(value) for value in values]
+    present = set(tags)
+    column: Dict[str, Any] = {
+        "name": name,
+        "uniform": next(iter(present)) if len(present) == 1 else None,
+        "tags": sections.add(np.array(tags, dtype=np.uint8).tobytes()),
+    }
+
+    if present & {FLOAT, INT}:
+        numbers = [value if tag in (FLOAT, INT) else 0.0 for value, tag in zip(values, tags)]
+        column["numbers"] = sections.add(np.array(numbers, dtype=np.float64).tobytes())
+
+    if present & {TEXT, OTHER}:
+        pieces = []
+        offsets = [0]
+        for value, tag in zip(values, tags):
+            if tag == TEXT:
+                pieces.append(value)
+            elif tag == OTHER:
+                pieces.append(json.dumps(value, ensure_ascii=False))
+            else:
+                offsets.append(offsets[-1])
+                continue
+            offsets.append(offsets[-1] + len(pieces[-1]))
+        column["offsets"] = sections.add(np.array(offsets, dtype=np.int64).tobytes())
+        column["text"] = sections.add("".join(pieces).encode("utf-8"))
+    return column
+
+
+def _decode_column(buffer, base: int, rows: int, column: Dict[str, Any]) -> List[Any]:
+    def view(section, dtype):
+        offset, length = section
+        return np.frombuffer(buffer, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=base + offset)
+
+    uniform = column["uniform"]
+    if uniform == ABSENT:
+        return [_MISSING] * rows
+    if uniform in _CONSTANTS:
+        return [_CONSTANTS[uniform]] * rows
+
+    tags = view(column["tags"], np.uint8)
+    values: List[Any] = view(column["numbers"], np.float64).tolist() if "numbers" in column else [None] * rows
+    if uniform == FLOAT:
+        return values
+    if uniform == INT:
+        return [int(value) for value in values]
+
+    if "text" in column:
+        offset, length = column["text"]
+        text = bytes(buffer[base + offset:base + offset + length]).decode("utf-8")
+        bounds = view(column["offsets"], np.int64).tolist()
+        if uniform == TEXT:
+            return [text[bounds[i]:bounds[i + 1]] for i in range(rows)]
+        for i in np.flatnonzero(tags == TEXT).tolist():
+            values[i] = text[bounds[i]:bounds[i + 1]]
+        for i in np.flatnonzero(tags == OTHER).tolist():
+            values[i] = json.loads(text[bounds[i]:bounds[i + 1]])
+
+    for i in np.flatnonzero(tags == INT).tolist():
+        values[i] = int(values[i])
+    for tag, constant in ((NULL, None), (TRUE, True), (FALSE, False), (ABSENT, _MISSING)):
+        for i in np.flatnonzero(tags == tag).tolist():
+            values[i] = constant
+    return values
+
+
+class SnapshotStore:
+    """Каталог с последними снимками по типам активов."""
+
+    def __init__(self, directory: os.PathLike):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._written: Dict[str, int] = {}
+
+    def path(self, asset_type: str) -> Path:
+        return self.directory / f"{asset_type}.snap"
+
+    def write(self, asset_type: str, data: List[Dict[str, Any]], version: int) -> Optional[Path]:
+        """Записывает снимок; более старая версия, чем уже записанная этим процессом, пропускается."""
+        names = list(dict.fromkeys(name for row in data for name in row))
+        sections = _Sections()
+        columns = [_encode_column(sections, data, name) for name in names]
+        header = json.dumps({
+            "asset_type": asset_type,
+            "version": version,
+            "written_at": time.time(),
+            "rows": len(data),
+            "columns": columns,
+        }, ensure_ascii=False).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 8 + len(header)) % ALIGN)
+
+        path = self.path(asset_type)
+        with self._lock:
+            if self._written.get(asset_type, -1) >= version:
+                return None
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, "wb") as file:
+                    file.write(MAGIC)
+                    file.write(len(header).to_bytes(8, "little"))
+                    file.write(header)
+                    file.write(sections.body)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            self._written[asset_type] = version
+        return path
+
+    def read_version(self, asset_type: str) -> Optional[int]:
+        """Версия снимка по заголовку файла, без чтения колонок."""
+        try:
+            with open(self.path(asset_type), "rb") as file:
+                prefix = file.read(len(MAGIC) + 8)
+                if prefix[:len(MAGIC)] != MAGIC:
+                    return None
+                return json.loads(file.read(int.from_bytes(prefix[len(MAGIC):], "little")))["version"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def read(self, asset_type: str) -> Optional[Snapshot]:
+        path = self.path(asset_type)
+        try:
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if buffer[:len(MAGIC)] != MAGIC:
+                    raise ValueError("bad magic")
+                header_length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], "little")
+                base = len(MAGIC) + 8 + header_length
+                header = json.loads(buffer[len(MAGIC) + 8:base])
+                rows = header["rows"]
+                names = [column["name"] for column in header["columns"]]
+                columns = [_decode_column(buffer, base, rows, column) for column in header["columns"]]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Error reading {asset_type} snapshot from {path}: {e}")
+            return None
+
+        if any(value is _MISSING for values in columns for value in values):
+            data = [
+                {name: value for name, value in zip(names, row) if value is not _MISSING}
+                for row in zip(*columns)
+            ]
+        else:
+            data = [dict(zip(names, row)) for row in zip(*columns)]
+        return Snapshot(header["asset_type"], header["version"], header["written_at"], data)
@@ -1,24 +1,55 @@
+import asyncio
 import json
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from ..core import redis_client
 from ..core.logger import logger
+from ..core.timing import span
+from ..core.metrics import PROVIDER_FETCH_DURATION, PROVIDER_FETCHES, PROVIDER_ROWS, record_cache_lookup
 from ..contracts.security import ISecurityService
-from ..contracts.market import IMarketDataProvider
-from ..dto.market import MarketPageData, MarketStocksData
+from ..contracts.market import IMarketDataProvider, ISnapshotListener
+from ..dto.market import MarketPageData, MarketTableData, MarketStocksData, QuoteLookupData
 from ..config import settings
+from .market.fx import FxMatrix
+from .market.resilience import ProviderUnavailable, fetch_with_resilience
+from .market.snapshot_store import Snapshot, SnapshotStore
+from .market.refresh_coordinator import LEADER_WAIT_TIMEOUT, REFRESH_AHEAD
+from .market.schedule import SessionSchedule
+from .market.quotes import QuoteIndex, parse_identifiers, resolve_quotes
 
+LAST_KNOWN_GOOD_TTL = 7 * 24 * 3600
 
 class MarketService:
     def __init__(
         self,
         security_service: ISecurityService,
         data_providers: List[IMarketDataProvider],
+        snapshot_listeners: Optional[List[ISnapshotListener]] = None,
+        snapshot_store: Optional[SnapshotStore] = None,
+        refresh_coordinator=None,
+        schedule: Optional[SessionSchedule] = None,
     ):
         self.security_service = security_service
         self.data_providers = data_providers
+        self.snapshot_listeners = snapshot_listeners or []
+        self.snapshot_store = snapshot_store
+        self.refresh_coordinator = refresh_coordinator
+        self.schedule = schedule
         self.cache_ttl = 300
+        self.negative_cache_ttl = 30
+        self._snapshots: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+        self._fx_matrices: Dict[str, FxMatrix] = {}
+        self._quote_indexes: Dict[str, Tuple[List[Dict[str, Any]], QuoteIndex]] = {}
+        self._refreshes: Dict[str, asyncio.Task] = {}
+        self._background_tasks = set()
+
+    async def close(self) -> None:
+        tasks = self._background_tasks | set(self._refreshes.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
     async def get_cached_data(self, asset_type: str) -> List[Dict[str, Any]]:
         provider = self._get_provider(asset_type)
@@ -28,23 +59,355 @@ class MarketService:
 
         cache_key = provider.get_cache_key()
         try:
-            cached_data = redis_client.get(cache_key)
+            local = self._snapshots.get(asset_type)
+            with span("redis"):
+                version, exists = (
+                    redis_client.pipeline().get(self.get_version_key(asset_type)).exists(cache_key).execute()
+                )
+            if exists and local is not None and local[0] == version:
+                record_cache_lookup("market_snapshot", asset_type, "local")
+                return local[1]
+            with span("redis"):
+                cached_data = redis_client.get(cache_key) if exists else None
             if cached_data:
-                data = json.loads(cached_data)
+                started = time.perf_counter()
+                with span("json"):
+                    data = json.loads(cached_data)
+                record_cache_lookup("market_snapshot", asset_type, "hit", time.perf_counter() - started)
                 logger.info(f"Loaded {len(data)} {asset_type} from cache")
+                if version is not None:
+                    self._snapshots[asset_type] = (version, data)
                 return data
+            record_cache_lookup("market_snapshot", asset_type, "miss")
         except Exception as e:
+            record_cache_lookup("market_snapshot", asset_type, "error")
             logger.error(f"Error reading {asset_type} from cache: {e}")
 
-        data = await provider.fetch_data()
+        snapshot = self._load_disk_snapshot(provider)
+        if snapshot is not None:
+            self._refresh_in_background(provider)
+            return snapshot.data
+
+        if self.refresh_coordinator is not None and not self.refresh_coordinator.try_lead(asset_type):
+            data = await self._wait_for_leader(provider)
+            return data if data is not None else self._serve_last_known_good(provider)
+
+        return await self.refresh_snapshot(provider)
+
+    async def refresh_snapshot(self, provider: IMarketDataProvider) -> List[Dict[str, Any]]:
+        """Свежий снимок из ISS в Redis и на диск; при недоступности ISS — последний удачный снимок."""
         try:
-            redis_client.setex(cache_key, self.cache_ttl, json.dumps(data))
-            logger.info(f"Cached {len(data)} {asset_type} for {self.cache_ttl} seconds")
+            return await self._join_refresh(provider)
+        except ProviderUnavailable as e:
+            logger.error(f"MOEX unavailable for {provider.get_asset_type()}: {e}")
+            return self._serve_last_known_good(provider)
+
+    async def _join_refresh(self, provider: IMarketDataProvider) -> List[Dict[str, Any]]:
+        """
+        Не больше одного обновления типа активов в процессе: промах кэша, прогрев, цикл лидера
+        и ручное обновление ждут одну и ту же задачу. Отмена ожидающего не отменяет само обновление.
+        """
+        asset_type = provider.get_asset_type()
+        task = self._refreshes.get(asset_type)
+        if task is None:
+            task = self._refreshes[asset_type] = asyncio.create_task(self._refresh(provider))
+            task.add_done_callback(lambda done: self._refresh_done(asset_type, done))
+        return await asyncio.shield(task)
+
+    def _refresh_done(self, asset_type: str, task: asyncio.Task) -> None:
+        if self._refreshes.get(asset_type) is task:
+            del self._refreshes[asset_type]
+        if not task.cancelled():
+            task.exception()
+
+    async def _refresh(self, provider: IMarketDataProvider) -> List[Dict[str, Any]]:
+        asset_type = provider.get_asset_type()
+        data = await self._fetch(provider)
+        try:
+            self._store_snapshot(provider, data)
+            logger.info(f"Cached {len(data)} {asset_type} for {self.snapshot_ttl(asset_type)} seconds")
         except Exception as e:
             logger.error(f"Error caching {asset_type}: {e}")
+        self._publish_snapshot(asset_type, data)
+        return data
 
+    async def _wait_for_leader(self, provider: IMarketDataProvider) -> Optional[List[Dict[str, Any]]]:
+        """
+        Снимок обновляет другой процесс: ждём его события или появления ключа в Redis,
+        не дольше LEADER_WAIT_TIMEOUT. None — лидер не успел.
+        """
+        asset_type = provider.get_asset_type()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LEADER_WAIT_TIMEOUT
+        with span("leader"):
+            while True:
+                try:
+                    cached = redis_client.get(provider.get_cache_key())
+                    if cached:
+                        return json.loads(cached)
+                except Exception as e:
+                    logger.error(f"Error reading {asset_type} from cache: {e}")
+                    return None
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    logger.warning(f"Timed out waiting for the {asset_type} refresh leader")
+                    return None
+                await self.refresh_coordinator.wait_for_snapshot(asset_type, min(1.0, remaining))
+
+    @staticmethod
+    async def _fetch(provider: IMarketDataProvider) -> List[Dict[str, Any]]:
+        """Свежие данные провайдера; ProviderUnavailable, если ISS не ответил или цепь разомкнута."""
+        asset_type = provider.get_asset_type()
+        started = time.perf_counter()
+        try:
+            with span("moex"):
+                data = await fetch_with_resilience(
+                    provider, settings.MOEX_FETCH_TIMEOUT, settings.MOEX_FETCH_RETRIES)
+        except ProviderUnavailable:
+            PROVIDER_FETCHES.labels(asset_type, "unavailable").inc()
+            raise
+        except Exception:
+            PROVIDER_FETCHES.labels(asset_type, "error").inc()
+            raise
+        finally:
+            PROVIDER_FETCH_DURATION.labels(asset_type).observe(time.perf_counter() - started)
+        PROVIDER_FETCHES.labels(asset_type, "ok").inc()
+        PROVIDER_ROWS.labels(asset_type).set(len(data))
         return data
 
+    @staticmethod
+    def get_last_known_good_key(cache_key: str) -> str:
+        return f"{cache_key}:lkg"
+
+    def _serve_last_known_good(self, provider: IMarketDataProvider) -> List[Dict[str, Any]]:
+        """
+        Последний удачный снимок вместо свежих данных, пока ISS недоступен.
+        Снимок (или пустой список, если его нет) кладётся в основной ключ на negative_cache_ttl,
+        чтобы следующие запросы не ждали повторов и предохранителя. Пока запасная копия лежит в ключе,
+        повторные неудачи отдают её, ничего не переписывая: версия снимка не меняется, статус помечается stale,
+        а событие уходит только тому, кто копию записал.
+        """
+        asset_type = provider.get_asset_type()
+        cache_key = provider.get_cache_key()
+        data: List[Dict[str, Any]] = []
+        written = False
+        try:
+            current = redis_client.get(cache_key)
+            if current:
+                record_cache_lookup("market_snapshot", asset_type, "stale")
+                return json.loads(current)
+            cached = redis_client.get(self.get_last_known_good_key(cache_key))
+            if cached:
+                data = json.loads(cached)
+                record_cache_lookup("market_snapshot", asset_type, "stale")
+                logger.warning(f"Serving last known good {asset_type} snapshot ({len(data)} rows)")
+            written = bool(redis_client.set(cache_key, cached or json.dumps(data), ex=self.negative_cache_ttl, nx=True))
+            if written:
+                redis_client.hset(self.get_status_key(asset_type), "stale", 1)
+        except Exception as e:
+            logger.error(f"Error reading last known good {asset_type}: {e}")
+        if written:
+            self._announce_snapshot(asset_type, None)
+        return data
+
+    @staticmethod
+    def get_version_key(asset_type: str) -> str:
+        return f"moex:version:{asset_type}"
+
+    @staticmethod
+    def get_status_key(asset_type: str) -> str:
+        return f"moex:snapshot:{asset_type}"
+
+    def snapshot_status(self) -> Dict[str, Dict[str, Any]]:
+        """Возраст, размер и TTL текущего снимка каждого типа активов — для проверок готовности."""
+        pipe = redis_client.pipeline()
+        for provider in self.data_providers:
+            pipe.hgetall(self.get_status_key(provider.get_asset_type()))
+            pipe.ttl(provider.get_cache_key())
+        replies = pipe.execute()
+        now = time.time()
+        status = {}
+        for index, provider in enumerate(self.data_providers):
+            asset_type = provider.get_asset_type()
+            info, ttl = replies[2 * index], replies[2 * index + 1]
+            updated_at = float(info["updated_at"]) if info.get("updated_at") else None
+            local = self._snapshots.get(asset_type)
+            status[asset_type] = {
+                "cached": ttl != -2,
+                "ttl": ttl if ttl >= 0 else None,
+                "rows": int(info["rows"]) if info.get("rows") else None,
+                "version": info.get("version"),
+                "updated_at": datetime.fromtimestamp(updated_at).isoformat() if updated_at else None,
+                "age": round(now - updated_at, 1) if updated_at else None,
+                "local_version": local[0] if local else None,
+                "stale": info.get("stale") == "1",
+            }
+        return status
+
+    def snapshot_ttl(self, asset_type: str) -> int:
+        """TTL снимка: по расписанию торгов, если оно задано, иначе фиксированный cache_ttl."""
+        if self.schedule is None:
+            return self.cache_ttl
+        try:
+            return self.schedule.snapshot_ttl(asset_type, REFRESH_AHEAD)
+        except Exception as e:
+            logger.error(f"Error computing {asset_type} snapshot TTL from the trading schedule: {e}")
+            return self.cache_ttl
+
+    def apply_schedule(self) -> None:
+        """После правки календаря укорачивает TTL снимков, рассчитанные по прежнему расписанию."""
+        for provider in self.data_providers:
+            ttl = self.snapshot_ttl(provider.get_asset_type())
+            try:
+                if redis_client.ttl(provider.get_cache_key()) > ttl:
+                    redis_client.expire(provider.get_cache_key(), ttl)
+            except Exception as e:
+                logger.error(f"Error applying schedule to {provider.get_asset_type()} snapshot: {e}")
+
+    def _store_snapshot(self, provider: IMarketDataProvider, data: List[Dict[str, Any]]) -> None:
+        ttl = self.snapshot_ttl(provider.get_asset_type())
+        payload = json.dumps(data)
+        pipe = redis_client.pipeline()
+        pipe.setex(provider.get_cache_key(), ttl, payload)
+        pipe.setex(self.get_last_known_good_key(provider.get_cache_key()), LAST_KNOWN_GOOD_TTL, payload)
+        get_extras = getattr(provider, 'get_snapshot_extras', None)
+        if get_extras:
+            for suffix, extra in get_extras(data).items():
+                pipe.setex(f"{provider.get_cache_key()}:{suffix}", ttl, json.dumps(extra))
+        pipe.incr(self.get_version_key(provider.get_asset_type()))
+        version = pipe.execute()[-1]
+        redis_client.hset(self.get_status_key(provider.get_asset_type()), mapping={
+            "version": version, "rows": len(data), "updated_at": time.time(), "stale": 0,
+        })
+        self._snapshots[provider.get_asset_type()] = (str(version), data)
+        self._persist_snapshot(provider.get_asset_type(), data, version)
+        self._announce_snapshot(provider.get_asset_type(), version)
+
+    def _announce_snapshot(self, asset_type: str, version: Optional[int]) -> None:
+        if self.refresh_coordinator is not None:
+            self.refresh_coordinator.publish_snapshot(asset_type, version)
+
+    def _persist_snapshot(self, asset_type: str, data: List[Dict[str, Any]], version: int) -> None:
+        if self.snapshot_store is None:
+            return
+        self._spawn(asyncio.to_thread(self._write_disk_snapshot, asset_type, data, version))
+
+    def _write_disk_snapshot(self, asset_type: str, data: List[Dict[str, Any]], version: int) -> None:
+        try:
+            self.snapshot_store.write(asset_type, data, version)
+        except Exception as e:
+            logger.error(f"Error writing {asset_type} snapshot to disk: {e}")
+
+    async def sync_disk_snapshot(self, provider: IMarketDataProvider, version: int) -> None:
+        """Снимок обновил другой процесс: переписываем локальный файл, если он старше версии из события."""
+        if self.snapshot_store is None:
+            return
+        asset_type = provider.get_asset_type()
+        try:
+            local_version = await asyncio.to_thread(self.snapshot_store.read_version, asset_type)
+            if local_version is not None and local_version >= version:
+                return
+            cached = redis_client.get(provider.get_cache_key())
+            if cached:
+                await asyncio.to_thread(self._write_disk_snapshot, asset_type, json.loads(cached), version)
+        except Exception as e:
+            logger.error(f"Error syncing {asset_type} snapshot to disk: {e}")
+
+    def _load_disk_snapshot(self, provider: IMarketDataProvider) -> Optional[Snapshot]:
+        """
+        Снимок с диска при промахе Redis: отдаётся как устаревший и кладётся в Redis на negative_cache_ttl,
+        пока фоновое обновление не запишет свежие данные.
+        """
+        if self.snapshot_store is None:
+            return None
+        asset_type = provider.get_asset_type()
+        with span("disk"):
+            snapshot = self.snapshot_store.read(asset_type)
+        if snapshot is None or not snapshot.data or snapshot.age > LAST_KNOWN_GOOD_TTL:
+            return None
+
+        record_cache_lookup("market_snapshot", asset_type, "stale")
+        logger.info(f"Loaded {len(snapshot.data)} {asset_type} from disk snapshot "
+                    f"v{snapshot.version}, {snapshot.age:.0f}s old")
+        try:
+            payload = json.dumps(snapshot.data)
+            pipe = redis_client.pipeline()
+            pipe.setex(provider.get_cache_key(), self.negative_cache_ttl, payload)
+            pipe.set(self.get_last_known_good_key(provider.get_cache_key()), payload, ex=LAST_KNOWN_GOOD_TTL, nx=True)
+            pipe.set(self.get_version_key(asset_type), snapshot.version, nx=True)
+            pipe.hsetnx(self.get_status_key(asset_type), "updated_at", snapshot.written_at)
+            pipe.hsetnx(self.get_status_key(asset_type), "rows", len(snapshot.data))
+            pipe.hsetnx(self.get_status_key(asset_type), "version", snapshot.version)
+            pipe.hset(self.get_status_key(asset_type), "stale", 1)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error restoring {asset_type} snapshot to cache: {e}")
+        return snapshot
+
+    def _refresh_in_background(self, provider: IMarketDataProvider) -> None:
+        asset_type = provider.get_asset_type()
+        if asset_type in self._refreshes:
+            return
+        if self.refresh_coordinator is not None and not self.refresh_coordinator.try_lead(asset_type):
+            return
+        self._spawn(self._refresh_snapshot(provider))
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _refresh_snapshot(self, provider: IMarketDataProvider) -> None:
+        asset_type = provider.get_asset_type()
+        try:
+            await self.refresh_snapshot(provider)
+        except Exception as e:
+            logger.error(f"Background refresh of {asset_type} failed: {e}")
+
+    async def warm_up(self) -> None:
+        """Заполняет кэш всех типов активов при старте: с диска, если есть снимок, иначе из ISS."""
+        for provider in self.data_providers:
+            try:
+                await self.get_cached_data(provider.get_asset_type())
+            except Exception as e:
+                logger.error(f"Warm-up of {provider.get_asset_type()} failed: {e}")
+
+    async def get_fx_matrix(self, currency_version: Optional[str] = None) -> FxMatrix:
+        """
+        Матрица курсов для снимка валют.
+        Матрица строится один раз при обновлении валют и хранится рядом со снимком;
+        в процессе она запоминается по версии снимка, так что повторные запросы не обращаются к Redis.
+        """
+        if currency_version is not None and currency_version in self._fx_matrices:
+            return self._fx_matrices[currency_version]
+
+        matrix = None
+        provider = self._get_provider("currency")
+        try:
+            cached = redis_client.get(f"{provider.get_cache_key()}:fx") if provider else None
+            if cached:
+                matrix = FxMatrix.from_dict(json.loads(cached))
+        except Exception as e:
+            logger.error(f"Error reading FX matrix from cache: {e}")
+        if matrix is None:
+            matrix = FxMatrix.from_quotes(await self.get_cached_data("currency"))
+
+        if currency_version is not None:
+            self._fx_matrices.clear()
+            self._fx_matrices[currency_version] = matrix
+        return matrix
+
+    def _publish_snapshot(self, asset_type: str, data: List[Dict[str, Any]]) -> None:
+        for listener in self.snapshot_listeners:
+            self._spawn(self._notify_listener(listener, asset_type, data))
+
+    @staticmethod
+    async def _notify_listener(listener: ISnapshotListener, asset_type: str, data: List[Dict[str, Any]]) -> None:
+        try:
+            await listener.on_snapshot(asset_type, data)
+        except Exception as e:
+            logger.error(f"Snapshot listener {type(listener).__name__} failed for {asset_type}: {e}")
+
     async def get_all_cached_data(self) -> Dict[str, List[Dict[str, Any]]]:
         result = {}
         for provider in self.data_providers:
@@ -86,6 +449,13 @@ class MarketService:
             "volume": lambda x: float(x.get('volume', 0)),
             "yield": lambda x: float(x.get('yield', 0)),
             "coupon_value": lambda x: float(x.get('coupon_value', 0)),
+            "maturity_date": lambda x: x.get('maturity_date') or '',
+            "ytm": lambda x: float(x.get('ytm', 0)),
+            "accrued_interest": lambda x: float(x.get('accrued_interest', 0)),
+            "dirty_price": lambda x: float(x.get('dirty_price', 0)),
+            "duration": lambda x: float(x.get('macaulay_duration', 0)),
+            "modified_duration": lambda x: float(x.get('modified_duration', 0)),
+            "convexity": lambda x: float(x.get('convexity', 0)),
         }
         key_func = sort_key_map.get(sort_by, sort_key_map["name"])
         return sorted(data, key=key_func, reverse=reverse)
@@ -107,22 +477,32 @@ class MarketService:
         request,
         current_user: Any,
         asset_type: str = "stock",
+    ) -> Optional[MarketPageData]:
+        """Пользовательская часть страницы рынка; таблица инструментов рендерится отдельно."""
+        if not current_user:
+            return None
+        csrf_token = await self.security_service.get_csrf_token(request)
+        return MarketPageData(
+            user=current_user,
+            csrf_token=csrf_token,
+            asset_type=asset_type,
+        )
+
+    async def get_market_table(
+        self,
+        asset_type: str = "stock",
         search: str = "",
         sort_by: str = "name",
         sort_order: str = "asc",
         page: int = 1,
         page_size: int = 50,
-    ) -> Optional[MarketPageData]:
-        if not current_user:
-            return None
-        csrf_token = await self.security_service.get_csrf_token(request)
+    ) -> MarketTableData:
         all_data = await self.get_cached_data(asset_type)
         filtered_and_sorted = self._filter_data(all_data, search)
         sorted_data = self._sort_data(filtered_and_sorted, sort_by, sort_order)
         paginated = self._paginate(sorted_data, page, page_size)
-        return MarketPageData(
-            user=current_user,
-            csrf_token=csrf_token,
+        return MarketTableData(
+            asset_type=asset_type,
             stocks=paginated.items,
             search_query=search,
             sort_by=sort_by,
@@ -160,19 +540,59 @@ class MarketService:
             filters={"search": search, "sort_by": sort_by, "sort_order": sort_order, "asset_type": asset_type},
         )
 
+    async def get_quote_index(self, asset_type: str) -> QuoteIndex:
+        """Индекс по тикеру и ISIN; перестраивается, только когда get_cached_data отдаёт новый снимок."""
+        data = await self.get_cached_data(asset_type)
+        cached = self._quote_indexes.get(asset_type)
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        index = QuoteIndex(asset_type, data)
+        self._quote_indexes[asset_type] = (data, index)
+        return index
+
+    async def get_quotes(self, identifiers: List[str], asset_types: Optional[List[str]] = None) -> QuoteLookupData:
+        """
+        Котировки по списку тикеров и ISIN за один проход по снимкам.
+        asset_types ограничивает типы для неуточнённых идентификаторов; ValueError — некорректный запрос.
+        """
+        known = [provider.get_asset_type() for provider in self.data_providers]
+        requests = parse_identifiers(identifiers, known)
+        search_types = [asset_type for asset_type in known if not asset_types or asset_type in asset_types]
+        needed = set(request.asset_type for request in requests if request.asset_type)
+        if any(request.asset_type is None for request in requests):
+            needed.update(search_types)
+        indexes = [
+            (asset_type, await self.get_quote_index(asset_type))
+            for asset_type in known if asset_type in needed
+        ]
+        unqualified = [(asset_type, index) for asset_type, index in indexes if asset_type in search_types]
+        quotes, missing = resolve_quotes(requests, indexes, unqualified)
+        return QuoteLookupData(quotes=quotes, missing=missing)
+
     async def refresh_cache(self, asset_type: str = "stock") -> Dict[str, Any]:
         provider = self._get_provider(asset_type)
         if not provider:
             return {"success": False, "message": f"Invalid asset type: {asset_type}"}
+        if self.refresh_coordinator is not None and not self.refresh_coordinator.try_lead(asset_type):
+            try:
+                self.refresh_coordinator.request_refresh(asset_type)
+            except Exception as e:
+                logger.error(f"Error requesting {asset_type} refresh: {e}")
+                return {"success": False, "message": f"Error refreshing {asset_type} cache: {str(e)}"}
+            return {
+                "success": True,
+                "message": f"{asset_type.capitalize()} refresh requested from the refresh leader",
+            }
         try:
-            data = await provider.fetch_data()
-            cache_key = provider.get_cache_key()
-            redis_client.setex(cache_key, self.cache_ttl, json.dumps(data))
+            refresh = self._join_refresh(provider)
+            if self.refresh_coordinator is not None:
+                refresh = self.refresh_coordinator.hold_lease(asset_type, refresh)
+            data = await refresh
             return {
                 "success": True,
                 "message": f"{asset_type.capitalize()} cache refreshed successfully",
                 "count": len(data),
-                "cached_until": (datetime.now() + timedelta(seconds=self.cache_ttl)).isoformat(),
+                "cached_until": (datetime.now() + timedelta(seconds=self.snapshot_ttl(asset_type))).isoformat(),
             }
         except Exception as e:
             logger.error(f"Error refreshing {asset_type} cache: {e}")
@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+from typing import List, Dict, Any, Optional
+
+MAX_IMPORT_ROWS = 5000
+
+COLUMN_ALIASES = {
+    'ticker': ('ticker', 'secid', 'symbol', 'code', 'тикер', 'код'),
+    'isin': ('isin',),
+    'asset_type': ('asset_type', 'type', 'class', 'тип'),
+    'quantity': ('quantity', 'qty', 'amount', 'count', 'количество', 'кол-во'),
+    'average_price': ('average_price', 'avg_price', 'price', 'cost', 'средняя цена', 'цена'),
+    'notes': ('notes', 'note', 'comment', 'примечание', 'комментарий'),
+}
+
+ASSET_TYPE_ALIASES = {
+    'stock': 'stock', 'stocks': 'stock', 'share': 'stock', 'shares': 'stock', 'акция': 'stock', 'акции': 'stock',
+    'bond': 'bond', 'bonds': 'bond', 'облигация': 'bond', 'облигации': 'bond',
+    'fund': 'fund', 'funds': 'fund', 'etf': 'fund', 'фонд': 'fund', 'фонды': 'fund',
+    'currency': 'currency', 'fx': 'currency', 'валюта': 'currency',
+    'index': 'index', 'indices': 'index', 'индекс': 'index',
+}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def _normalize_header(name: Any) -> Optional[str]:
+    key = str(name or '').strip().lower()
+    for field, aliases in COLUMN_ALIASES.items():
+        if key in aliases:
+            return field
+    return None
+
+
+def _normalize_row(raw: Dict[str, Any]) -> Dict[str, Any]:
+    row = {}
+    for key, value in raw.items():
+        field = _normalize_header(key)
+        if field and field not in row:
+            row[field] = value.strip() if isinstance(value, str) else value
+    return row
+
+
+def parse_number(value: Any) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace('\u00a0', '').replace(' ', '')
+    if ',' in text and '.' not in text:
+        text = text.replace(',', '.')
+    else:
+        text = text.replace(',', '')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def normalize_asset_type(value: Any) -> Optional[str]:
+    if not value:
+        return None
+    return ASSET_TYPE_ALIASES.get(str(value).strip().lower())
+
+
+def _parse_csv(text: str) -> List[Dict[str, Any]]:
+    sample = text[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    if not reader.fieldnames or not any(_normalize_header(name) == 'ticker' or _normalize_header(name) == 'isin'
+                                        for name in reader.fieldnames):
+        raise ImportFormatError("CSV должен содержать колонку с тикером или ISIN")
+    return [_normalize_row(raw) for raw in reader]
+
+
+def _parse_json(text: str) -> List[Dict[str, Any]]:
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ImportFormatError(f"Некорректный JSON: {e.msg}")
+
+    if isinstance(payload, dict):
+        for key in ('positions', 'items', 'portfolio', 'securities'):
+            if key in payload:
+                payload = payload[key]
+                break
+
+    if isinstance(payload, dict) and 'columns' in payload and 'data' in payload:
+        columns, data = payload['columns'], payload['data']
+        if not isinstance(columns, list) or not all(isinstance(name, str) for name in columns):
+            raise ImportFormatError("columns должен быть списком названий колонок")
+        if not isinstance(data, list) or not all(isinstance(values, list) for values in data):
+            raise ImportFormatError("data должен быть списком строк-списков")
+        return [_normalize_row(dict(zip(columns, values))) for values in data]
+
+    if not isinstance(payload, list) or not all(isinstance(item, dict) for item in payload):
+        raise ImportFormatError("JSON должен содержать список позиций")
+    return [_normalize_row(item) for item in payload]
+
+
+def parse_import_payload(content: bytes, filename: str = "", content_type: str = "") -> List[Dict[str, Any]]:
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = content.decode('cp1251')
+
+    stripped = text.lstrip()
+    is_json = (
+        filename.lower().endswith('.json')
+        or 'json' in (content_type or '').lower()
+        or stripped[:1] in ('[', '{')
+    )
+    rows = _parse_json(text) if is_json else _parse_csv(text)
+
+    if not rows:
+        raise ImportFormatError("Файл не содержит позиций")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise ImportFormatError(f"Слишком много позиций: максимум {MAX_IMPORT_ROWS}")
+    return rows
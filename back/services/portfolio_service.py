@@ -1,9 +1,33 @@
-from typing import List, Dict, Any, Optional
+import json
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from ..core import redis_client
 from ..database.repositories.portfolio_repository import PortfolioRepository
 from ..services.market_service import MarketService
 from ..contracts.security import ISecurityService
-from ..dto.portfolio import PortfolioPageData, PortfolioStats
+from ..dto.portfolio import PortfolioPageData, PortfolioStats, ImportRowResult, ImportResult
 from ..core.logger import logger
+from ..core.metrics import record_cache_lookup
+from ..core.timing import span
+from .portfolio_import import parse_number, normalize_asset_type
+from .market.fx import FxMatrix, BASE_CURRENCY, normalize_currency, parse_pair
+
+MARKET_ASSET_TYPES = {
+    'stock': 'stock',
+    'bond': 'bonds',
+    'fund': 'funds',
+    'currency': 'currency',
+}
+
+VALUATION_CACHE_TTL = 86400
+
+CURRENCY_SYMBOLS = {
+    'RUB': '₽',
+    'USD': '$',
+    'EUR': '€',
+    'CNY': '¥',
+    'GBP': '£',
+}
 
 class PortfolioService:
     def __init__(
@@ -16,20 +40,14 @@ class PortfolioService:
         self.portfolio_repo = portfolio_repo
         self.market_service = market_service
     
-    async def get_portfolio_page_data(self, request, current_user) -> Optional[PortfolioPageData]:
+    async def get_portfolio_page_data(self, request, current_user,
+                                      base_currency: str = BASE_CURRENCY) -> Optional[PortfolioPageData]:
         if not current_user:
             return None
         
         csrf_token = await self.security_service.get_csrf_token(request)
         
-        
-        portfolio_items = self.portfolio_repo.get_user_portfolio(current_user.id)
-        
-        
-        enriched_items = await self._enrich_portfolio_items(portfolio_items)
-        
-        
-        portfolio_summary = await self._calculate_portfolio_summary(enriched_items)
+        enriched_items, portfolio_summary = await self.get_portfolio_valuation(current_user.id, base_currency)
         
         return PortfolioPageData(
             user=current_user,
@@ -38,44 +56,132 @@ class PortfolioService:
             portfolio_summary=portfolio_summary
         )
     
-    async def _enrich_portfolio_items(self, portfolio_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def get_portfolio_summary(self, current_user,
+                                    base_currency: str = BASE_CURRENCY) -> Optional[Dict[str, Any]]:
+        if not current_user:
+            return None
+        _, portfolio_summary = await self.get_portfolio_valuation(current_user.id, base_currency)
+        return portfolio_summary
+    
+    @staticmethod
+    def portfolio_version_key(user_id: int) -> str:
+        return f"portfolio:version:{user_id}"
+    
+    @staticmethod
+    def _valuation_key(user_id: int, base_currency: str = BASE_CURRENCY) -> str:
+        return f"portfolio:valuation:{user_id}:{base_currency}"
+    
+    def _bump_portfolio_version(self, user_id: int) -> None:
+        try:
+            redis_client.incr(self.portfolio_version_key(user_id))
+        except Exception as e:
+            logger.error(f"Redis error bumping portfolio version for user {user_id}: {e}")
+            try:
+                stale = list(redis_client.scan_iter(f"portfolio:valuation:{user_id}:*"))
+                if stale:
+                    redis_client.delete(*stale)
+            except Exception:
+                pass
+    
+    @staticmethod
+    def _valuation_fingerprint(portfolio_version: Optional[str], market_versions: Dict[str, Optional[str]],
+                               asset_types: List[str]) -> str:
+        parts = [f"p{portfolio_version or 0}"]
+        parts.extend(f"{t}{market_versions.get(t) or 0}" for t in sorted(asset_types))
+        return ":".join(parts)
+    
+    async def get_portfolio_valuation(self, user_id: int,
+                                      base_currency: str = BASE_CURRENCY) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Оценка портфеля в выбранной базовой валюте с кэшированием в Redis.
+        Кэш действителен, пока не изменились позиции пользователя и снимки рынка по его классам активов
+        (включая валюты, если понадобился пересчёт).
+        """
+        base_currency = normalize_currency(base_currency)
+        market_types = sorted(set(MARKET_ASSET_TYPES.values()))
+        keys = [self.portfolio_version_key(user_id), self._valuation_key(user_id, base_currency)]
+        keys.extend(self.market_service.get_version_key(t) for t in market_types)
+        
+        portfolio_version = None
+        market_versions: Dict[str, Optional[str]] = {}
+        try:
+            with span('redis'):
+                values = redis_client.mget(keys)
+            portfolio_version, cached = values[0], values[1]
+            market_versions = dict(zip(market_types, values[2:]))
+            if cached:
+                with span('json'):
+                    valuation = json.loads(cached)
+                fingerprint = self._valuation_fingerprint(portfolio_version, market_versions, valuation['asset_types'])
+                if valuation['fingerprint'] == fingerprint:
+                    record_cache_lookup('portfolio_valuation', '-', 'hit')
+                    return valuation['items'], valuation['summary']
+                record_cache_lookup('portfolio_valuation', '-', 'stale')
+            else:
+                record_cache_lookup('portfolio_valuation', '-', 'miss')
+        except Exception as e:
+            record_cache_lookup('portfolio_valuation', '-', 'error')
+            logger.error(f"Error reading portfolio valuation for user {user_id}: {e}")
+        
+        fx = await self.market_service.get_fx_matrix(market_versions.get('currency'))
+        if not fx.supports(base_currency):
+            raise ValueError(f"Unsupported base currency: {base_currency}")
+        
+        portfolio_items = self.portfolio_repo.get_user_portfolio(user_id)
+        with span('enrich'):
+            enriched_items = await self._enrich_portfolio_items(portfolio_items, fx, base_currency)
+            portfolio_summary = await self._calculate_portfolio_summary(enriched_items)
+        portfolio_summary['base_currency'] = base_currency
+        portfolio_summary['currency_symbol'] = CURRENCY_SYMBOLS.get(base_currency, base_currency)
+        
+        asset_types = {
+            MARKET_ASSET_TYPES[item['asset_type']]
+            for item in portfolio_items
+            if item['asset_type'] in MARKET_ASSET_TYPES
+        }
+        if any(item.get('currency', base_currency) != base_currency for item in enriched_items):
+            asset_types.add('currency')
+        asset_types = sorted(asset_types)
+        try:
+            redis_client.setex(
+                self._valuation_key(user_id, base_currency),
+                VALUATION_CACHE_TTL,
+                json.dumps({
+                    'fingerprint': self._valuation_fingerprint(portfolio_version, market_versions, asset_types),
+                    'asset_types': asset_types,
+                    'items': enriched_items,
+                    'summary': portfolio_summary,
+                }),
+            )
+        except Exception as e:
+            logger.error(f"Error caching portfolio valuation for user {user_id}: {e}")
+        
+        return enriched_items, portfolio_summary
+    
+    @staticmethod
+    def _instrument_currency(item: Dict[str, Any], market_data: Dict[str, Any]) -> str:
+        if item['asset_type'] == 'currency':
+            pair = parse_pair(market_data)
+            if pair:
+                return pair[1]
+        return normalize_currency(market_data.get('currency'))
+    
+    async def _enrich_portfolio_items(self, portfolio_items: List[Dict[str, Any]], fx: FxMatrix,
+                                      base_currency: str = BASE_CURRENCY) -> List[Dict[str, Any]]:
         enriched_items = []
+        priced: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        market_indexes: Dict[str, Dict[str, Dict[str, Any]]] = {}
         
         for item in portfolio_items:
             try:
+                market_type = MARKET_ASSET_TYPES.get(item['asset_type'], item['asset_type'])
+                if market_type not in market_indexes:
+                    market_data = await self.market_service.get_cached_data(market_type)
+                    market_indexes[market_type] = {stock['ticker']: stock for stock in market_data}
                 
-                market_data = await self.market_service.get_cached_data(item['asset_type'])
-                
-                
-                current_data = next(
-                    (stock for stock in market_data if stock['ticker'] == item['ticker']),
-                    None
-                )
-                
+                current_data = market_indexes[market_type].get(item['ticker'])
                 if current_data:
-                    current_price = current_data.get('price', 0)
-                    current_change = current_data.get('change', 0)
-                    current_change_percent = current_data.get('change_percent', 0)
-                    
-                    
-                    purchase_value = item['quantity'] * item['average_price']
-                    current_value = item['quantity'] * current_price
-                    total_change = current_value - purchase_value
-                    total_change_percent = (total_change / purchase_value * 100) if purchase_value > 0 else 0
-                    
-                    enriched_item = {
-                        **item,
-                        'current_price': current_price,
-                        'current_change': current_change,
-                        'current_change_percent': current_change_percent,
-                        'purchase_value': purchase_value,
-                        'current_value': current_value,
-                        'total_change': total_change,
-                        'total_change_percent': total_change_percent,
-                        'name': current_data.get('name', item['ticker']),
-                        'asset_type_display': self._get_asset_type_display(item['asset_type'])
-                    }
-                    enriched_items.append(enriched_item)
+                    priced.append((item, current_data))
                     
             except Exception as e:
                 logger.error(f"Error enriching portfolio item {item['ticker']}: {e}")
@@ -90,6 +196,43 @@ class PortfolioService:
                     'asset_type_display': self._get_asset_type_display(item['asset_type'])
                 })
         
+        if not priced:
+            return enriched_items
+        
+        currencies = [self._instrument_currency(item, data) for item, data in priced]
+        quantities = np.array([item['quantity'] for item, _ in priced], dtype=float)
+        average_prices = np.array([item['average_price'] for item, _ in priced], dtype=float)
+        current_prices = np.array([data.get('price') or 0 for _, data in priced], dtype=float)
+        
+        rates = fx.conversion_factors(currencies, base_currency)
+        missing_rate = np.isnan(rates)
+        if missing_rate.any():
+            logger.warning(f"No FX rate to {base_currency} for {sorted({c for c, m in zip(currencies, missing_rate) if m})}")
+        rates = np.where(missing_rate, 0.0, rates)
+        
+        purchase_values = quantities * average_prices * rates
+        current_values = quantities * current_prices * rates
+        total_changes = current_values - purchase_values
+        with np.errstate(invalid='ignore', divide='ignore'):
+            total_change_percents = np.where(purchase_values > 0, total_changes / purchase_values * 100, 0.0)
+        
+        for i, (item, current_data) in enumerate(priced):
+            enriched_items.append({
+                **item,
+                'currency': currencies[i],
+                'currency_symbol': CURRENCY_SYMBOLS.get(currencies[i], currencies[i]),
+                'fx_rate': None if missing_rate[i] else float(rates[i]),
+                'current_price': current_data.get('price', 0),
+                'current_change': current_data.get('change', 0),
+                'current_change_percent': current_data.get('change_percent', 0),
+                'purchase_value': float(purchase_values[i]),
+                'current_value': float(current_values[i]),
+                'total_change': float(total_changes[i]),
+                'total_change_percent': float(total_change_percents[i]),
+                'name': current_data.get('name', item['ticker']),
+                'asset_type_display': self._get_asset_type_display(item['asset_type'])
+            })
+        
         return enriched_items
     
     async def _calculate_portfolio_summary(self, portfolio_items: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -128,16 +271,25 @@ class PortfolioService:
         if asset_type == 'index':
             return None
     
-        return self.portfolio_repo.add_to_portfolio(user_id, ticker, asset_type, quantity, average_price, notes)
+        result = self.portfolio_repo.add_to_portfolio(user_id, ticker, asset_type, quantity, average_price, notes)
+        if result:
+            self._bump_portfolio_version(user_id)
+        return result
     
     def remove_from_portfolio(self, user_id: int, portfolio_item_id: int) -> bool:
-        return self.portfolio_repo.remove_from_portfolio(user_id, portfolio_item_id)
+        removed = self.portfolio_repo.remove_from_portfolio(user_id, portfolio_item_id)
+        if removed:
+            self._bump_portfolio_version(user_id)
+        return removed
     
     def update_portfolio_item(self, user_id: int, portfolio_item_id: int, 
                              quantity: Optional[float] = None, 
                              average_price: Optional[float] = None,
                              notes: Optional[str] = None) -> Optional[Dict[str, Any]]:
-        return self.portfolio_repo.update_portfolio_item(user_id, portfolio_item_id, quantity, average_price, notes)
+        result = self.portfolio_repo.update_portfolio_item(user_id, portfolio_item_id, quantity, average_price, notes)
+        if result:
+            self._bump_portfolio_version(user_id)
+        return result
     
     async def quick_add_to_portfolio(self, user_id: int, ticker: str, asset_type: str, 
                                     quantity: float, price: float = None) -> Optional[Dict[str, Any]]:
@@ -151,7 +303,7 @@ class PortfolioService:
         
         if price is None or price == 0:
             try:
-                market_data = await self.market_service.get_cached_data(asset_type)
+                market_data = await self.market_service.get_cached_data(MARKET_ASSET_TYPES.get(asset_type, asset_type))
                 asset_data = next(
                     (item for item in market_data if item['ticker'] == ticker),
                     None
@@ -164,11 +316,143 @@ class PortfolioService:
                 logger.error(f"Error getting market price for {ticker}: {e}")
                 price = 0
         
-        return self.portfolio_repo.add_to_portfolio(
+        result = self.portfolio_repo.add_to_portfolio(
             user_id=user_id,
             ticker=ticker,
             asset_type=asset_type,
             quantity=quantity,
             average_price=price,
             notes=f"Добавлено со страницы рынка"
-        )
\ No newline at end of file
+        )
+        if result:
+            self._bump_portfolio_version(user_id)
+        return result
+    
+    async def _get_market_index(self, asset_type: str, indexes: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        if asset_type not in indexes:
+            index = {}
+            market_data = await self.market_service.get_cached_data(MARKET_ASSET_TYPES[asset_type])
+            for item in market_data:
+                index[item['ticker'].upper()] = item
+                if item.get('isin'):
+                    index.setdefault(item['isin'].upper(), item)
+            indexes[asset_type] = index
+        return indexes[asset_type]
+    
+    async def import_portfolio(self, user_id: int, rows: List[Dict[str, Any]]) -> ImportResult:
+        """
+        Массовый импорт позиций (выгрузка брокера).
+        Строки проверяются по рыночным данным, валидные записываются одной транзакцией.
+        """
+        indexes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        results: List[ImportRowResult] = []
+        positions: Dict[tuple, Dict[str, Any]] = {}
+        
+        for row_number, row in enumerate(rows, start=1):
+            identifier = str(row.get('ticker') or row.get('isin') or '').strip().upper()
+            result = ImportRowResult(row=row_number, ticker=identifier, status='error')
+            results.append(result)
+            
+            if not identifier:
+                result.message = "Не указан тикер или ISIN"
+                continue
+            
+            quantity = parse_number(row.get('quantity'))
+            if quantity is None or quantity <= 0:
+                result.message = "Некорректное количество"
+                continue
+            
+            average_price = parse_number(row.get('average_price'))
+            if average_price is None:
+                average_price = 0.0
+            if average_price < 0:
+                result.message = "Некорректная цена"
+                continue
+            
+            asset_type = normalize_asset_type(row.get('asset_type'))
+            if row.get('asset_type') and not asset_type:
+                result.message = f"Неизвестный тип актива: {row.get('asset_type')}"
+                continue
+            if asset_type == 'index':
+                result.message = "Индексы нельзя добавлять в портфель"
+                continue
+            
+            candidates = [asset_type] if asset_type else list(MARKET_ASSET_TYPES)
+            asset_data = None
+            for candidate in candidates:
+                index = await self._get_market_index(candidate, indexes)
+                asset_data = index.get(identifier)
+                if asset_data:
+                    asset_type = candidate
+                    break
+            
+            if not asset_data:
+                result.message = "Инструмент не найден на рынке"
+                continue
+            
+            if average_price == 0:
+                average_price = float(asset_data.get('price') or 0)
+            
+            ticker = asset_data['ticker']
+            key = (ticker, asset_type)
+            position = positions.get(key)
+            if position:
+                total_quantity = position['quantity'] + quantity
+                position['average_price'] = (
+                    position['quantity'] * position['average_price'] + quantity * average_price
+                ) / total_quantity
+                position['quantity'] = total_quantity
+            else:
+                positions[key] = {
+                    'ticker': ticker,
+                    'asset_type': asset_type,
+                    'quantity': quantity,
+                    'average_price': average_price,
+                    'notes': str(row.get('notes') or '')[:500],
+                }
+            
+            result.ticker = ticker
+            result.asset_type = asset_type
+            result.quantity = quantity
+            result.average_price = average_price
+            result.status = 'ok'
+        
+        failed = sum(1 for r in results if r.status != 'ok')
+        if not positions:
+            return ImportResult(rows=results, committed=False, failed=failed)
+        
+        counts = self.portfolio_repo.bulk_upsert(user_id, list(positions.values()))
+        if counts is None:
+            for result in results:
+                if result.status == 'ok':
+                    result.status = 'error'
+                    result.message = "Ошибка при сохранении"
+            return ImportResult(rows=results, committed=False, failed=len(results))
+        
+        self._bump_portfolio_version(user_id)
+        return ImportResult(
+            rows=results,
+            committed=True,
+            inserted=counts['inserted'],
+            updated=counts['updated'],
+            failed=failed,
+        )
+    
+    def batch_mutate(self, user_id: int, operations: Dict[str, Any]) -> Optional[Dict[str, List[int]]]:
+        remove_ids = [int(item_id) for item_id in operations.get('remove', [])]
+        updates = []
+        for update in operations.get('update', []):
+            updates.append({
+                'id': int(update['id']),
+                'quantity': parse_number(update.get('quantity')),
+                'average_price': parse_number(update.get('average_price')),
+                'notes': update.get('notes'),
+            })
+        if any(u['quantity'] is not None and u['quantity'] <= 0 for u in updates):
+            raise ValueError("Количество должно быть положительным")
+        if any(u['average_price'] is not None and u['average_price'] < 0 for u in updates):
+            raise ValueError("Цена не может быть отрицательной")
+        result = self.portfolio_repo.batch_mutate(user_id, remove_ids, updates)
+        if result and (result['removed'] or result['updated']):
+            self._bump_portfolio_version(user_id)
+        return result
\ No newline at end of file
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Callable
+from sqlalchemy.orm import Session
+
+from ..contracts.market import ISnapshotListener
+from ..database import SessionLocal
+from ..database.repositories.quote_history_repository import QuoteHistoryRepository
+from ..core.logger import logger
+
+HISTORY_INTERVALS = {
+    'raw': None,
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+    '1d': 86400,
+}
+
+MAX_HISTORY_RANGE = timedelta(days=366)
+
+
+class QuoteHistoryService(ISnapshotListener):
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def _record(self, asset_type: str, data: List[Dict[str, Any]], recorded_at: datetime) -> int:
+        db = self.session_factory()
+        try:
+            return QuoteHistoryRepository(db).record_quotes(asset_type, data, recorded_at)
+        finally:
+            db.close()
+
+    async def on_snapshot(self, asset_type: str, data: List[Dict[str, Any]]) -> None:
+        if not data:
+            return
+        recorded_at = datetime.now(timezone.utc)
+        written = await asyncio.to_thread(self._record, asset_type, data, recorded_at)
+        logger.info(f"Recorded {written} changed {asset_type} quotes out of {len(data)}")
+
+    def _query(self, ticker: str, start: datetime, end: datetime,
+               bucket_seconds: Optional[int], asset_type: Optional[str]) -> List[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            return QuoteHistoryRepository(db).get_history(ticker, start, end, bucket_seconds, asset_type)
+        finally:
+            db.close()
+
+    async def get_history(
+        self,
+        ticker: str,
+        asset_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        interval: str = "raw",
+    ) -> Dict[str, Any]:
+        if interval not in HISTORY_INTERVALS:
+            raise ValueError(f"Unknown interval: {interval}")
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=1)
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=timezone.utc)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        if start >= end:
+            raise ValueError("start must be before end")
+        if end - start > MAX_HISTORY_RANGE:
+            raise ValueError("Requested range is too large")
+
+        points = await asyncio.to_thread(
+            self._query, ticker, start, end, HISTORY_INTERVALS[interval], asset_type
+        )
+        return {
+            "ticker": ticker,
+            "asset_type": asset_type,
+            "interval": interval,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "points": points,
+        }
@@ -0,0 +1,173 @@
+import asyncio
+import json
+from datetime import date, timedelta
+from statistics import NormalDist
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..core import redis_client
+from ..core.logger import logger
+from ..database import SessionLocal
+from ..database.repositories.portfolio_repository import PortfolioRepository
+from ..database.repositories.quote_history_repository import QuoteHistoryRepository
+from .portfolio_service import PortfolioService, MARKET_ASSET_TYPES
+
+TRADING_DAYS = 252
+BENCHMARK = ('indices', 'IMOEX')
+RISK_CACHE_TTL = 86400
+MIN_OBSERVATIONS = 5
+
+
+class RiskAnalyticsService:
+    def __init__(
+        self,
+        portfolio_repo: PortfolioRepository,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.portfolio_repo = portfolio_repo
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _cache_key(user_id: int, portfolio_version: Optional[str], day: date, days: int, confidence: float) -> str:
+        return f"portfolio:risk:{user_id}:{portfolio_version or 0}:{day.isoformat()}:{days}:{confidence}"
+
+    def _load_closes(self, keys: List[Tuple[str, str]], start_day: date, end_day: date):
+        db = self.session_factory()
+        try:
+            return QuoteHistoryRepository(db).get_daily_closes(keys, start_day, end_day)
+        finally:
+            db.close()
+
+    async def get_portfolio_risk(self, user_id: int, days: int = 90, confidence: float = 0.95) -> Dict[str, Any]:
+        """
+        Риск-метрики портфеля по локальной истории котировок.
+        Результат кэшируется на версию портфеля и календарный день.
+        """
+        today = date.today()
+        portfolio_version = None
+        try:
+            portfolio_version = redis_client.get(PortfolioService.portfolio_version_key(user_id))
+            cached = redis_client.get(self._cache_key(user_id, portfolio_version, today, days, confidence))
+            if cached:
+                return json.loads(cached)
+        except Exception as e:
+            logger.error(f"Error reading portfolio risk cache for user {user_id}: {e}")
+
+        positions = [
+            item for item in self.portfolio_repo.get_user_portfolio(user_id)
+            if item['asset_type'] in MARKET_ASSET_TYPES and item['quantity'] > 0
+        ]
+        keys = sorted({(MARKET_ASSET_TYPES[p['asset_type']], p['ticker']) for p in positions})
+        closes = await asyncio.to_thread(
+            self._load_closes, keys + [BENCHMARK], today - timedelta(days=days), today
+        )
+        result = self._calculate(positions, keys, closes, confidence)
+        result.update({'days': days, 'confidence': confidence, 'as_of': today.isoformat()})
+
+        try:
+            redis_client.setex(
+                self._cache_key(user_id, portfolio_version, today, days, confidence),
+                RISK_CACHE_TTL,
+                json.dumps(result),
+            )
+        except Exception as e:
+            logger.error(f"Error caching portfolio risk for user {user_id}: {e}")
+        return result
+
+    @staticmethod
+    def _price_matrix(series: List[Dict[date, float]], dates: List[date]) -> np.ndarray:
+        matrix = np.full((len(dates), len(series)), np.nan)
+        index = {d: i for i, d in enumerate(dates)}
+        for column, points in enumerate(series):
+            for day, price in points.items():
+                if day in index:
+                    matrix[index[day], column] = price
+        for row in range(1, len(dates)):
+            missing = np.isnan(matrix[row])
+            matrix[row, missing] = matrix[row - 1, missing]
+        return matrix
+
+    def _calculate(self, positions: List[Dict[str, Any]], keys: List[Tuple[str, str]],
+                   closes: Dict[Tuple[str, str], Dict[date, float]], confidence: float) -> Dict[str, Any]:
+        available = [key for key in keys if len(closes.get(key, {})) > 1]
+        missing = [key[1] for key in keys if key not in available]
+        if not available:
+            return {'insufficient_data': True, 'missing_history': missing}
+
+        dates = sorted({day for key in available for day in closes[key]})
+        prices = self._price_matrix([closes[key] for key in available], dates)
+        complete = ~np.isnan(prices).any(axis=1)
+        prices, dates = prices[complete], [d for d, ok in zip(dates, complete) if ok]
+        if len(dates) <= MIN_OBSERVATIONS:
+            return {'insufficient_data': True, 'missing_history': missing}
+
+        quantities = np.zeros(len(available))
+        column = {key: i for i, key in enumerate(available)}
+        for position in positions:
+            key = (MARKET_ASSET_TYPES[position['asset_type']], position['ticker'])
+            if key in column:
+                quantities[column[key]] += position['quantity']
+
+        values = prices[-1] * quantities
+        portfolio_value = float(values.sum())
+        weights = values / portfolio_value if portfolio_value > 0 else np.full(len(available), 1 / len(available))
+
+        returns = prices[1:] / prices[:-1] - 1.0
+        portfolio_returns = returns @ weights
+        alpha = 1.0 - confidence
+
+        covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+        volatility = np.sqrt(np.diag(covariance) * TRADING_DAYS)
+        std = np.sqrt(np.diag(covariance))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlation = np.nan_to_num(covariance / np.outer(std, std))
+
+        threshold = np.quantile(portfolio_returns, alpha)
+        tail = portfolio_returns[portfolio_returns <= threshold]
+        mu = float(portfolio_returns.mean())
+        sigma = float(portfolio_returns.std(ddof=1))
+        z = NormalDist().inv_cdf(alpha)
+        parametric_var = -(mu + z * sigma)
+        parametric_cvar = -(mu - sigma * NormalDist().pdf(z) / alpha)
+
+        growth = np.cumprod(1.0 + portfolio_returns)
+        drawdowns = growth / np.maximum.accumulate(np.concatenate(([1.0], growth)))[1:] - 1.0
+
+        tickers = [ticker for _, ticker in available]
+        return {
+            'insufficient_data': False,
+            'observations': int(len(portfolio_returns)),
+            'start': dates[0].isoformat(),
+            'end': dates[-1].isoformat(),
+            'portfolio_value': portfolio_value,
+            'tickers': tickers,
+            'weights': weights.round(6).tolist(),
+            'volatility': float(sigma * np.sqrt(TRADING_DAYS)),
+            'asset_volatility': dict(zip(tickers, volatility.round(6).tolist())),
+            'covariance': (covariance * TRADING_DAYS).round(8).tolist(),
+            'correlation': correlation.round(6).tolist(),
+            'historical_var': float(-threshold * portfolio_value),
+            'historical_cvar': float(-tail.mean() * portfolio_value) if tail.size else 0.0,
+            'parametric_var': float(parametric_var * portfolio_value),
+            'parametric_cvar': float(parametric_cvar * portfolio_value),
+            'beta': self._beta(closes.get(BENCHMARK, {}), dates, portfolio_returns),
+            'max_drawdown': float(min(drawdowns.min(), 0.0)),
+            'missing_history': missing,
+        }
+
+    def _beta(self, benchmark: Dict[date, float], dates: List[date], portfolio_returns: np.ndarray) -> Optional[float]:
+        if len(benchmark) <= MIN_OBSERVATIONS:
+            return None
+        # Индекс выравнивается на общие дни портфеля; пары с пропуском в индексе отбрасываются.
+        index_prices = np.array([benchmark.get(day, np.nan) for day in dates], dtype=float)
+        index_returns = index_prices[1:] / index_prices[:-1] - 1.0
+        valid = np.isfinite(index_returns)
+        if valid.sum() <= MIN_OBSERVATIONS:
+            return None
+        market_variance = np.var(index_returns[valid], ddof=1)
+        if market_variance == 0:
+            return None
+        covariance = np.cov(portfolio_returns[valid], index_returns[valid])[0, 1]
+        return float(covariance / market_variance)
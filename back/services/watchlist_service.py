@@ -0,0 +1,41 @@
+from typing import Any, Dict, Optional
+
+from ..core.logger import logger
+from ..database.repositories.watchlist_repository import WatchlistRepository, MAX_WATCHLIST_ITEMS
+from .market_service import MarketService
+
+
+class WatchlistService:
+    """Список наблюдения пользователя; котировки всех позиций приходят одним поиском по снимкам."""
+
+    def __init__(self, watchlist_repo: WatchlistRepository, market_service: MarketService):
+        self.watchlist_repo = watchlist_repo
+        self.market_service = market_service
+
+    async def get_watchlist(self, user_id: int) -> Dict[str, Any]:
+        items = self.watchlist_repo.get_user_watchlist(user_id)
+        if not items:
+            return {"items": [], "missing": []}
+        lookup = await self.market_service.get_quotes([f"{item['asset_type']}:{item['ticker']}" for item in items])
+        quotes = {quote['query']: quote for quote in lookup.quotes}
+        for item in items:
+            item['quote'] = quotes.get(f"{item['asset_type']}:{item['ticker'].upper()}")
+        return {"items": items, "missing": lookup.missing}
+
+    async def add(self, user_id: int, identifier: str, asset_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Добавляет инструмент по тикеру или ISIN; ValueError — не найден или список переполнен."""
+        if self.watchlist_repo.count(user_id) >= MAX_WATCHLIST_ITEMS:
+            raise ValueError(f"В списке наблюдения не больше {MAX_WATCHLIST_ITEMS} инструментов")
+        lookup = await self.market_service.get_quotes([identifier], [asset_type] if asset_type else None)
+        if not lookup.quotes:
+            raise ValueError("Инструмент не найден на рынке")
+        quote = lookup.quotes[0]
+        item = self.watchlist_repo.add(user_id, quote['ticker'], quote['asset_type'])
+        if item is None:
+            logger.error(f"Failed to add {quote['ticker']} to watchlist of user {user_id}")
+            return None
+        item['quote'] = quote
+        return item
+
+    def remove(self, user_id: int, item_id: int) -> bool:
+        return self.watchlist_repo.remove(user_id, item_id)
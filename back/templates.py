@@ -1,7 +1,78 @@
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
 from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import json
 import os
 
+from .core import redis_client
+from .core.logger import logger
+from .core.metrics import record_cache_lookup
+from .core.timing import span
+
 BASE_DIR = Path(__file__).parent.parent
 TEMPLATES_DIR = BASE_DIR / "front" / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+BYTECODE_CACHE_DIR = Path(os.getenv("TEMPLATE_CACHE_DIR", BASE_DIR / ".cache" / "jinja"))
+BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+class TimedJinja2Templates(Jinja2Templates):
+    def TemplateResponse(self, *args, **kwargs):
+        with span("template"):
+            return super().TemplateResponse(*args, **kwargs)
+
+
+templates = TimedJinja2Templates(directory=str(TEMPLATES_DIR))
+templates.env.bytecode_cache = FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR))
+
+
+def render_fragment(template_name: str, context: Dict[str, Any]) -> Markup:
+    with span("template"):
+        return Markup(templates.get_template(template_name).render(context))
+
+
+class FragmentCache:
+    """
+    Кэш отрендеренных HTML-фрагментов в Redis, общий для всех пользователей и воркеров.
+    Фрагмент хранится вместе с версией снимка, по которому он построен; версия и фрагмент
+    читаются одним MGET, а устаревший фрагмент просто перезаписывается.
+    """
+
+    def __init__(self, namespace: str, ttl: int = 300):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, params: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        return f"fragment:{self.namespace}:{digest}"
+
+    def get(self, version_key: str, params: Dict[str, Any]) -> Tuple[Optional[str], Optional[Markup]]:
+        asset_type = params.get("asset_type", "-")
+        try:
+            with span("redis"):
+                version, cached = redis_client.mget([version_key, self._key(params)])
+            if version and cached:
+                entry = json.loads(cached)
+                if entry["version"] == version:
+                    record_cache_lookup(self.namespace, asset_type, "hit")
+                    return version, Markup(entry["html"])
+                record_cache_lookup(self.namespace, asset_type, "stale")
+            else:
+                record_cache_lookup(self.namespace, asset_type, "miss")
+            return version, None
+        except Exception as e:
+            record_cache_lookup(self.namespace, asset_type, "error")
+            logger.error(f"Error reading {self.namespace} fragment: {e}")
+            return None, None
+
+    def set(self, version: Optional[str], params: Dict[str, Any], html: str) -> None:
+        if version is None:
+            return
+        try:
+            redis_client.setex(self._key(params), self.ttl, json.dumps({"version": version, "html": str(html)}))
+        except Exception as e:
+            logger.error(f"Error caching {self.namespace} fragment: {e}")
+
+
+market_table_cache = FragmentCache("market_table")
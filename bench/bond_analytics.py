@@ -0,0 +1,129 @@
+"""
+Сравнение векторного расчёта аналитики облигаций с поштучным циклом на чистом Python.
+
+    python -m bench.bond_analytics --bonds 1000 --repeat 5
+"""
+import argparse
+import math
+import os
+import random
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from back.services.market.bond_analytics import compute_bond_analytics, ANALYTICS_FIELDS
+
+
+def generate_bonds(count: int, today: date, seed: int = 42):
+    rng = random.Random(seed)
+    bonds = []
+    for i in range(count):
+        period = rng.choice([91, 182, 182, 182, 30])
+        years = rng.uniform(0.1, 15)
+        maturity = today + timedelta(days=int(years * 365))
+        next_coupon = today + timedelta(days=rng.randint(1, period))
+        if next_coupon > maturity:
+            next_coupon = maturity
+        face = rng.choice([1000.0, 1000.0, 500.0])
+        bonds.append({
+            'ticker': f"RU{i:010d}",
+            'price': rng.uniform(60, 110),
+            'face_value': face,
+            'coupon_value': face * rng.uniform(0.04, 0.18) * period / 365,
+            'coupon_period': period,
+            'maturity_date': maturity.isoformat(),
+            'next_coupon': next_coupon.isoformat(),
+        })
+    return bonds
+
+
+def compute_bond_analytics_loop(bonds, today: date):
+    for bond in bonds:
+        face = float(bond.get('face_value') or 0)
+        price = float(bond.get('price') or 0)
+        coupon = float(bond.get('coupon_value') or 0)
+        period = int(bond.get('coupon_period') or 0)
+        try:
+            mat_days = (date.fromisoformat(bond['maturity_date']) - today).days
+            next_days = (date.fromisoformat(bond['next_coupon']) - today).days
+        except (KeyError, TypeError, ValueError):
+            mat_days, next_days = 0, -1
+
+        result = dict.fromkeys(ANALYTICS_FIELDS, 0.0)
+        if face > 0 and price > 0 and mat_days > 0:
+            has_coupon = coupon > 0 and period > 0 and 0 <= next_days <= mat_days
+            accrued = coupon * min(max((period - next_days) / period, 0), 1) if has_coupon else 0.0
+            clean = price / 100 * face
+            dirty = clean + accrued
+            flows = []
+            if has_coupon:
+                count = min(int((mat_days - next_days) // period) + 1, 400)
+                for k in range(count):
+                    flows.append([(next_days + k * period) / 365, coupon])
+                flows[-1][0] = mat_days / 365
+                flows[-1][1] += face
+            else:
+                flows.append([mat_days / 365, face])
+
+            y = (coupon * 365 / period / dirty if has_coupon else 0.0) + 0.01
+            for _ in range(50):
+                pv = sum(cf * (1 + y) ** -t for t, cf in flows)
+                dpv = -sum(t * cf * (1 + y) ** -t for t, cf in flows) / (1 + y)
+                step = (pv - dirty) / dpv if dpv else 0.0
+                y = min(max(y - step, -0.99), 10.0)
+                if abs(step) < 1e-10:
+                    break
+            pv = sum(cf * (1 + y) ** -t for t, cf in flows)
+            macaulay = sum(t * cf * (1 + y) ** -t for t, cf in flows) / pv
+            result.update(
+                accrued_interest=accrued,
+                clean_price=clean,
+                dirty_price=dirty,
+                ytm=y * 100,
+                macaulay_duration=macaulay,
+                modified_duration=macaulay / (1 + y),
+                convexity=sum(cf * t * (t + 1) * (1 + y) ** -t for t, cf in flows) / ((1 + y) ** 2 * pv),
+            )
+        bond.update(result)
+    return bonds
+
+
+def _best_of(func, bonds, today, repeat):
+    timings = []
+    for _ in range(repeat):
+        data = [dict(b) for b in bonds]
+        started = time.perf_counter()
+        func(data, today)
+        timings.append(time.perf_counter() - started)
+    return min(timings), data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bonds", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    today = date.today()
+    bonds = generate_bonds(args.bonds, today)
+
+    vector_time, vector = _best_of(compute_bond_analytics, bonds, today, args.repeat)
+    loop_time, loop = _best_of(compute_bond_analytics_loop, bonds, today, args.repeat)
+
+    max_diff = max(
+        abs(v[field] - l[field])
+        for v, l in zip(vector, loop)
+        for field in ANALYTICS_FIELDS
+        if math.isfinite(l[field])
+    )
+    print(f"bonds:          {args.bonds}")
+    print(f"numpy batch:    {vector_time * 1000:.2f} ms")
+    print(f"python loop:    {loop_time * 1000:.2f} ms")
+    print(f"speedup:        {loop_time / vector_time:.1f}x")
+    print(f"max abs diff:   {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Фикстуры ответов MOEX ISS для бенчмарков: по одному JSON на каждую доску, которую опрашивают провайдеры.
+
+    python -m bench.iss_fixtures generate            # синтетические ответы реального размера (детерминированно)
+    python -m bench.iss_fixtures record              # записать живые ответы iss.moex.com
+
+Файлы лежат в bench/fixtures/iss/ и повторяют дерево путей ISS,
+например engines/stock/markets/shares/boards/TQBR/securities.json.
+Записываются полные ответы (все блоки и колонки), проекцию iss.only и *.columns делает stand-in сервер.
+"""
+import argparse
+import asyncio
+import json
+import random
+import string
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "iss"
+
+BOND_BOARDS = ['TQOB', 'TQCB', 'TQDB', 'TQRB', 'TQPB', 'TQNB']
+
+ENDPOINTS = [
+    "engines/stock/markets/shares/boards/TQBR/securities.json",
+    "engines/stock/markets/shares/boards/TQTF/securities.json",
+    "engines/stock/markets/bonds/securities.json",
+    *[f"engines/stock/markets/bonds/boards/{board}/securities.json" for board in BOND_BOARDS],
+    "engines/stock/markets/index/boards/SNDX/securities.json",
+    "engines/currency/markets/selt/securities.json",
+]
+
+SHARES_SECURITIES = [
+    "SECID", "BOARDID", "SHORTNAME", "PREVPRICE", "LOTSIZE", "FACEVALUE", "STATUS", "BOARDNAME",
+    "DECIMALS", "SECNAME", "REMARKS", "MARKETCODE", "INSTRID", "SECTORID", "MINSTEP", "PREVWAPRICE",
+    "FACEUNIT", "PREVDATE", "ISSUESIZE", "ISIN", "LATNAME", "REGNUMBER", "PREVLEGALCLOSEPRICE",
+    "CURRENCYID", "SECTYPE", "LISTLEVEL", "SETTLEDATE",
+]
+SHARES_MARKETDATA = [
+    "SECID", "BOARDID", "BID", "BIDDEPTH", "OFFER", "OFFERDEPTH", "SPREAD", "BIDDEPTHT", "OFFERDEPTHT",
+    "OPEN", "LOW", "HIGH", "LAST", "LASTCHANGE", "LASTCHANGEPRCNT", "QTY", "VALUE", "VALUE_USD", "WAPRICE",
+    "LASTCNGTOLASTWAPRICE", "WAPTOPREVWAPRICEPRCNT", "WAPTOPREVWAPRICE", "CLOSEPRICE", "MARKETPRICETODAY",
+    "MARKETPRICE", "LASTTOPREVPRICE", "NUMTRADES", "VOLTODAY", "VALTODAY", "VALTODAY_USD", "ETFSETTLEPRICE",
+    "TRADINGSTATUS", "UPDATETIME", "LASTBID", "LASTOFFER", "LCLOSEPRICE", "LCURRENTPRICE",
+    "MARKETPRICE2", "ISSUECAPITALIZATION", "SEQNUM", "TIME", "SYSTIME", "CHANGE",
+]
+BONDS_SECURITIES = [
+    "SECID", "BOARDID", "SHORTNAME", "PREVWAPRICE", "YIELDATPREVWAPRICE", "COUPONVALUE", "NEXTCOUPON",
+    "ACCRUEDINT", "PREVPRICE", "LOTSIZE", "FACEVALUE", "BOARDNAME", "STATUS", "MATDATE", "DECIMALS",
+    "COUPONPERIOD", "ISSUESIZE", "PREVLEGALCLOSEPRICE", "PREVDATE", "SECNAME", "REMARKS", "MARKETCODE",
+    "INSTRID", "SECTORID", "MINSTEP", "FACEUNIT", "BUYBACKPRICE", "BUYBACKDATE", "ISIN", "LATNAME",
+    "REGNUMBER", "CURRENCYID", "ISSUESIZEPLACED", "LISTLEVEL", "SECTYPE", "COUPONPERCENT", "OFFERDATE",
+    "SETTLEDATE", "LOTVALUE", "FACEVALUEONSETTLEDATE",
+]
+BONDS_MARKETDATA = [
+    "SECID", "BOARDID", "BID", "OFFER", "SPREAD", "OPEN", "LOW", "HIGH", "LAST", "LASTCHANGE",
+    "LASTCHANGEPRCNT", "QTY", "VALUE", "YIELD", "VALUE_USD", "WAPRICE", "LASTCNGTOLASTWAPRICE",
+    "WAPTOPREVWAPRICEPRCNT", "WAPTOPREVWAPRICE", "YIELDATWAPRICE", "YIELDTOPREVYIELD", "CLOSEYIELD",
+    "CLOSEPRICE", "MARKETPRICETODAY", "MARKETPRICE", "LASTTOPREVPRICE", "NUMTRADES", "VOLTODAY",
+    "VALTODAY", "VALTODAY_USD", "TRADINGSTATUS", "UPDATETIME", "DURATION", "NUMBIDS", "NUMOFFERS",
+    "CHANGE", "TIME", "HIGHBID", "LOWOFFER", "PRICEMINUSPREVWAPRICE", "LASTBID", "LASTOFFER",
+    "LCURRENTPRICE", "LCLOSEPRICE", "MARKETPRICE2", "ADMITTEDQUOTE", "OPENPERIODPRICE", "SEQNUM",
+    "SYSTIME", "DURATIONWAPRICE", "IRICPICLOSE", "BEICLOSE", "CBRCLOSE", "YIELDTOOFFER",
+    "YIELDLASTCOUPON", "TRADINGSESSION",
+]
+INDEX_SECURITIES = [
+    "SECID", "BOARDID", "NAME", "DECIMALS", "SHORTNAME", "ANNUALHIGH", "ANNUALLOW", "CURRENCYID", "CALCMODE",
+]
+INDEX_MARKETDATA = [
+    "SECID", "BOARDID", "LASTVALUE", "OPENVALUE", "CURRENTVALUE", "LASTCHANGE", "LASTCHANGETOOPENPRC",
+    "LASTCHANGETOOPEN", "UPDATETIME", "LASTCHANGEPRC", "VALTODAY", "MONTHCHANGEPRC", "YEARCHANGEPRC",
+    "SEQNUM", "SYSTIME", "TIME", "VALTODAY_USD", "LASTCHANGEBP", "MONTHCHANGEBP", "YEARCHANGEBP",
+    "CAPITALIZATION", "CAPITALIZATION_USD", "HIGH", "LOW", "TRADEDATE", "TRADINGSESSION", "VOLTODAY",
+]
+CURRENCY_SECURITIES = [
+    "SECID", "BOARDID", "SHORTNAME", "LOTSIZE", "SETTLEDATE", "DECIMALS", "FACEVALUE", "MARKETCODE",
+    "MINSTEP", "PREVDATE", "SECNAME", "REMARKS", "STATUS", "FACEUNIT", "PREVPRICE", "PREVWAPRICE",
+    "CURRENCYID", "LATNAME", "LOTDIVIDER",
+]
+CURRENCY_MARKETDATA = [
+    "SECID", "BOARDID", "BID", "BIDDEPTH", "OFFER", "OFFERDEPTH", "SPREAD", "OPEN", "LOW", "HIGH", "LAST",
+    "QTY", "VALUE", "HASBID", "HASOFFER", "NUMBIDS", "NUMOFFERS", "BIDDEPTHT", "OFFERDEPTHT", "VOLTODAY",
+    "VALTODAY", "VALTODAY_USD", "NUMTRADES", "UPDATETIME", "LASTCHANGE", "LASTCHANGEPRC", "WAPRICE",
+    "CLOSEPRICE", "TRADINGSTATUS", "SYSTIME", "SEQNUM", "TIME", "CHANGE", "PRICEMINUSPREVWAPRICE",
+]
+
+CURRENCY_RATES = {
+    'USD': 92.0, 'EUR': 99.5, 'CNY': 12.7, 'GBP': 116.0, 'CHF': 103.0,
+    'JPY': 0.61, 'TRY': 2.8, 'HKD': 11.8, 'KZT': 0.19, 'BYN': 28.0,
+}
+
+
+def _ticker(rng: random.Random, length: int = 4) -> str:
+    return "".join(rng.choice(string.ascii_uppercase) for _ in range(length))
+
+
+def _name(rng: random.Random, words: int = 2) -> str:
+    syllables = ["ро", "ма", "не", "фт", "газ", "ст", "ал", "ин", "тех", "ком", "эн", "ер", "го", "мет", "сб", "тел"]
+    return " ".join(
+        "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).capitalize()
+        for _ in range(words)
+    )
+
+
+def _filler(column: str, rng: random.Random, today: date) -> Any:
+    """Значение для колонки, которую провайдеры не читают: форма и тип как в ISS, содержимое случайное."""
+    if column.endswith("DATE"):
+        return (today + timedelta(days=rng.randint(-5, 5))).isoformat()
+    if column in ("TIME", "UPDATETIME"):
+        return f"{rng.randint(10, 18):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+    if column == "SYSTIME":
+        return f"{today.isoformat()} {rng.randint(10, 18):02d}:{rng.randint(0, 59):02d}:00"
+    if column in ("STATUS", "TRADINGSTATUS"):
+        return "A" if column == "STATUS" else "T"
+    if column == "REMARKS":
+        return None
+    if column == "TRADINGSESSION":
+        return str(rng.randint(1, 3))
+    if rng.random() < 0.15:
+        return None
+    if column.startswith(("NUM", "SEQ", "DECIMALS", "LISTLEVEL", "BIDDEPTH", "OFFERDEPTH", "QTY", "VOLTODAY")):
+        return rng.randint(0, 100000)
+    return round(rng.uniform(0, 1000), 4)
+
+
+def _block(columns: List[str], rows: List[Dict[str, Any]], rng: random.Random, today: date) -> Dict[str, Any]:
+    return {
+        "columns": columns,
+        "data": [
+            [row[column] if column in row else _filler(column, rng, today) for column in columns]
+            for row in rows
+        ],
+    }
+
+
+def _quote(rng: random.Random, price: float, active: bool = True) -> Dict[str, Any]:
+    if not active:
+        return {"LAST": None, "OPEN": None, "LASTTOPREVPRICE": None, "CHANGE": None, "VALUE": None, "LOW": None, "HIGH": None}
+    change_pct = rng.gauss(0, 1.8)
+    return {
+        "LAST": round(price, 4),
+        "OPEN": round(price * (1 - change_pct / 200), 4),
+        "LASTTOPREVPRICE": round(change_pct, 2),
+        "LASTCHANGEPRCNT": round(change_pct, 2),
+        "CHANGE": round(price * change_pct / 100, 4),
+        "LASTCHANGE": round(price * change_pct / 100, 4),
+        "VALUE": round(rng.lognormvariate(13, 2), 2),
+        "LOW": round(price * 0.98, 4),
+        "HIGH": round(price * 1.02, 4),
+    }
+
+
+def _shares(rng: random.Random, today: date, board: str, count: int) -> Dict[str, Any]:
+    securities, marketdata = [], []
+    used = set()
+    for i in range(count):
+        secid = _ticker(rng, rng.choice([4, 4, 4, 5]))
+        while secid in used:
+            secid = _ticker(rng, 5)
+        used.add(secid)
+        price = rng.lognormvariate(4.5, 1.6)
+        securities.append({
+            "SECID": secid, "BOARDID": board, "SHORTNAME": _name(rng, 1), "SECNAME": f"ПАО \"{_name(rng)}\"",
+            "ISIN": f"RU000A{i:06d}", "REGNUMBER": f"1-01-{i:05d}-A", "LOTSIZE": rng.choice([1, 10, 100, 1000]),
+            "LATNAME": secid.title(), "CURRENCYID": "SUR", "FACEUNIT": "SUR", "PREVPRICE": round(price, 4),
+            "PREVWAPRICE": round(price, 4), "BOARDNAME": "Т+: Акции и ДР - безадрес.",
+        })
+        marketdata.append({"SECID": secid, "BOARDID": board, **_quote(rng, price, rng.random() > 0.08)})
+    return {"securities": securities, "marketdata": marketdata}
+
+
+def _bonds(rng: random.Random, today: date, count: int) -> Dict[str, Any]:
+    securities = []
+    boards: Dict[str, List[Dict[str, Any]]] = {board: [] for board in BOND_BOARDS}
+    for i in range(count):
+        board = rng.choices(BOND_BOARDS, weights=[10, 60, 5, 15, 5, 5])[0]
+        secid = f"RU000A{i:06X}" if board != 'TQOB' else f"SU{26200 + i}RMFS{i % 10}"
+        period = rng.choice([91, 182, 182, 182, 30])
+        maturity = today + timedelta(days=rng.randint(30, 15 * 365))
+        next_coupon = min(today + timedelta(days=rng.randint(1, period)), maturity)
+        face = rng.choice([1000.0, 1000.0, 1000.0, 500.0, 100.0])
+        currency = rng.choices(["SUR", "USD", "CNY", "EUR"], weights=[90, 5, 4, 1])[0]
+        coupon = round(face * rng.uniform(0.04, 0.2) * period / 365, 2) if rng.random() > 0.05 else 0.0
+        price = rng.uniform(60, 110)
+        securities.append({
+            "SECID": secid, "BOARDID": board, "SHORTNAME": f"{_name(rng, 1)} {rng.randint(1, 9)}Р{rng.randint(1, 9)}",
+            "SECNAME": f"{_name(rng)} обл. сер. {rng.randint(1, 40)}", "ISIN": secid if len(secid) == 12 else f"RU000A{i:06d}",
+            "REGNUMBER": f"4B02-{i:02d}-{rng.randint(10000, 99999)}-P", "LOTSIZE": 1,
+            "MATDATE": maturity.isoformat(), "COUPONVALUE": coupon, "COUPONPERIOD": period,
+            "NEXTCOUPON": next_coupon.isoformat(), "ISSUESIZE": rng.choice([1, 2, 5, 10, 20]) * 10 ** rng.randint(5, 7),
+            "CURRENCYID": currency, "FACEUNIT": currency, "FACEVALUE": face,
+            "COUPONPERCENT": round(coupon * 365 / period / face * 100, 2) if coupon else None,
+            "PREVPRICE": round(price, 3), "PREVWAPRICE": round(price, 3),
+        })
+        quote = _quote(rng, price, rng.random() > 0.3)
+        quote["YIELD"] = round(rng.uniform(5, 30), 2) if quote["LAST"] is not None else None
+        boards[board].append({"SECID": secid, "BOARDID": board, **quote})
+    return {"securities": securities, "boards": boards}
+
+
+def _indices(rng: random.Random, today: date, count: int) -> Dict[str, Any]:
+    securities, marketdata = [], []
+    fixed = ["IMOEX", "RTSI", "MOEXBC", "MOEXBMI", "RGBI", "RGBITR", "MCFTR", "MOEXOG", "MOEXFN", "MOEXMM"]
+    for i in range(count):
+        secid = fixed[i] if i < len(fixed) else f"{_ticker(rng, 3)}{i}"
+        value = rng.uniform(100, 5000)
+        securities.append({
+            "SECID": secid, "BOARDID": "SNDX", "NAME": f"Индекс {_name(rng)}", "SHORTNAME": secid,
+            "CURRENCYID": rng.choice(["RUB", "RUB", "RUB", "USD"]),
+        })
+        change_pct = rng.gauss(0, 1)
+        marketdata.append({
+            "SECID": secid, "BOARDID": "SNDX", "LASTVALUE": round(value, 2), "CURRENTVALUE": round(value, 2),
+            "OPENVALUE": round(value * (1 - change_pct / 200), 2), "LASTCHANGE": round(value * change_pct / 100, 2),
+            "LASTCHANGEPRC": round(change_pct, 2), "HIGH": round(value * 1.01, 2), "LOW": round(value * 0.99, 2),
+        })
+    return {"securities": securities, "marketdata": marketdata}
+
+
+def _currencies(rng: random.Random, today: date) -> Dict[str, Any]:
+    securities, marketdata = [], []
+    instruments = []
+    for code, rate in CURRENCY_RATES.items():
+        for settlement in ("TOM", "TOD"):
+            instruments.append((f"{code}RUB_{settlement}", f"{code}000000{settlement}"[:12], rate))
+        for suffix in ("TODTOM", "TOMSPT", "TOM1W", "TOM1M", "TOM3M"):
+            instruments.append((f"{code}RUB_{suffix}", f"{code}_{suffix}"[:12], None))
+    instruments += [
+        ("EURUSD_TOM", "EURUSD000TOM", CURRENCY_RATES['EUR'] / CURRENCY_RATES['USD']),
+        ("USDCNY_TOM", "USDCNY000TOM", CURRENCY_RATES['USD'] / CURRENCY_RATES['CNY']),
+        ("GLDRUB_TOM", "GLDRUB_TOM", 7300.0),
+        ("SLVRUB_TOM", "SLVRUB_TOM", 90.0),
+    ]
+    for shortname, secid, rate in instruments:
+        board = "CETS" if rate is not None else "CNGD"
+        securities.append({
+            "SECID": secid, "BOARDID": board, "SHORTNAME": shortname, "SECNAME": f"{shortname} - {_name(rng, 1)}",
+            "PREVPRICE": round(rate, 4) if rate else None, "PREVWAPRICE": round(rate, 4) if rate else None,
+            "CURRENCYID": "RUB", "FACEUNIT": shortname[:3], "LOTSIZE": 1000,
+        })
+        quote = _quote(rng, rate or 0.0, rate is not None)
+        quote["LASTCHANGEPRC"] = quote.get("LASTCHANGEPRCNT")
+        marketdata.append({"SECID": secid, "BOARDID": board, **quote})
+    return {"securities": securities, "marketdata": marketdata}
+
+
+def generate(fixtures_dir: Path = FIXTURES_DIR, seed: int = 42, scale: float = 1.0,
+             today: Optional[date] = None) -> List[Path]:
+    """
+    Синтетические ответы с колонками и объёмами, близкими к реальным:
+    ~260 акций TQBR, ~150 фондов, ~3000 облигаций, ~250 индексов и ~70 валютных инструментов.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    count = lambda n: max(1, int(n * scale))
+
+    responses: Dict[str, Dict[str, Any]] = {}
+    for board, size in (("TQBR", 260), ("TQTF", 150)):
+        shares = _shares(rng, today, board, count(size))
+        responses[f"engines/stock/markets/shares/boards/{board}/securities.json"] = {
+            "securities": _block(SHARES_SECURITIES, shares["securities"], rng, today),
+            "marketdata": _block(SHARES_MARKETDATA, shares["marketdata"], rng, today),
+        }
+
+    bonds = _bonds(rng, today, count(3000))
+    responses["engines/stock/markets/bonds/securities.json"] = {
+        "securities": _block(BONDS_SECURITIES, bonds["securities"], rng, today),
+        "marketdata": _block(BONDS_MARKETDATA, [row for rows in bonds["boards"].values() for row in rows], rng, today),
+    }
+    board_securities: Dict[str, List[Dict[str, Any]]] = {board: [] for board in BOND_BOARDS}
+    for security in bonds["securities"]:
+        board_securities[security["BOARDID"]].append(security)
+    for board in BOND_BOARDS:
+        responses[f"engines/stock/markets/bonds/boards/{board}/securities.json"] = {
+            "securities": _block(BONDS_SECURITIES, board_securities[board], rng, today),
+            "marketdata": _block(BONDS_MARKETDATA, bonds["boards"][board], rng, today),
+        }
+
+    indices = _indices(rng, today, count(250))
+    responses["engines/stock/markets/index/boards/SNDX/securities.json"] = {
+        "securities": _block(INDEX_SECURITIES, indices["securities"], rng, today),
+        "marketdata": _block(INDEX_MARKETDATA, indices["marketdata"], rng, today),
+    }
+
+    currencies = _currencies(rng, today)
+    responses["engines/currency/markets/selt/securities.json"] = {
+        "securities": _block(CURRENCY_SECURITIES, currencies["securities"], rng, today),
+        "marketdata": _block(CURRENCY_MARKETDATA, currencies["marketdata"], rng, today),
+    }
+
+    for payload in responses.values():
+        payload["dataversion"] = {"columns": ["data_version", "seqnum"], "data": [[1, 20240101000000]]}
+    return [_write(fixtures_dir, endpoint, payload) for endpoint, payload in responses.items()]
+
+
+async def record(fixtures_dir: Path = FIXTURES_DIR, base_url: str = "https://iss.moex.com/iss") -> List[Path]:
+    import aiohttp
+
+    written = []
+    async with aiohttp.ClientSession() as session:
+        for endpoint in ENDPOINTS:
+            async with session.get(f"{base_url.rstrip('/')}/{endpoint}", params={"iss.meta": "off"}) as response:
+                response.raise_for_status()
+                written.append(_write(fixtures_dir, endpoint, await response.json()))
+    return written
+
+
+def _write(fixtures_dir: Path, endpoint: str, payload: Dict[str, Any]) -> Path:
+    path = fixtures_dir / endpoint
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, ensure_ascii=False))
+    return path
+
+
+def ensure_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> None:
+    """Генерирует синтетические фикстуры, если записанных ещё нет."""
+    if not all((fixtures_dir / endpoint).exists() for endpoint in ENDPOINTS):
+        generate(fixtures_dir)
+
+
+def load_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> Dict[str, Dict[str, Any]]:
+    ensure_fixtures(fixtures_dir)
+    return {endpoint: json.loads((fixtures_dir / endpoint).read_text()) for endpoint in ENDPOINTS}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["generate", "record"])
+    parser.add_argument("--dir", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--base-url", default="https://iss.moex.com/iss")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        paths = generate(args.dir, seed=args.seed, scale=args.scale)
+    else:
+        paths = asyncio.run(record(args.dir, args.base_url))
+    for path in paths:
+        print(f"{path.relative_to(args.dir)}  {path.stat().st_size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Локальная замена MOEX ISS, отдающая записанные фикстуры.
+
+    python -m bench.iss_server --port 8800 --latency 0.05
+    MOEX_ISS_URL=http://127.0.0.1:8800/iss uvicorn back.main:app
+
+Поддерживаются параметры, которыми пользуются провайдеры: iss.only и <блок>.columns.
+Задержка --latency (с разбросом --jitter) имитирует сетевой путь до iss.moex.com.
+С --page-size блок securities отдаётся страницами по параметру start вместе с блоком securities.cursor,
+как это делает ISS для постраничных ответов.
+"""
+import argparse
+import asyncio
+import json
+import random
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from aiohttp import web
+
+from .iss_fixtures import FIXTURES_DIR, load_fixtures
+
+ISS_PREFIX = "/iss"
+PAGED_BLOCKS = ("securities",)
+
+
+def paginate(payload: Dict[str, Any], start: int, page_size: int) -> Dict[str, Any]:
+    result = {}
+    for name, block in payload.items():
+        result[name] = block
+        if name in PAGED_BLOCKS:
+            result[name] = {"columns": block["columns"], "data": block["data"][start:start + page_size]}
+            result[f"{name}.cursor"] = {
+                "columns": ["INDEX", "TOTAL", "PAGESIZE"],
+                "data": [[start, len(block["data"]), page_size]],
+            }
+    return result
+
+
+def project(payload: Dict[str, Any], query) -> Dict[str, Any]:
+    """Повторяет выборку блоков и колонок ISS; неизвестные колонки ISS молча пропускает."""
+    only = {block for value in query.getall("iss.only", []) for block in value.split(",") if block}
+    result = {}
+    for name, block in payload.items():
+        if only and name not in only and name.split(".")[0] not in only:
+            continue
+        requested = query.get(f"{name}.columns")
+        if not requested:
+            result[name] = block
+            continue
+        columns = block["columns"]
+        indexes = [columns.index(column) for column in requested.split(",") if column in columns]
+        result[name] = {
+            "columns": [columns[i] for i in indexes],
+            "data": [[row[i] for i in indexes] for row in block["data"]],
+        }
+    return result
+
+
+class IssStandIn:
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR, latency: float = 0.0, jitter: float = 0.0,
+                 page_size: Optional[int] = None):
+        self.fixtures = load_fixtures(fixtures_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.requests = 0
+        self._responses: Dict[Tuple[str, str], bytes] = {}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        endpoint = request.path[len(ISS_PREFIX) + 1:]
+        payload = self.fixtures.get(endpoint)
+        if payload is None:
+            raise web.HTTPNotFound()
+
+        delay = self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        cache_key = (endpoint, request.query_string)
+        body = self._responses.get(cache_key)
+        if body is None:
+            if self.page_size:
+                payload = paginate(payload, int(request.query.get("start", 0)), self.page_size)
+            body = json.dumps(project(payload, request.query), ensure_ascii=False).encode()
+            self._responses[cache_key] = body
+        return web.Response(body=body, content_type="application/json")
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(ISS_PREFIX + "/{tail:.*}", self.handle)
+        return app
+
+
+@asynccontextmanager
+async def serve(host: str = "127.0.0.1", port: int = 0, fixtures_dir: Path = FIXTURES_DIR,
+                latency: float = 0.0, jitter: float = 0.0, page_size: Optional[int] = None):
+    """Запускает stand-in в текущем цикле событий; отдаёт (базовый URL ISS, сервер)."""
+    stand_in = IssStandIn(fixtures_dir, latency, jitter, page_size)
+    runner = web.AppRunner(stand_in.make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}{ISS_PREFIX}", stand_in
+    finally:
+        await runner.cleanup()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--dir", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    stand_in = IssStandIn(args.dir, args.latency, args.jitter, args.page_size)
+    print(f"MOEX_ISS_URL=http://{args.host}:{args.port}{ISS_PREFIX}")
+    web.run_app(stand_in.make_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
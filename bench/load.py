@@ -0,0 +1,231 @@
+"""
+Нагрузочные сценарии: приложение под uvicorn против локальной замены MOEX ISS,
+много одновременных пользователей с собственными портфелями.
+
+    python -m bench.load --users 50 --duration 20
+    python -m bench.load --scenario market_table --users 200 --iss-latency 0.2
+    python -m bench.load --save-baseline
+    REDIS_URL=redis://localhost:6379/15 DATABASE_URL=postgresql://... python -m bench.load
+
+Зависимости бенчмарков (fakeredis с Lua для лимитов запросов): pip install -r requirements-bench.txt
+
+Сервер, stand-in ISS и генератор нагрузки работают в отдельных процессах.
+С REDIS_URL=fakeredis:// (по умолчанию) Redis живёт внутри процесса сервера, поэтому --workers > 1 требует настоящий Redis.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{Path(tempfile.gettempdir()) / 'martfi-bench.db'}")
+os.environ.setdefault("REDIS_URL", "fakeredis://")
+
+import aiohttp
+
+from back.auth.token_service import create_access_token
+from back.database import create_tables
+from back.database.database import SessionLocal
+from back.database.models import User, PortfolioItem
+
+from . import results
+from .iss_fixtures import FIXTURES_DIR, load_fixtures
+
+ROOT_DIR = Path(__file__).parent.parent
+ASSET_TYPES = ["stock", "bonds", "funds", "indices", "currency"]
+SEARCH_TERMS = ["", "", "", "сб", "ro", "RU000A"]
+SORT_FIELDS = ["name", "ticker", "price", "change_percent", "volume"]
+
+PORTFOLIO_SOURCES = {
+    "stock": "engines/stock/markets/shares/boards/TQBR/securities.json",
+    "fund": "engines/stock/markets/shares/boards/TQTF/securities.json",
+    "bond": "engines/stock/markets/bonds/securities.json",
+}
+
+
+def _table_query(rng: random.Random) -> str:
+    return (f"search={rng.choice(SEARCH_TERMS)}&sort_by={rng.choice(SORT_FIELDS)}"
+            f"&sort_order={rng.choice(['asc', 'desc'])}&page={rng.randint(1, 3)}")
+
+
+SCENARIOS: Dict[str, Callable[[random.Random], str]] = {
+    "market_page": lambda rng: f"/market/{rng.choice(ASSET_TYPES)}",
+    "market_table": lambda rng: f"/market/{rng.choice(ASSET_TYPES)}/table?{_table_query(rng)}",
+    "market_api": lambda rng: f"/api/market/stocks/{rng.choice(ASSET_TYPES)}?{_table_query(rng)}",
+    "portfolio": lambda rng: "/portfolio",
+}
+MIXED_WEIGHTS = {"market_page": 2, "market_table": 4, "market_api": 3, "portfolio": 3}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_users(count: int, positions: int, fixtures_dir: Path, seed: int = 1) -> List[str]:
+    """Пользователи с портфелями из инструментов фикстур; возвращает их access-токены."""
+    rng = random.Random(seed)
+    fixtures = load_fixtures(fixtures_dir)
+    universe = [
+        (asset_type, row[0])
+        for asset_type, endpoint in PORTFOLIO_SOURCES.items()
+        for row in fixtures[endpoint]["securities"]["data"]
+    ]
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        db.query(PortfolioItem).filter(PortfolioItem.notes == "bench").delete()
+        db.query(User).filter(User.email.like("bench-%@example.com")).delete(synchronize_session=False)
+        users = [User(email=f"bench-{i}@example.com", hashed_password="-", full_name=f"Bench {i}") for i in range(count)]
+        db.add_all(users)
+        db.flush()
+        for user in users:
+            db.add_all(
+                PortfolioItem(user_id=user.id, ticker=ticker, asset_type=asset_type, quantity=rng.randint(1, 500),
+                              average_price=rng.uniform(10, 1000), notes="bench")
+                for asset_type, ticker in rng.sample(universe, positions)
+            )
+        db.commit()
+        return [create_access_token(user.id) for user in users]
+    finally:
+        db.close()
+
+
+def start_processes(args, iss_port: int, app_port: int) -> List[subprocess.Popen]:
+    env = {**os.environ, "MOEX_ISS_URL": f"http://127.0.0.1:{iss_port}/iss", "DEBUG": "true"}
+    quiet = {"stdout": subprocess.DEVNULL, "stderr": None if args.verbose else subprocess.DEVNULL}
+    iss = subprocess.Popen(
+        [sys.executable, "-m", "bench.iss_server", "--port", str(iss_port), "--dir", str(args.fixtures),
+         "--latency", str(args.iss_latency), "--jitter", str(args.iss_latency / 4),
+         *(["--page-size", str(args.iss_page_size)] if args.iss_page_size else [])],
+        cwd=ROOT_DIR, env=env, **quiet,
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "back.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT_DIR, env=env, **quiet,
+    )
+    return [iss, app]
+
+
+async def wait_ready(session: aiohttp.ClientSession, url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url, allow_redirects=False) as response:
+                if response.status < 500:
+                    return
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready in {timeout:.0f}s")
+
+
+async def run_scenario(session: aiohttp.ClientSession, base_url: str, tokens: List[str],
+                       pick: Callable[[random.Random], str], users: int, duration: float, seed: int):
+    samples: List[float] = []
+    statuses: Counter = Counter()
+    deadline = time.monotonic() + duration
+
+    async def virtual_user(index: int):
+        rng = random.Random(seed * 1000 + index)
+        headers = {"Cookie": f"access_token={tokens[index % len(tokens)]}"}
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                async with session.get(base_url + pick(rng), headers=headers, allow_redirects=False) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                statuses["error"] += 1
+                continue
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(users)))
+    elapsed = time.perf_counter() - started
+    errors = sum(count for status, count in statuses.items() if status == "error" or status >= 400)
+    return {
+        **results.summarize(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        "errors": errors,
+    }
+
+
+def _mixed(rng: random.Random) -> str:
+    name = rng.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()))[0]
+    return SCENARIOS[name](rng)
+
+
+async def run(args, tokens: List[str], app_port: int):
+    base_url = f"http://127.0.0.1:{app_port}"
+    scenarios = {**SCENARIOS, "mixed": _mixed}
+    selected = list(scenarios) if args.scenario == "all" else [args.scenario]
+
+    connector = aiohttp.TCPConnector(limit=args.users)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await wait_ready(session, base_url + "/login")
+        for asset_type in ASSET_TYPES:
+            async with session.get(f"{base_url}/api/market/stocks/{asset_type}",
+                                   headers={"Cookie": f"access_token={tokens[0]}"}) as response:
+                await response.read()
+        await run_scenario(session, base_url, tokens, _mixed, args.users, args.warmup, seed=0)
+
+        measured = {}
+        for name in selected:
+            measured[f"load.{name}"] = await run_scenario(
+                session, base_url, tokens, scenarios[name], args.users, args.duration, seed=len(measured) + 1)
+            print(f"{name}: {measured[f'load.{name}']}", file=sys.stderr)
+        return measured
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="all", choices=["all", "mixed", *SCENARIOS])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--positions", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=10.0, help="таймаут одного запроса, секунды")
+    parser.add_argument("--iss-latency", type=float, default=0.05)
+    parser.add_argument("--iss-page-size", type=int, default=None)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--verbose", action="store_true")
+    results.add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    if args.workers > 1 and os.environ["REDIS_URL"].startswith("fakeredis://"):
+        parser.error("--workers > 1 needs a shared Redis; set REDIS_URL")
+
+    tokens = seed_users(args.users, args.positions, args.fixtures)
+    iss_port, app_port = _free_port(), _free_port()
+    processes = start_processes(args, iss_port, app_port)
+    try:
+        measured = asyncio.run(run(args, tokens, app_port))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    sys.exit(results.finish(
+        measured, "load", args.baseline, args.save_baseline, args.tolerance,
+        users=args.users, duration=args.duration, workers=args.workers,
+        iss_latency=args.iss_latency, redis=os.environ["REDIS_URL"].split("@")[-1],
+    ))
+
+
+if __name__ == "__main__":
+    main()
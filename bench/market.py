@@ -0,0 +1,172 @@
+"""
+Микробенчмарки рыночного слоя на фикстурах ISS: разбор ответов провайдерами,
+фильтрация, сортировка и пагинация MarketService, оценка портфеля.
+
+    python -m bench.market --repeat 20
+    python -m bench.market --save-baseline
+    REDIS_URL=redis://localhost:6379/15 python -m bench.market
+
+Зависимости бенчмарков (fakeredis с Lua для лимитов запросов): pip install -r requirements-bench.txt
+
+По умолчанию используется fakeredis; при REDIS_URL на настоящий сервер берите отдельную базу —
+бенчмарк перезаписывает ключи moex:*.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("REDIS_URL", "fakeredis://")
+
+from back.services.market.providers import create_market_data_providers
+from back.services.market_service import MarketService
+from back.services.portfolio_service import PortfolioService, MARKET_ASSET_TYPES
+from back.services.market.iss import security_decoder, quote_decoder
+from back.services.market.providers.bonds import bond_decoder, bond_quote_decoder
+from back.services.market.providers.indices import index_decoder, index_quote_decoder
+
+from . import results
+from .iss_fixtures import FIXTURES_DIR, load_fixtures
+from .iss_server import serve
+
+SEARCH_TERMS = ["сб", "ro", "RU000A", "газ", "x"]
+SORT_FIELDS = {
+    "stock": ["name", "change_percent", "volume"],
+    "bonds": ["name", "ytm", "maturity_date", "duration"],
+}
+
+
+async def measure(func, repeat: int, warmup: int = 1):
+    for _ in range(warmup):
+        await func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _sync(func):
+    async def wrapper():
+        func()
+    return wrapper
+
+
+DECODERS = {
+    "stock": ("engines/stock/markets/shares/boards/TQBR/securities.json", security_decoder, quote_decoder),
+    "bonds": ("engines/stock/markets/bonds/securities.json", bond_decoder, bond_quote_decoder),
+    "indices": ("engines/stock/markets/index/boards/SNDX/securities.json", index_decoder, index_quote_decoder),
+}
+
+
+async def bench_decoders(fixtures_dir: Path, repeat: int):
+    """Разбор таблиц ISS без сети и json.loads: только securities и marketdata -> словари."""
+    fixtures = load_fixtures(fixtures_dir)
+    out = {}
+    for asset_type, (endpoint, securities, quotes) in DECODERS.items():
+        payload = fixtures[endpoint]
+        out[f"iss.{asset_type}.decode"] = {
+            **results.summarize(await measure(_sync(lambda: (
+                securities.decode(payload["securities"]), quotes.decode_index(payload["marketdata"]),
+            )), repeat)),
+            "rows": len(payload["securities"]["data"]) + len(payload["marketdata"]["data"]),
+        }
+    return out
+
+
+async def bench_providers(service: MarketService, repeat: int):
+    out = {}
+    for provider in service.data_providers:
+        asset_type = provider.get_asset_type()
+        data = await provider.fetch_data()
+        service._store_snapshot(provider, data)
+        out[f"provider.{asset_type}.fetch"] = {
+            **results.summarize(await measure(provider.fetch_data, repeat)),
+            "rows": len(data),
+        }
+    return out
+
+
+async def bench_table_ops(service: MarketService, repeat: int):
+    out = {}
+    for asset_type, sort_fields in SORT_FIELDS.items():
+        data = await service.get_cached_data(asset_type)
+
+        out[f"market.{asset_type}.decode"] = results.summarize(
+            await measure(lambda: service.get_cached_data(asset_type), repeat))
+        out[f"market.{asset_type}.filter"] = results.summarize(await measure(_sync(
+            lambda: [service._filter_data(data, term) for term in SEARCH_TERMS]), repeat))
+        out[f"market.{asset_type}.sort"] = results.summarize(await measure(_sync(
+            lambda: [service._sort_data(data, field, order) for field in sort_fields for order in ("asc", "desc")]),
+            repeat))
+        out[f"market.{asset_type}.paginate"] = results.summarize(await measure(_sync(
+            lambda: [service._paginate(data, page, 50) for page in range(1, 21)]), repeat))
+        out[f"market.{asset_type}.stocks_api"] = results.summarize(await measure(
+            lambda: service.get_market_stocks_data(asset_type, search="", sort_by=sort_fields[1],
+                                                   sort_order="desc", page=3), repeat))
+    return out
+
+
+async def bench_portfolio(service: MarketService, repeat: int, sizes=(20, 200)):
+    rng = random.Random(7)
+    portfolio = PortfolioService(security_service=None, portfolio_repo=None, market_service=service)
+    universe = []
+    for asset_type, market_type in MARKET_ASSET_TYPES.items():
+        universe.extend((asset_type, item['ticker']) for item in await service.get_cached_data(market_type))
+    fx = await service.get_fx_matrix()
+
+    out = {}
+    for size in sizes:
+        items = [
+            {
+                'id': i, 'ticker': ticker, 'asset_type': asset_type,
+                'quantity': rng.randint(1, 500), 'average_price': rng.uniform(10, 1000), 'notes': '',
+            }
+            for i, (asset_type, ticker) in enumerate(rng.sample(universe, min(size, len(universe))))
+        ]
+
+        async def enrich():
+            enriched = await portfolio._enrich_portfolio_items(items, fx, 'RUB')
+            await portfolio._calculate_portfolio_summary(enriched)
+
+        out[f"portfolio.enrich.{size}"] = results.summarize(await measure(enrich, repeat))
+    return out
+
+
+async def run(repeat: int, fixtures_dir: Path, iss_latency: float = 0.0, iss_page_size: Optional[int] = None):
+    async with serve(fixtures_dir=fixtures_dir, latency=iss_latency, page_size=iss_page_size) as (base_url, stand_in):
+        service = MarketService(security_service=None, data_providers=create_market_data_providers(base_url))
+
+        out = await bench_decoders(fixtures_dir, repeat)
+        out.update(await bench_providers(service, repeat))
+        out.update(await bench_table_ops(service, repeat))
+        out.update(await bench_portfolio(service, repeat))
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--iss-latency", type=float, default=0.0)
+    parser.add_argument("--iss-page-size", type=int, default=None)
+    results.add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    measured = asyncio.run(run(args.repeat, args.fixtures, args.iss_latency, args.iss_page_size))
+    sys.exit(results.finish(
+        measured, "market", args.baseline, args.save_baseline, args.tolerance,
+        repeat=args.repeat, redis=os.environ["REDIS_URL"],
+        iss_latency=args.iss_latency, iss_page_size=args.iss_page_size,
+    ))
+
+
+if __name__ == "__main__":
+    main()
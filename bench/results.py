@@ -0,0 +1,131 @@
+"""
+Сводка замеров и сравнение с сохранённой базовой линией.
+
+Результаты всех бенчмарков имеют одну форму: {имя: {метрика: значение}}.
+Метрики с суффиксом _ms сравниваются как «меньше — лучше», rps — как «больше — лучше»;
+прочие (count, errors, rows) выводятся для контекста и не сравниваются.
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+Results = Dict[str, Dict[str, float]]
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Замеры в секундах -> миллисекунды: min, mean, p50, p95, p99."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3) if ordered else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def save(path: Path, results: Results, **meta) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "meta": meta,
+        "results": results,
+    }, indent=2, ensure_ascii=False))
+
+
+def load(path: Path) -> Optional[Results]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())["results"]
+
+
+def _is_compared(metric: str) -> bool:
+    return metric.endswith("_ms") or metric == "rps"
+
+
+def compare(current: Results, baseline: Results, tolerance: float = 0.10) -> List[Dict]:
+    """Строки сравнения; status = regression, если метрика хуже базовой больше чем на tolerance."""
+    rows = []
+    for name, metrics in current.items():
+        base = baseline.get(name, {})
+        for metric, value in metrics.items():
+            if not _is_compared(metric) or metric not in base or not base[metric]:
+                continue
+            delta = (value - base[metric]) / base[metric]
+            worse = -delta if metric == "rps" else delta
+            rows.append({
+                "name": name,
+                "metric": metric,
+                "baseline": base[metric],
+                "current": value,
+                "delta": delta,
+                "status": "regression" if worse > tolerance else "improved" if worse < -tolerance else "ok",
+            })
+    return rows
+
+
+def print_results(results: Results, metrics=("p50_ms", "p95_ms", "p99_ms")) -> None:
+    width = max((len(name) for name in results), default=10)
+    extra = sorted({key for values in results.values() for key in values} - set(metrics) - {"min_ms", "mean_ms", "count"})
+    columns = [*metrics, *extra, "count"]
+    print(f"{'name':<{width}}  " + "  ".join(f"{column:>10}" for column in columns))
+    for name, values in results.items():
+        print(f"{name:<{width}}  " + "  ".join(f"{values.get(column, ''):>10}" for column in columns))
+
+
+def print_comparison(rows: List[Dict]) -> bool:
+    """Печатает сравнение и возвращает True, если регрессий нет."""
+    if not rows:
+        print("baseline: no comparable metrics")
+        return True
+    width = max(len(row["name"]) for row in rows)
+    for row in rows:
+        marker = {"regression": "!!", "improved": "++", "ok": "  "}[row["status"]]
+        print(f"{marker} {row['name']:<{width}}  {row['metric']:>8}  "
+              f"{row['baseline']:>10.3f} -> {row['current']:>10.3f}  {row['delta'] * 100:+7.1f}%")
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print(f"baseline: {len(regressions)} regression(s) out of {len(rows)} metrics")
+    return not regressions
+
+
+def finish(results: Results, name: str, baseline: Optional[Path], save_baseline: bool,
+           tolerance: float, **meta) -> int:
+    """
+    Общий хвост CLI бенчмарков: печать, запись последнего прогона,
+    сохранение или сравнение с базовой линией. Возвращает код выхода.
+    """
+    print_results(results)
+    save(RESULTS_DIR / f"{name}-latest.json", results, **meta)
+    baseline = baseline or RESULTS_DIR / f"{name}-baseline.json"
+    if save_baseline:
+        save(baseline, results, **meta)
+        print(f"baseline saved to {baseline}")
+        return 0
+    previous = load(baseline)
+    if previous is None:
+        print(f"no baseline at {baseline}; run with --save-baseline to record one")
+        return 0
+    return 0 if print_comparison(compare(results, previous, tolerance)) else 1
+
+
+def add_baseline_arguments(parser) -> None:
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="допустимое ухудшение метрики относительно базовой линии")
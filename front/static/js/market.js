@@ -6,6 +6,69 @@ document.addEventListener('DOMContentLoaded', function() {
     const sortForm = document.getElementById('sortForm');
     const sortBySelect = document.getElementById('sortBySelect');
     const sortOrderSelect = document.getElementById('sortOrderSelect');
+    const marketTable = document.getElementById('marketTable');
+    let pendingTableRequest = null;
+    
+    function currentAssetType() {
+        const activeTab = document.querySelector('.tab-btn.active');
+        return activeTab ? activeTab.getAttribute('data-tab') : 'stock';
+    }
+    
+    function currentPageUrl(page) {
+        const params = new URLSearchParams();
+        const searchQuery = document.querySelector('.search-input').value;
+        if (searchQuery) params.set('search', searchQuery);
+        params.set('sort_by', sortBySelect.value);
+        params.set('sort_order', sortOrderSelect.value);
+        if (page && page > 1) params.set('page', page);
+        return `/market/${currentAssetType()}?${params.toString()}`;
+    }
+    
+    function syncHiddenInputs() {
+        const searchQuery = document.querySelector('.search-input').value;
+        if (searchForm) {
+            searchForm.querySelector('input[name="sort_by"]').value = sortBySelect.value;
+            searchForm.querySelector('input[name="sort_order"]').value = sortOrderSelect.value;
+        }
+        if (sortForm) {
+            sortForm.querySelector('input[name="search"]').value = searchQuery;
+        }
+    }
+    
+    async function loadTable(url, pushHistory = true) {
+        if (!marketTable || !window.fetch) {
+            window.location.href = url;
+            return;
+        }
+        const target = new URL(url, window.location.origin);
+        
+        if (pendingTableRequest) {
+            pendingTableRequest.abort();
+        }
+        pendingTableRequest = new AbortController();
+        marketTable.classList.add('loading');
+        
+        try {
+            const response = await fetch(`${target.pathname}/table${target.search}`, {
+                signal: pendingTableRequest.signal,
+                credentials: 'same-origin',
+            });
+            if (!response.ok) {
+                window.location.href = target.href;
+                return;
+            }
+            marketTable.innerHTML = await response.text();
+            if (pushHistory) {
+                history.pushState({ marketTable: true }, '', target.pathname + target.search);
+            }
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                window.location.href = target.href;
+            }
+        } finally {
+            marketTable.classList.remove('loading');
+        }
+    }
     
     function switchTab(tabName) {
         const searchQuery = document.querySelector('.search-input').value;
@@ -49,16 +112,48 @@ document.addEventListener('DOMContentLoaded', function() {
     
     if (sortBySelect) {
         sortBySelect.addEventListener('change', function() {
-            sortForm.submit();
+            syncHiddenInputs();
+            loadTable(currentPageUrl());
         });
     }
     
     if (sortOrderSelect) {
         sortOrderSelect.addEventListener('change', function() {
-            sortForm.submit();
+            syncHiddenInputs();
+            loadTable(currentPageUrl());
         });
     }
     
+    if (searchForm) {
+        searchForm.addEventListener('submit', function(e) {
+            e.preventDefault();
+            syncHiddenInputs();
+            loadTable(currentPageUrl());
+        });
+    }
+    
+    if (marketTable) {
+        marketTable.addEventListener('click', function(e) {
+            const link = e.target.closest('.pagination a');
+            if (!link || e.ctrlKey || e.metaKey || e.shiftKey) return;
+            e.preventDefault();
+            loadTable(link.href);
+            marketTable.scrollIntoView({ behavior: 'smooth', block: 'start' });
+        });
+    }
+    
+    window.addEventListener('popstate', function() {
+        const path = window.location.pathname;
+        if (path.startsWith(`/market/${currentAssetType()}`)) {
+            const params = new URLSearchParams(window.location.search);
+            document.querySelector('.search-input').value = params.get('search') || '';
+            sortBySelect.value = params.get('sort_by') || 'name';
+            sortOrderSelect.value = params.get('sort_order') || 'asc';
+            syncHiddenInputs();
+            loadTable(window.location.href, false);
+        }
+    });
+    
 
     const tabsHeader = document.querySelector('.tabs-header');
     if (tabsHeader) {
@@ -118,7 +213,8 @@ document.addEventListener('DOMContentLoaded', function() {
             clearTimeout(searchTimeout);
             searchTimeout = setTimeout(() => {
                 if (this.value.length >= 2 || this.value.length === 0) {
-                    searchForm.submit();
+                    syncHiddenInputs();
+                    loadTable(currentPageUrl());
                 }
             }, 500);
         });
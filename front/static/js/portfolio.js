@@ -1,13 +1,11 @@
 document.addEventListener('DOMContentLoaded', function() {
     const addAssetBtn = document.getElementById('addAssetBtn');
-    const addFirstAssetBtn = document.getElementById('addFirstAssetBtn');
     const addAssetModal = document.getElementById('addAssetModal');
     const closeModalBtn = document.getElementById('closeModal');
     const cancelAddBtn = document.getElementById('cancelAdd');
     const addAssetForm = document.getElementById('addAssetForm');
-    const refreshPortfolioBtn = document.getElementById('refreshPortfolio');
-    const deleteButtons = document.querySelectorAll('.delete-btn');
-    const editButtons = document.querySelectorAll('.edit-btn');
+    const portfolioStats = document.getElementById('portfolioStats');
+    const baseCurrencySelect = document.getElementById('baseCurrency');
     const csrfToken = document.querySelector('input[name="csrf_token"]')?.value;
 
     
@@ -28,9 +26,6 @@ document.addEventListener('DOMContentLoaded', function() {
         addAssetBtn.addEventListener('click', openModal);
     }
     
-    if (addFirstAssetBtn) {
-        addFirstAssetBtn.addEventListener('click', openModal);
-    }
 
     
     if (closeModalBtn) {
@@ -80,60 +75,99 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     
-    if (refreshPortfolioBtn) {
-        refreshPortfolioBtn.addEventListener('click', function() {
-            window.location.reload();
+    // Сводка и таблица перерисовываются фрагментом, поэтому кнопки внутри них обрабатываются делегированием.
+    async function loadStats(currency) {
+        portfolioStats.classList.add('loading');
+        try {
+            const response = await fetch(`/portfolio/stats?currency=${encodeURIComponent(currency)}`, {
+                headers: { 'Accept': 'text/html' }
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            portfolioStats.innerHTML = await response.text();
+
+            const url = new URL(window.location.href);
+            if (currency === 'RUB') {
+                url.searchParams.delete('currency');
+            } else {
+                url.searchParams.set('currency', currency);
+            }
+            window.history.replaceState(null, '', url);
+        } catch (error) {
+            showNotification('Не удалось обновить портфель', 'error');
+            console.error('Portfolio stats error:', error);
+        } finally {
+            portfolioStats.classList.remove('loading');
+        }
+    }
+
+    
+    if (baseCurrencySelect) {
+        baseCurrencySelect.addEventListener('change', function() {
+            loadStats(this.value);
         });
     }
 
     
-    deleteButtons.forEach(button => {
-        button.addEventListener('click', async function() {
-            const itemId = this.getAttribute('data-item-id');
-            const itemName = this.closest('tr').querySelector('.ticker').textContent;
-            
-            if (confirm(`Удалить актив ${itemName} из портфеля?`)) {
-                try {
-                    const formData = new FormData();
-                    formData.append('csrf_token', csrfToken);
-                    
-                    const response = await fetch(`/api/portfolio/remove/${itemId}`, {
-                        method: 'POST',
-                        body: formData
-                    });
-                    
-                    const result = await response.json();
-                    
-                    if (result.success) {
-                        showNotification('Актив удален из портфеля', 'success');
-                        setTimeout(() => {
-                            window.location.reload();
-                        }, 1500);
-                    } else {
-                        showNotification(result.message || 'Ошибка при удалении актива', 'error');
-                    }
-                } catch (error) {
-                    showNotification('Ошибка сети. Проверьте соединение.', 'error');
-                    console.error('Delete asset error:', error);
+    async function deleteAsset(button) {
+        const itemId = button.getAttribute('data-item-id');
+        const itemName = button.closest('tr').querySelector('.ticker').textContent;
+        
+        if (confirm(`Удалить актив ${itemName} из портфеля?`)) {
+            try {
+                const formData = new FormData();
+                formData.append('csrf_token', csrfToken);
+                
+                const response = await fetch(`/api/portfolio/remove/${itemId}`, {
+                    method: 'POST',
+                    body: formData
+                });
+                
+                const result = await response.json();
+                
+                if (result.success) {
+                    showNotification('Актив удален из портфеля', 'success');
+                    setTimeout(() => {
+                        window.location.reload();
+                    }, 1500);
+                } else {
+                    showNotification(result.message || 'Ошибка при удалении актива', 'error');
                 }
+            } catch (error) {
+                showNotification('Ошибка сети. Проверьте соединение.', 'error');
+                console.error('Delete asset error:', error);
             }
-        });
-    });
+        }
+    }
 
     
-    editButtons.forEach(button => {
-        button.addEventListener('click', function() {
-            const itemId = this.getAttribute('data-item-id');
-            const row = this.closest('tr');
-            const ticker = row.querySelector('.ticker').textContent;
-            const name = row.querySelector('.name-cell').textContent;
-            const quantity = parseFloat(row.querySelector('.quantity-cell').textContent);
-            const avgPrice = parseFloat(row.querySelector('.avg-price-cell').textContent.replace(' ₽', ''));
-            
-            
-            alert(`Редактирование актива ${ticker}\nТекущее количество: ${quantity}\nСредняя цена: ${avgPrice} ₽\n\nФункция редактирования в разработке.`);
+    function editAsset(button) {
+        const row = button.closest('tr');
+        const ticker = row.querySelector('.ticker').textContent;
+        const quantity = parseFloat(row.querySelector('.quantity-cell').textContent);
+        const avgPrice = parseFloat(row.querySelector('.avg-price-cell').textContent);
+        
+        
+        alert(`Редактирование актива ${ticker}\nТекущее количество: ${quantity}\nСредняя цена: ${avgPrice}\n\nФункция редактирования в разработке.`);
+    }
+
+    
+    if (portfolioStats) {
+        portfolioStats.addEventListener('click', function(e) {
+            const deleteButton = e.target.closest('.delete-btn');
+            const editButton = e.target.closest('.edit-btn');
+            if (deleteButton) {
+                deleteAsset(deleteButton);
+            } else if (editButton) {
+                editAsset(editButton);
+            } else if (e.target.closest('#addFirstAssetBtn')) {
+                openModal();
+            } else if (e.target.closest('#refreshPortfolio')) {
+                loadStats(baseCurrencySelect ? baseCurrencySelect.value : 'RUB');
+            }
         });
-    });
+    }
 
     
     function showNotification(message, type = 'info') {